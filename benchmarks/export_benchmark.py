@@ -0,0 +1,103 @@
+"""
+Benchmark export modes on a synthetic clip.
+
+Generates a long-GOP H.264 test clip with ffmpeg, labels alternating
+blocks as "keep" and times each export mode against the re-encode path,
+for each worker pool size. Throughput is exported seconds per wall second.
+
+    python benchmarks/export_benchmark.py --duration 120 --workers 1 2 4 8
+
+With --iterations N, also re-exports N times through a segment cache,
+relabeling one block between iterations, to time incremental re-exports.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from block_editor.core.audio_block import AudioBlock
+from block_editor.utils.exporter import EXPORT_MODES, VideoExporter, get_video_properties
+from block_editor.utils.segment_cache import SegmentCache
+
+def make_clip(path, duration):
+    subprocess.run([
+        "ffmpeg", "-y", "-v", "error",
+        "-f", "lavfi", "-i", f"testsrc2=size=1280x720:rate=30:duration={duration}",
+        "-f", "lavfi", "-i", f"sine=frequency=440:sample_rate=48000:duration={duration}",
+        "-c:v", "libx264", "-preset", "veryfast", "-g", "250", "-pix_fmt", "yuv420p",
+        "-c:a", "aac", "-shortest",
+        path
+    ], check=True)
+
+def make_blocks(duration, block_length=4.0, gap=1.5):
+    blocks = []
+    position = 0.5
+    while position + block_length < duration:
+        block = AudioBlock(position, position + block_length, False)
+        block.label = "keep"
+        blocks.append(block)
+        position += block_length + gap
+    return blocks
+
+def benchmark(clip, blocks, mode, workers, work_dir):
+    name = f"{mode}_{workers}"
+    exporter = VideoExporter(clip, get_video_properties(clip), os.path.join(work_dir, f"temp_{name}"),
+                             mode=mode, workers=workers)
+    try:
+        return exporter.export_label("keep", blocks, os.path.join(work_dir, f"keep_{name}.mp4"))
+    finally:
+        exporter.cleanup()
+
+def benchmark_iterations(clip, blocks, iterations, work_dir):
+    """Time repeated re-exports through a segment cache, relabeling one block each time"""
+    cache = SegmentCache(os.path.join(work_dir, "segment_cache"))
+    props = get_video_properties(clip)
+    times = []
+    for iteration in range(iterations):
+        if iteration:
+            block = blocks[iteration % len(blocks)]
+            block.label = "remove" if block.label == "keep" else "keep"
+        exporter = VideoExporter(clip, props, os.path.join(work_dir, f"temp_iter_{iteration}"),
+                                 segment_cache=cache)
+        try:
+            keep = [block for block in blocks if block.label == "keep"]
+            times.append(exporter.export_label("keep", keep, os.path.join(work_dir, "keep_iter.mp4")))
+        finally:
+            exporter.cleanup()
+    return times
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark export modes")
+    parser.add_argument("--duration", type=float, default=120.0, help="Synthetic clip length in seconds")
+    parser.add_argument("--modes", nargs="+", default=list(EXPORT_MODES), help="Export modes to time")
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, 2, 4, 8], help="Worker pool sizes")
+    parser.add_argument("--iterations", type=int, default=0, help="Cached re-export iterations to time")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        clip = os.path.join(work_dir, "clip.mp4")
+        make_clip(clip, args.duration)
+        blocks = make_blocks(args.duration)
+        print(f"Clip: {args.duration:.0f}s, {len(blocks)} blocks")
+
+        exported = sum(block.end - block.start for block in blocks)
+
+        results = {
+            (mode, workers): benchmark(clip, blocks, mode, workers, work_dir)
+            for mode in args.modes for workers in args.workers
+        }
+        for (mode, workers), elapsed in results.items():
+            baseline = results.get(('reencode', workers))
+            speedup = f"{baseline / elapsed:.1f}x" if baseline else "-"
+            print(f"{mode:>12} x{workers}: {elapsed:7.2f}s  {exported / elapsed:6.1f} s/s"
+                  f"  speedup vs re-encode: {speedup}")
+
+        if args.iterations:
+            for iteration, elapsed in enumerate(benchmark_iterations(clip, blocks, args.iterations, work_dir), 1):
+                print(f"cached re-export {iteration}: {elapsed:7.2f}s")
+
+if __name__ == "__main__":
+    main()
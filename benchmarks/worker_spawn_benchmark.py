@@ -0,0 +1,49 @@
+"""
+Benchmark the cost of a process-pool worker that uses the core package.
+
+Spawns fresh worker processes that import block_editor.core and the
+export utilities, the way detection, export and batch pools do, and
+reports each worker's spawn-to-ready time and peak RSS. Run it with
+--with-qt to add a QtGui import and see what a Qt-dependent core costs.
+
+    python benchmarks/worker_spawn_benchmark.py --workers 8
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def worker(with_qt):
+    import block_editor.core
+    import block_editor.utils.exporter
+    if with_qt:
+        import PySide6.QtGui
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1024 if sys.platform != "darwin" else rss / 1024 ** 2
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark worker process spawn time and memory")
+    parser.add_argument("--workers", type=int, default=8, help="Worker processes to spawn")
+    parser.add_argument("--with-qt", action="store_true", help="Also import PySide6.QtGui in each worker")
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    times = []
+    rss = []
+    for _ in range(args.workers):
+        started = time.perf_counter()
+        with context.Pool(1) as pool:
+            rss.append(pool.apply(worker, (args.with_qt,)))
+        times.append(time.perf_counter() - started)
+
+    print(f"{args.workers} workers{' (with Qt)' if args.with_qt else ''}")
+    print(f"spawn to ready: mean {sum(times) / len(times) * 1000:.0f} ms, max {max(times) * 1000:.0f} ms")
+    print(f"peak RSS: mean {sum(rss) / len(rss):.1f} MiB, max {max(rss):.1f} MiB")
+
+if __name__ == "__main__":
+    main()
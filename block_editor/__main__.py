@@ -1,19 +1,20 @@
 import sys
-import os
 import argparse
-import subprocess
-from PySide6.QtWidgets import QApplication
-from block_editor.gui.video_player import VideoPlayer
-from block_editor.utils.unix_ffbinary_manager import install_unix_binaries
+import time
 
 def check_ffmpeg():
+    from block_editor.utils import toolchain
     try:
-        subprocess.run(["ffmpeg", "-version"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        # Only probes ffmpeg when the binaries are new or have changed
+        toolchain.get_toolchain()
         return True
     except FileNotFoundError:
         if sys.platform == 'darwin' or sys.platform == 'linux':
+            # The installer pulls in requests and py7zr, so only load it when needed
+            from block_editor.utils.unix_ffbinary_manager import install_unix_binaries
             success = install_unix_binaries()
             if success:
+                toolchain.get_toolchain(refresh=True)
                 return True
             else:
                 return False
@@ -21,8 +22,11 @@ def check_ffmpeg():
             return False
 
 def main():
+    started = time.perf_counter()
     parser = argparse.ArgumentParser(description='Video Block Editor')
     parser.add_argument('--debug', action='store_true', help='Enable debug logging')
+    parser.add_argument('--startup-time', action='store_true',
+                        help='Print the time until the main window is shown, then exit')
     args = parser.parse_args()
 
     if not check_ffmpeg():
@@ -30,10 +34,20 @@ def main():
         print("Please install ffmpeg and ffprobe and ensure they are in your PATH.")
         return
 
+    # Qt and the editor are imported only after the arguments are parsed
+    from PySide6.QtCore import QTimer
+    from PySide6.QtWidgets import QApplication
+    from block_editor.gui.video_player import VideoPlayer
+
     app = QApplication([])  # Don't pass sys.argv since we parsed it
     player = VideoPlayer(debug=args.debug)
     player.show()
+    if args.startup_time:
+        print(f"startup: {time.perf_counter() - started:.3f}s")
+        return
+    # The media stack loads once the window is on screen
+    QTimer.singleShot(0, player.start)
     sys.exit(app.exec())
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
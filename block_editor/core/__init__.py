@@ -4,6 +4,9 @@ Core functionality for the Video Block Editor.
 
 from .audio_block import AudioBlock
 from .block_manager import BlockManager
+from .color import Color
 from .label_manager import LabelManager
+from .project import Project
+from .time_map import TimeMap
 
-__all__ = ['AudioBlock', 'BlockManager', 'LabelManager']
+__all__ = ['AudioBlock', 'BlockManager', 'Color', 'LabelManager', 'Project', 'TimeMap']
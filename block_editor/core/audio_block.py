@@ -1,3 +1,5 @@
+from .loudness import LoudnessStats
+
 class AudioBlock:
     def __init__(self, start, end, is_silence):
         self.start = start
@@ -6,19 +8,25 @@ class AudioBlock:
         self.label = None  # Store the label name instead of just include flag
         self.include = True  # Default to including the block
         self.visited = False  # Track if playhead has visited this block
+        self.loudness = None  # LoudnessStats measured during detection
 
     def to_dict(self):
-        return {
+        data = {
             'start': self.start,
             'end': self.end,
             'is_silence': self.is_silence,
             'label': self.label,
             'visited': self.visited
         }
+        if self.loudness:
+            data['loudness'] = self.loudness.to_dict()
+        return data
 
     @classmethod
     def from_dict(cls, data):
         block = cls(data['start'], data['end'], data['is_silence'])
         block.label = data.get('label')  # Use get() to handle old state files
         block.visited = data['visited']
+        if data.get('loudness'):
+            block.loudness = LoudnessStats.from_dict(data['loudness'])
         return block
\ No newline at end of file
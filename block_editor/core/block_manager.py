@@ -1,48 +1,148 @@
 import json
+from bisect import bisect_right
 from .audio_block import AudioBlock
-from ..utils.silence_detector import SilenceDetector
+from .loudness import LoudnessStats
 
 class BlockManager:
     def __init__(self):
-        self.blocks = []
+        self._blocks = []
+        self._block_starts = None
         self.video_path = None
+        self.loudness = None  # Whole-file LoudnessStats from detection
+        self.features = None  # FeatureTable aligned with blocks, once extracted
+
+    @property
+    def blocks(self):
+        return self._blocks
+
+    @blocks.setter
+    def blocks(self, blocks):
+        self._blocks = blocks
+        self._block_starts = None
+        self.features = None
+
+    def find_block_index(self, position):
+        """Return the index of the block containing position (in seconds), or None"""
+        if not self._blocks:
+            return None
+        if self._block_starts is None or len(self._block_starts) != len(self._blocks):
+            self._block_starts = [block.start for block in self._blocks]
+        index = max(0, bisect_right(self._block_starts, position) - 1)
+        return index
+
+    def find_playable_block(self, start_index, forward=True, min_duration=0.0):
+        """Find the nearest non-silence block after (or before) start_index.
+
+        Blocks shorter than min_duration are treated like silence and skipped.
+        """
+        blocks = self._blocks
+        step = 1 if forward else -1
+        i = start_index + step
+        while 0 <= i < len(blocks):
+            block = blocks[i]
+            if not block.is_silence and block.end - block.start >= min_duration:
+                return i
+            i += step
+        return None
 
     def set_video_path(self, video_path):
         """Just set the video path without processing blocks"""
         self.video_path = video_path
         self.blocks = []
+        self.loudness = None
 
     def process_blocks(self, silence_settings=None):
         """Process the video to detect silence blocks"""
+        # Imported here because utils imports core (circular at module load)
+        from ..utils.silence_detector import SilenceDetector
+        from ..utils.analysis_cache import AnalysisCache, detection_params
+        from ..utils import analysis_service, toolchain
+
         if not self.video_path:
             print("[DEBUG] process_blocks: No video path set")
             return False
             
         try:
-            if silence_settings:
-                silence_detector = SilenceDetector(
-                    self.video_path,
-                    silence_threshold=silence_settings['threshold'],
-                    min_silence_duration=silence_settings['duration'],
-                    non_silence_buffer=silence_settings['buffer']
-                )
-            else:
-                silence_detector = SilenceDetector(self.video_path)
+            cache = AnalysisCache()
+            # A prefetched or previously opened file skips detection
+            cached = cache.get_detection(self.video_path, silence_settings)
+            if cached is not None:
+                self.blocks, self.loudness = cached
+                print(f"[DEBUG] process_blocks: Loaded {len(self.blocks)} cached blocks")
+                return True
+            # Another editor may already be analyzing this file through the shared service
+            client = analysis_service.connect()
+            if client is not None:
+                try:
+                    # The service caches the detections it completes in the shared cache
+                    with client:
+                        self.blocks, self.loudness = client.detect(self.video_path, silence_settings)
+                    print(f"[DEBUG] process_blocks: Analysis service detected {len(self.blocks)} blocks")
+                    return True
+                except (OSError, ValueError, analysis_service.ServiceError) as e:
+                    print(f"[DEBUG] process_blocks: Analysis service failed ({e}), detecting in-process")
+            params = detection_params(silence_settings)
+            silence_detector = SilenceDetector.from_params(self.video_path, params, toolchain=toolchain.current())
             self.blocks = silence_detector.detect_blocks()
+            self.loudness = silence_detector.loudness
+            if silence_detector.complete:
+                cache.put_detection(self.video_path, silence_settings, self.blocks, self.loudness)
+            else:
+                print("[DEBUG] process_blocks: Video analysis failed, not caching the audio-only blocks")
             print(f"[DEBUG] process_blocks: Successfully detected {len(self.blocks)} blocks")
             return True
         except Exception as e:
             print(f"[DEBUG] process_blocks: Error processing blocks - {str(e)}")
             return False
 
+    def compute_features(self, blocks=None):
+        """FeatureTable for blocks (default: the current ones), cached per source and boundaries.
+
+        Does not assign self.features, so it can run off the GUI thread while
+        the blocks are edited; see set_features().
+        """
+        from ..core.features import FeatureTable
+        from ..utils.analysis_cache import AnalysisCache
+        from ..utils.feature_extractor import FeatureExtractor
+
+        blocks = self.blocks if blocks is None else blocks
+        cache = AnalysisCache()
+        cached = cache.get_features(self.video_path, blocks)
+        if cached is not None:
+            return FeatureTable.from_dict(cached)
+        table = FeatureExtractor(self.video_path).extract(blocks)
+        cache.put_features(self.video_path, blocks, table)
+        return table
+
+    def set_features(self, blocks, table):
+        """Attach a table computed for blocks, unless the blocks were replaced since"""
+        if blocks is not self.blocks or len(table) != len(blocks):
+            return False
+        self.features = table
+        return True
+
+    def find_retakes(self):
+        """Groups of block indices that are takes of the same line, in timeline order"""
+        from .retakes import find_retakes
+        from ..utils.feature_extractor import FeatureExtractor
+
+        blocks = self.blocks
+        vectors = FeatureExtractor(self.video_path).fingerprints(blocks)
+        groups = find_retakes(vectors, blocks)
+        print(f"[DEBUG] find_retakes: {len(groups)} groups in {len(blocks)} blocks")
+        return groups
+
     def save_state(self, filepath):
         if not self.blocks:
             return False
         
         state = {
             'video_path': self.video_path,
-            'blocks': [block.to_dict() for block in self.blocks]
+            'blocks': [block.to_dict() for block in self.blocks],
+            'loudness': self.loudness.to_dict() if self.loudness else None
         }
+        if self.features is not None:
+            state['features'] = self.features.to_dict()
         
         try:
             with open(filepath, 'w') as f:
@@ -59,6 +159,11 @@ class BlockManager:
             
             self.video_path = state['video_path']
             self.blocks = [AudioBlock.from_dict(block_data) for block_data in state['blocks']]
+            self.loudness = LoudnessStats.from_dict(state['loudness']) if state.get('loudness') else None
+            if state.get('features'):
+                # Imported here so sessions without features don't load numpy
+                from .features import FeatureTable
+                self.set_features(self.blocks, FeatureTable.from_dict(state['features']))
             # Get the duration from the last block's end time
             if self.blocks:
                 self.duration = self.blocks[-1].end
@@ -0,0 +1,61 @@
+class Color:
+    """An RGBA color with 0-255 channels, independent of any GUI toolkit.
+
+    Core state stores colors as plain values so it can be used in worker
+    processes without importing Qt; the GUI converts them at the edge.
+    name() matches QColor.name(), so stylesheets can use it unchanged.
+    """
+    __slots__ = ('red', 'green', 'blue', 'alpha')
+
+    def __init__(self, red, green, blue, alpha=255):
+        for channel in (red, green, blue, alpha):
+            if not 0 <= channel <= 255:
+                raise ValueError(f"Color channel out of range: {channel}")
+        self.red = int(red)
+        self.green = int(green)
+        self.blue = int(blue)
+        self.alpha = int(alpha)
+
+    @classmethod
+    def parse(cls, value):
+        """Build a Color from a Color, "#rgb"/"#rrggbb"/"#aarrggbb", an (r, g, b[, a])
+        tuple, or any object with QColor-style red()/green()/blue()/alpha() methods"""
+        if isinstance(value, Color):
+            return cls(*value.rgba())
+        if isinstance(value, str):
+            digits = value.strip().lstrip('#')
+            try:
+                if len(digits) == 3:
+                    return cls(*(int(digit * 2, 16) for digit in digits))
+                if len(digits) == 6:
+                    return cls(int(digits[0:2], 16), int(digits[2:4], 16), int(digits[4:6], 16))
+                if len(digits) == 8:
+                    # Alpha first, as Qt writes it
+                    return cls(int(digits[2:4], 16), int(digits[4:6], 16), int(digits[6:8], 16), int(digits[0:2], 16))
+            except ValueError:
+                pass
+            raise ValueError(f"Invalid color: {value!r}")
+        if isinstance(value, (tuple, list)) and len(value) in (3, 4):
+            return cls(*value)
+        if all(hasattr(value, channel) for channel in cls.__slots__):
+            return cls(value.red(), value.green(), value.blue(), value.alpha())
+        raise ValueError(f"Invalid color: {value!r}")
+
+    def name(self):
+        """"#rrggbb", without alpha"""
+        return f"#{self.red:02x}{self.green:02x}{self.blue:02x}"
+
+    def rgba(self):
+        return (self.red, self.green, self.blue, self.alpha)
+
+    def with_alpha(self, alpha):
+        return Color(self.red, self.green, self.blue, alpha)
+
+    def __eq__(self, other):
+        return isinstance(other, Color) and self.rgba() == other.rgba()
+
+    def __hash__(self):
+        return hash(self.rgba())
+
+    def __repr__(self):
+        return f"Color{self.rgba()}"
@@ -0,0 +1,172 @@
+import numpy as np
+
+# Analysis frames; features are summed per frame, then per block
+FRAME_SECONDS = 0.02
+# Frames processed at once, bounding the memory of the spectra
+CHUNK_FRAMES = 8192
+# Float samples at or above this magnitude count as clipped
+CLIP_LEVEL = 0.999
+# Frames whose energy is mostly in the telephone band, above the gate, look like speech
+SPEECH_BAND = (300.0, 3400.0)
+SPEECH_BAND_RATIO = 0.5
+SPEECH_GATE = -50.0
+# Level reported for digital silence, in dBFS
+SILENCE_FLOOR = -120.0
+
+FEATURES = ('duration', 'rms', 'peak', 'crest', 'clipping', 'centroid', 'zcr', 'speech')
+FEATURE_NAMES = {
+    'duration': "Duration (s)",
+    'rms': "RMS level (dBFS)",
+    'peak': "Peak level (dBFS)",
+    'crest': "Crest factor (dB)",
+    'clipping': "Clipped samples (ratio)",
+    'centroid': "Spectral centroid (Hz)",
+    'zcr': "Zero crossings (per sample)",
+    'speech': "Speech likelihood"
+}
+# Review queue orderings for the preview: name -> (feature, descending); None keeps timeline order
+REVIEW_ORDERS = {
+    "Timeline": None,
+    "Loudest first": ('rms', True),
+    "Most clipping first": ('clipping', True),
+    "Longest first": ('duration', True),
+    "Least speech-like first": ('speech', False),
+    "Highest crest factor first": ('crest', True)
+}
+
+def to_db(values):
+    with np.errstate(divide='ignore'):
+        return np.maximum(20 * np.log10(values), SILENCE_FLOOR)
+
+def frame_stats(samples, sample_rate, frame_length):
+    """Per-frame sums of the quantities the block features are built from.
+
+    samples is a 1-D float array in [-1, 1] (a memmap works); the last frame
+    is zero-padded.
+    """
+    frame_count = -(-len(samples) // frame_length)
+    stats = {name: np.zeros(frame_count) for name in ('energy', 'peak', 'clipped', 'crossings',
+                                                       'magnitude', 'weighted', 'speech')}
+    frequencies = np.fft.rfftfreq(frame_length, 1.0 / sample_rate)
+    in_band = (frequencies >= SPEECH_BAND[0]) & (frequencies <= SPEECH_BAND[1])
+    for first in range(0, frame_count, CHUNK_FRAMES):
+        last = min(first + CHUNK_FRAMES, frame_count)
+        chunk = np.asarray(samples[first * frame_length:last * frame_length], dtype=np.float32)
+        if len(chunk) < (last - first) * frame_length:
+            chunk = np.pad(chunk, (0, (last - first) * frame_length - len(chunk)))
+        frames = chunk.reshape(last - first, frame_length)
+        magnitude = np.abs(frames)
+        energy = np.einsum('ij,ij->i', frames, frames, dtype=np.float64)
+        stats['energy'][first:last] = energy
+        stats['peak'][first:last] = magnitude.max(axis=1)
+        stats['clipped'][first:last] = np.count_nonzero(magnitude >= CLIP_LEVEL, axis=1)
+        stats['crossings'][first:last] = np.count_nonzero(np.diff(np.signbit(frames), axis=1), axis=1)
+
+        spectrum = np.abs(np.fft.rfft(frames, axis=1))
+        stats['magnitude'][first:last] = spectrum.sum(axis=1)
+        stats['weighted'][first:last] = spectrum @ frequencies
+        power = spectrum ** 2
+        total_power = power.sum(axis=1)
+        band_power = power[:, in_band].sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            band_ratio = np.where(total_power > 0, band_power / total_power, 0.0)
+        loud_enough = to_db(np.sqrt(energy / frame_length)) > SPEECH_GATE
+        stats['speech'][first:last] = (band_ratio >= SPEECH_BAND_RATIO) & loud_enough
+    return stats
+
+def block_frames(blocks, sample_rate, frame_length, frame_count):
+    """First and end (exclusive) frame of every block"""
+    starts = np.array([block.start for block in blocks], dtype=np.float64)
+    ends = np.array([block.end for block in blocks], dtype=np.float64)
+    frame_seconds = frame_length / sample_rate
+    first = np.clip(np.floor(starts / frame_seconds).astype(np.int64), 0, frame_count)
+    end = np.clip(np.ceil(ends / frame_seconds).astype(np.int64), 0, frame_count)
+    return first, np.maximum(first, end)
+
+class FeatureTable:
+    """Acoustic features of every block, one numpy column per feature.
+
+    Row i belongs to the block at index i of the list the table was computed
+    for. Sorting and filtering work on whole columns, so ordering a session's
+    blocks by any feature is a single argsort.
+    """
+    def __init__(self, columns):
+        self.columns = {name: np.asarray(columns[name], dtype=np.float64) for name in FEATURES}
+
+    def __len__(self):
+        return len(self.columns['duration'])
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    @classmethod
+    def compute(cls, samples, sample_rate, blocks):
+        """Features of blocks from mono float samples of the whole source"""
+        frame_length = max(1, int(round(sample_rate * FRAME_SECONDS)))
+        stats = frame_stats(samples, sample_rate, frame_length)
+        frame_count = len(stats['energy'])
+        first, end = block_frames(blocks, sample_rate, frame_length, frame_count)
+        frames = end - first
+        sample_count = np.maximum(frames * frame_length, 1)
+
+        def block_sum(values):
+            cumulative = np.concatenate(([0.0], np.cumsum(values)))
+            return cumulative[end] - cumulative[first]
+
+        # reduceat over [first0, end0, first1, end1, ...] takes the max of each block at even positions
+        peaks = np.append(stats['peak'], 0.0)
+        bounds = np.stack([first, end], axis=1).ravel()
+        peak = np.maximum.reduceat(peaks, bounds)[::2] if len(bounds) else np.zeros(0)
+        peak = np.where(frames > 0, peak, 0.0)
+
+        rms = np.sqrt(block_sum(stats['energy']) / sample_count)
+        magnitude = block_sum(stats['magnitude'])
+        with np.errstate(invalid='ignore', divide='ignore'):
+            centroid = np.where(magnitude > 0, block_sum(stats['weighted']) / magnitude, 0.0)
+        rms_db = to_db(rms)
+        peak_db = to_db(peak)
+        return cls({
+            'duration': np.array([block.end - block.start for block in blocks], dtype=np.float64),
+            'rms': rms_db,
+            'peak': peak_db,
+            'crest': np.where(rms > 0, peak_db - rms_db, 0.0),
+            'clipping': block_sum(stats['clipped']) / sample_count,
+            'centroid': centroid,
+            'zcr': block_sum(stats['crossings']) / sample_count,
+            'speech': block_sum(stats['speech']) / np.maximum(frames, 1)
+        })
+
+    def order(self, feature, descending=False):
+        """Row indices sorted by feature; ties keep timeline order"""
+        values = self.columns[feature]
+        return np.argsort(-values if descending else values, kind='stable')
+
+    def where(self, feature, minimum=None, maximum=None):
+        """Row indices whose feature lies within [minimum, maximum]"""
+        values = self.columns[feature]
+        mask = np.ones(len(values), dtype=bool)
+        if minimum is not None:
+            mask &= values >= minimum
+        if maximum is not None:
+            mask &= values <= maximum
+        return np.flatnonzero(mask)
+
+    def review_queue(self, indices, order_name):
+        """indices (block indices) rearranged by one of REVIEW_ORDERS"""
+        ordering = REVIEW_ORDERS[order_name]
+        if ordering is None:
+            return list(indices)
+        selected = np.zeros(len(self), dtype=bool)
+        selected[np.asarray(list(indices), dtype=np.int64)] = True
+        order = self.order(*ordering)
+        return order[selected[order]].tolist()
+
+    def row(self, index):
+        return {name: float(column[index]) for name, column in self.columns.items()}
+
+    def to_dict(self):
+        return {name: np.round(column, 6).tolist() for name, column in self.columns.items()}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data)
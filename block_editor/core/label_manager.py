@@ -1,12 +1,12 @@
 import json
 import os
 from pathlib import Path
-from PySide6.QtGui import QColor
+from .color import Color
 
 class Label:
     def __init__(self, name, color, hotkey):
         self.name = name
-        self.color = color if isinstance(color, QColor) else QColor(color)
+        self.color = Color.parse(color)
         self.hotkey = hotkey
 
     def to_dict(self):
@@ -33,8 +33,8 @@ class LabelManager:
             self.create_default_labels()
 
     def create_default_labels(self):
-        keep_label = Label("keep", QColor("#00FF00"), "k")  # Green
-        remove_label = Label("remove", QColor("#FF0000"), "r")  # Red
+        keep_label = Label("keep", Color.parse("#00FF00"), "k")  # Green
+        remove_label = Label("remove", Color.parse("#FF0000"), "r")  # Red
         self.add_label(keep_label)
         self.add_label(remove_label)
         self.save_labels()
@@ -0,0 +1,112 @@
+import math
+
+# EBU R128 / ITU-R BS.1770 gating, in LUFS and LU
+ABSOLUTE_GATE = -70.0
+RELATIVE_GATE = -10.0
+LRA_RELATIVE_GATE = -20.0
+# Loudness values are kept as histograms with this bin width, in LU
+BIN_WIDTH = 0.1
+
+def to_energy(loudness):
+    return 10 ** ((loudness + 0.691) / 10)
+
+def to_loudness(energy):
+    return -0.691 + 10 * math.log10(energy)
+
+def gated_mean(histogram, gate):
+    """Loudness of the mean energy of the bins above gate, or None"""
+    total = 0.0
+    count = 0
+    for index, n in histogram.items():
+        loudness = index * BIN_WIDTH
+        if loudness > gate:
+            total += to_energy(loudness) * n
+            count += n
+    return to_loudness(total / count) if count else None
+
+def percentile(histogram, fraction, gate):
+    values = sorted((index, n) for index, n in histogram.items() if index * BIN_WIDTH > gate)
+    count = sum(n for _, n in values)
+    if not count:
+        return None
+    target = fraction * (count - 1)
+    seen = 0
+    for index, n in values:
+        seen += n
+        if seen > target:
+            return index * BIN_WIDTH
+    return values[-1][0] * BIN_WIDTH
+
+class LoudnessStats:
+    """EBU R128 statistics that can be merged across blocks.
+
+    momentary and short_term are histograms (bin index -> count) of the
+    400 ms momentary and 3 s short-term loudness values above the absolute
+    gate; true_peak is the highest true peak in dBTP. Merging the histograms
+    of several blocks gives the same gated integrated loudness as measuring
+    the blocks together, up to the bin width.
+    """
+    def __init__(self, momentary=None, short_term=None, true_peak=None):
+        self.momentary = dict(momentary or {})
+        self.short_term = dict(short_term or {})
+        self.true_peak = true_peak
+
+    def add(self, momentary, short_term=None, true_peak=None):
+        """Add one 100 ms measurement from the ebur128 filter"""
+        if momentary is not None and momentary > ABSOLUTE_GATE:
+            index = round(momentary / BIN_WIDTH)
+            self.momentary[index] = self.momentary.get(index, 0) + 1
+        if short_term is not None and short_term > ABSOLUTE_GATE:
+            index = round(short_term / BIN_WIDTH)
+            self.short_term[index] = self.short_term.get(index, 0) + 1
+        if true_peak is not None and (self.true_peak is None or true_peak > self.true_peak):
+            self.true_peak = true_peak
+
+    @classmethod
+    def merge(cls, stats_list):
+        merged = cls()
+        for stats in stats_list:
+            if stats is None:
+                continue
+            for index, n in stats.momentary.items():
+                merged.momentary[index] = merged.momentary.get(index, 0) + n
+            for index, n in stats.short_term.items():
+                merged.short_term[index] = merged.short_term.get(index, 0) + n
+            if stats.true_peak is not None and (merged.true_peak is None or stats.true_peak > merged.true_peak):
+                merged.true_peak = stats.true_peak
+        return merged
+
+    def threshold(self):
+        """Relative gating threshold in LUFS, or None for silence"""
+        ungated = gated_mean(self.momentary, ABSOLUTE_GATE)
+        return None if ungated is None else ungated + RELATIVE_GATE
+
+    def integrated(self):
+        """Gated integrated loudness in LUFS, or None for silence"""
+        threshold = self.threshold()
+        return None if threshold is None else gated_mean(self.momentary, threshold)
+
+    def loudness_range(self):
+        """Loudness range (LRA) in LU, per EBU Tech 3342"""
+        ungated = gated_mean(self.short_term, ABSOLUTE_GATE)
+        if ungated is None:
+            return 0.0
+        gate = ungated + LRA_RELATIVE_GATE
+        low = percentile(self.short_term, 0.10, gate)
+        high = percentile(self.short_term, 0.95, gate)
+        return round(high - low, 1)
+
+    def to_dict(self):
+        return {
+            'momentary': {str(index): n for index, n in self.momentary.items()},
+            'short_term': {str(index): n for index, n in self.short_term.items()},
+            'true_peak': self.true_peak
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            {int(index): n for index, n in data.get('momentary', {}).items()},
+            {int(index): n for index, n in data.get('short_term', {}).items()},
+            data.get('true_peak')
+        )
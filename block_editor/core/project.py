@@ -0,0 +1,162 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from .block_manager import BlockManager
+
+PROJECT_VERSION = 1
+# Sessions (blocks and their indexes) kept in memory at once
+MAX_RESIDENT_SESSIONS = 3
+
+def summarize_blocks(blocks):
+    """Per-source aggregates that stay available while the session is on disk"""
+    labels = {}
+    for block in blocks:
+        if block.label:
+            stats = labels.setdefault(block.label, {'count': 0, 'duration': 0.0})
+            stats['count'] += 1
+            stats['duration'] += block.end - block.start
+    return {
+        'blocks': len(blocks),
+        'duration': blocks[-1].end if blocks else 0.0,
+        'speech_blocks': sum(1 for block in blocks if not block.is_silence),
+        'visited': sum(1 for block in blocks if block.visited),
+        'labels': labels
+    }
+
+class Project:
+    """Several source videos, each with its own block state.
+
+    Each source's BlockManager is a session saved as a state file in the
+    project's sessions directory. Sessions are loaded on first use and at
+    most max_resident of them stay in memory; the least recently used one is
+    written back and dropped when another is loaded. The active session is
+    never evicted. Each source also keeps a small summary (block and label
+    counts and durations) in the project file, so statistics across all
+    sources never need every session loaded.
+    """
+    def __init__(self, path, max_resident=MAX_RESIDENT_SESSIONS):
+        self.path = os.path.abspath(path)
+        self.max_resident = max(1, max_resident)
+        self.sources = []
+        self.summaries = {}  # source path -> summarize_blocks() of its last saved state
+        self.active = None
+        self._sessions = OrderedDict()  # source path -> BlockManager, least recently used first
+
+    @property
+    def sessions_dir(self):
+        return os.path.splitext(self.path)[0] + "_sessions"
+
+    def session_path(self, video_path):
+        name = hashlib.sha1(os.path.abspath(video_path).encode()).hexdigest()
+        return os.path.join(self.sessions_dir, f"{name}.json")
+
+    def add_source(self, video_path):
+        video_path = os.path.abspath(video_path)
+        if video_path not in self.sources:
+            self.sources.append(video_path)
+        return video_path
+
+    def remove_source(self, video_path):
+        video_path = os.path.abspath(video_path)
+        if video_path not in self.sources:
+            return
+        self.sources.remove(video_path)
+        self.summaries.pop(video_path, None)
+        self._sessions.pop(video_path, None)
+        if self.active == video_path:
+            self.active = None
+        if os.path.exists(self.session_path(video_path)):
+            os.remove(self.session_path(video_path))
+
+    def is_analyzed(self, video_path):
+        """Whether the source has blocks, in memory or on disk"""
+        video_path = os.path.abspath(video_path)
+        session = self._sessions.get(video_path)
+        if session is not None:
+            return bool(session.blocks)
+        return bool(self.summaries.get(video_path, {}).get('blocks'))
+
+    def is_resident(self, video_path):
+        return os.path.abspath(video_path) in self._sessions
+
+    def session(self, video_path, activate=False):
+        """The source's BlockManager, loading it from disk if needed"""
+        video_path = self.add_source(video_path)
+        session = self._sessions.get(video_path)
+        if session is None:
+            session = BlockManager()
+            state_path = self.session_path(video_path)
+            if not (os.path.exists(state_path) and session.load_state(state_path)):
+                session.set_video_path(video_path)
+            self._sessions[video_path] = session
+        self._sessions.move_to_end(video_path)
+        if activate:
+            self.active = video_path
+        self.evict()
+        return session
+
+    def evict(self):
+        """Write back and drop least recently used sessions beyond max_resident"""
+        for video_path in list(self._sessions):
+            if len(self._sessions) <= self.max_resident:
+                break
+            if video_path == self.active:
+                continue
+            self.save_session(video_path)
+            del self._sessions[video_path]
+            print(f"[DEBUG] Project: evicted session for {os.path.basename(video_path)}")
+
+    def save_session(self, video_path):
+        session = self._sessions.get(video_path)
+        if session is None:
+            return
+        self.summaries[video_path] = summarize_blocks(session.blocks)
+        if session.blocks:
+            os.makedirs(self.sessions_dir, exist_ok=True)
+            session.save_state(self.session_path(video_path))
+
+    def label_totals(self):
+        """{label: {'count', 'duration', 'sources'}} across every source, from the summaries"""
+        for video_path in self._sessions:
+            # Resident sessions may have changed since they were summarized
+            self.summaries[video_path] = summarize_blocks(self._sessions[video_path].blocks)
+        totals = {}
+        for video_path in self.sources:
+            for label, stats in self.summaries.get(video_path, {}).get('labels', {}).items():
+                total = totals.setdefault(label, {'count': 0, 'duration': 0.0, 'sources': 0})
+                total['count'] += stats['count']
+                total['duration'] += stats['duration']
+                total['sources'] += 1
+        return totals
+
+    def save(self):
+        for video_path in list(self._sessions):
+            self.save_session(video_path)
+        data = {
+            'version': PROJECT_VERSION,
+            'active': self.active,
+            'sources': [
+                {'path': video_path, 'summary': self.summaries.get(video_path)}
+                for video_path in self.sources
+            ]
+        }
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    @classmethod
+    def load(cls, path, max_resident=MAX_RESIDENT_SESSIONS):
+        with open(path, 'r') as f:
+            data = json.load(f)
+        if data.get('version', PROJECT_VERSION) > PROJECT_VERSION:
+            raise ValueError(f"Project {path} was written by a newer version")
+        project = cls(path, max_resident)
+        for source in data.get('sources', []):
+            project.sources.append(source['path'])
+            if source.get('summary'):
+                project.summaries[source['path']] = source['summary']
+        project.active = data.get('active')
+        return project
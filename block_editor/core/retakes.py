@@ -0,0 +1,172 @@
+import numpy as np
+
+# Fingerprint frames; longer than the feature frames so every band has FFT
+# bins, and overlapping by half for finer timing
+FRAME_LENGTH = 512
+HOP_LENGTH = 256
+# Log-spaced bands over the range that carries the words
+BAND_EDGES = np.geomspace(200.0, 4000.0, 17)
+# A block's band energies are averaged into this many equal time steps, so
+# takes spoken at slightly different speeds line up
+TIME_STEPS = 16
+CHUNK_FRAMES = 8192
+# Added to band energies (about -70 dB below a full-scale tone) so that
+# near-silent bands don't dominate the fingerprint with leakage noise
+ENERGY_FLOOR = 1e-3
+# Shorter blocks (breaths, "um"s) resemble each other and are never retakes
+MIN_RETAKE_DURATION = 1.0
+# Takes of one line differ in length by at most this factor
+MAX_DURATION_RATIO = 1.5
+# Cosine similarity of fingerprints above which two blocks are takes of one line
+RETAKE_SIMILARITY = 0.8
+# Random-hyperplane LSH: blocks sharing all LSH_ROWS bits of any of the
+# LSH_BANDS signatures are compared. With these values a pair at the
+# similarity threshold becomes a candidate with probability ~0.9, while
+# unrelated blocks almost never do.
+LSH_BANDS = 32
+LSH_ROWS = 12
+# Buckets larger than this are degenerate (e.g. identical noise) and skipped
+MAX_BUCKET = 512
+# Candidate pairs compared at once
+VERIFY_CHUNK = 65536
+
+def band_energies(samples, sample_rate):
+    """Log energy per fingerprint frame and band, shape (frames, bands)"""
+    frame_count = max(0, (len(samples) - FRAME_LENGTH) // HOP_LENGTH + 1)
+    frequencies = np.fft.rfftfreq(FRAME_LENGTH, 1.0 / sample_rate)
+    band_of_bin = np.digitize(frequencies, BAND_EDGES) - 1
+    bands = len(BAND_EDGES) - 1
+    weights = np.zeros((len(frequencies), bands))
+    in_range = (band_of_bin >= 0) & (band_of_bin < bands)
+    weights[np.flatnonzero(in_range), band_of_bin[in_range]] = 1.0
+    window = np.hanning(FRAME_LENGTH).astype(np.float32)
+    energies = np.zeros((frame_count, bands))
+    for first in range(0, frame_count, CHUNK_FRAMES):
+        last = min(first + CHUNK_FRAMES, frame_count)
+        chunk = np.asarray(samples[first * HOP_LENGTH:(last - 1) * HOP_LENGTH + FRAME_LENGTH], dtype=np.float32)
+        frames = np.lib.stride_tricks.sliding_window_view(chunk, FRAME_LENGTH)[::HOP_LENGTH] * window
+        power = np.abs(np.fft.rfft(frames, axis=1)) ** 2
+        energies[first:last] = np.log10(power @ weights + ENERGY_FLOOR)
+    return energies
+
+def fingerprints(samples, sample_rate, blocks):
+    """Unit-length fingerprint of every block, shape (blocks, TIME_STEPS * bands).
+
+    The band energies are averaged into TIME_STEPS slices of the block, then
+    each band's mean is removed, so the fingerprint describes how the
+    spectrum moves through the block independently of level and microphone
+    coloration. Blocks without audio get a zero vector.
+    """
+    energies = band_energies(samples, sample_rate)
+    frame_count, bands = energies.shape
+    frame_seconds = HOP_LENGTH / sample_rate
+    starts = np.array([block.start for block in blocks], dtype=np.float64)
+    ends = np.array([block.end for block in blocks], dtype=np.float64)
+    first = np.clip(np.floor(starts / frame_seconds).astype(np.int64), 0, frame_count)
+    end = np.maximum(first, np.clip(np.ceil(ends / frame_seconds).astype(np.int64), 0, frame_count))
+
+    # Slice k of a block spans frames [bounds[k], bounds[k + 1])
+    steps = np.arange(TIME_STEPS + 1) / TIME_STEPS
+    bounds = first[:, None] + np.round(steps[None, :] * (end - first)[:, None]).astype(np.int64)
+    cumulative = np.concatenate((np.zeros((1, bands)), np.cumsum(energies, axis=0)))
+    sums = cumulative[bounds[:, 1:]] - cumulative[bounds[:, :-1]]
+    counts = (bounds[:, 1:] - bounds[:, :-1])[:, :, None]
+    sliced = np.where(counts > 0, sums / np.maximum(counts, 1), 0.0)
+    sliced -= sliced.mean(axis=1, keepdims=True)
+    vectors = sliced.reshape(len(blocks), TIME_STEPS * bands)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.where(norms > 0, vectors / np.maximum(norms, 1e-12), 0.0).astype(np.float32)
+
+class LSHIndex:
+    """Random-hyperplane locality-sensitive hashing of unit vectors.
+
+    Each vector gets `bands` signatures of `rows` sign bits; vectors whose
+    signatures agree in at least one band are candidate pairs. The chance
+    of that grows steeply with their cosine similarity, so only a small,
+    mostly relevant fraction of all pairs is ever compared.
+    """
+    def __init__(self, dimensions, bands=LSH_BANDS, rows=LSH_ROWS, seed=0):
+        rng = np.random.default_rng(seed)
+        self.bands = bands
+        self.rows = rows
+        self.planes = rng.standard_normal((dimensions, bands * rows))
+
+    def signatures(self, vectors):
+        """(vectors, bands) integer bucket keys"""
+        bits = (vectors @ self.planes > 0).reshape(len(vectors), self.bands, self.rows)
+        return bits @ (1 << np.arange(self.rows, dtype=np.int64))
+
+    def candidate_pairs(self, vectors):
+        """Unique (i, j) row pairs, i < j, that share a bucket in any band"""
+        keys = self.signatures(vectors)
+        pairs = []
+        for band in range(self.bands):
+            order = np.argsort(keys[:, band], kind='stable')
+            sorted_keys = keys[order, band]
+            starts = np.flatnonzero(np.concatenate(([True], sorted_keys[1:] != sorted_keys[:-1])))
+            sizes = np.diff(np.append(starts, len(order)))
+            if sizes.max() > MAX_BUCKET:
+                print(f"[DEBUG] LSHIndex: skipping buckets of more than {MAX_BUCKET} similar blocks")
+            bucket = np.repeat(np.where(sizes <= MAX_BUCKET, np.arange(len(sizes)), -1), sizes)
+            # Members of a bucket are adjacent in order, so pairing each
+            # position with the one `offset` later covers every pair
+            for offset in range(1, min(sizes.max(), MAX_BUCKET)):
+                same = (bucket[:-offset] == bucket[offset:]) & (bucket[:-offset] >= 0)
+                left, right = order[:-offset][same], order[offset:][same]
+                pairs.append(np.minimum(left, right) * len(vectors) + np.maximum(left, right))
+        if not pairs:
+            return np.zeros((0, 2), dtype=np.int64)
+        unique = np.unique(np.concatenate(pairs))
+        return np.stack(np.divmod(unique, len(vectors)), axis=1)
+
+def find_retakes(vectors, blocks, threshold=RETAKE_SIMILARITY):
+    """Groups of block indices that are takes of the same line, in timeline order.
+
+    vectors are the blocks' fingerprints. Silence and blocks shorter than
+    MIN_RETAKE_DURATION are ignored; similar pairs are joined transitively.
+    """
+    durations = np.array([block.end - block.start for block in blocks], dtype=np.float64)
+    speech = np.array([not block.is_silence for block in blocks], dtype=bool)
+    eligible = np.flatnonzero(speech & (durations >= MIN_RETAKE_DURATION) & (np.abs(vectors).sum(axis=1) > 0))
+    if len(eligible) < 2:
+        return []
+
+    candidates = vectors[eligible]
+    pairs = LSHIndex(candidates.shape[1]).candidate_pairs(candidates)
+    left, right = eligible[pairs[:, 0]], eligible[pairs[:, 1]]
+    similarity = np.empty(len(pairs))
+    for first in range(0, len(pairs), VERIFY_CHUNK):
+        last = first + VERIFY_CHUNK
+        similarity[first:last] = np.einsum('ij,ij->i', vectors[left[first:last]], vectors[right[first:last]])
+    ratio = np.maximum(durations[left], durations[right]) / np.minimum(durations[left], durations[right])
+    accepted = (similarity >= threshold) & (ratio <= MAX_DURATION_RATIO)
+
+    parent = {}
+
+    def root(index):
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+
+    for a, b in zip(left[accepted].tolist(), right[accepted].tolist()):
+        parent.setdefault(a, a)
+        parent.setdefault(b, b)
+        root_a, root_b = root(a), root(b)
+        if root_a != root_b:
+            parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    groups = {}
+    for index in parent:
+        groups.setdefault(root(index), []).append(index)
+    return sorted(sorted(group) for group in groups.values() if len(group) > 1)
+
+def label_retakes(blocks, groups, label):
+    """Label every take but the last of each group; returns the number of blocks labeled"""
+    labeled = 0
+    for group in groups:
+        for index in group[:-1]:
+            blocks[index].label = label
+            blocks[index].visited = True
+            labeled += 1
+    return labeled
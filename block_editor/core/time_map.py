@@ -0,0 +1,73 @@
+from bisect import bisect_right
+
+class TimeMap:
+    """Maps between original video time and the time of a concatenated proxy.
+
+    Each segment is (original_start, original_end, proxy_start). Segments are
+    contiguous in the proxy; positions that fall between segments in original
+    time snap forward to the next segment.
+    """
+    def __init__(self, segments=None):
+        self.segments = sorted(segments or [], key=lambda s: s[0])
+        self._original_starts = [s[0] for s in self.segments]
+        self._proxy_starts = [s[2] for s in self.segments]
+        if self.segments:
+            start, end, proxy_start = self.segments[-1]
+            self.proxy_duration = proxy_start + (end - start)
+        else:
+            self.proxy_duration = 0.0
+
+    @classmethod
+    def from_ranges(cls, ranges, durations=None):
+        """Build a map from (start, end) ranges laid end to end in the proxy.
+
+        durations optionally gives the measured proxy length of each range.
+        """
+        segments = []
+        proxy_pos = 0.0
+        for i, (start, end) in enumerate(ranges):
+            segments.append((start, end, proxy_pos))
+            proxy_pos += durations[i] if durations else end - start
+        time_map = cls(segments)
+        time_map.proxy_duration = proxy_pos
+        return time_map
+
+    @classmethod
+    def from_blocks(cls, blocks, min_duration=0.0):
+        ranges = [(block.start, block.end) for block in blocks
+                  if not block.is_silence and block.end - block.start >= min_duration]
+        return cls.from_ranges(ranges)
+
+    @property
+    def ranges(self):
+        return [(start, end) for start, end, _ in self.segments]
+
+    def to_proxy(self, position):
+        """Translate an original position (seconds) to proxy time"""
+        if not self.segments:
+            return position
+        i = bisect_right(self._original_starts, position) - 1
+        if i < 0:
+            return self.segments[0][2]
+        start, end, proxy_start = self.segments[i]
+        if position <= end:
+            return proxy_start + (position - start)
+        # In a gap: snap to the start of the next segment
+        if i + 1 < len(self.segments):
+            return self.segments[i + 1][2]
+        return proxy_start + (end - start)
+
+    def to_original(self, position):
+        """Translate a proxy position (seconds) back to original time"""
+        if not self.segments:
+            return position
+        i = max(0, bisect_right(self._proxy_starts, position) - 1)
+        start, end, proxy_start = self.segments[i]
+        return min(end, start + max(0.0, position - proxy_start))
+
+    def to_dict(self):
+        return {'segments': [list(segment) for segment in self.segments]}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls([tuple(segment) for segment in data['segments']])
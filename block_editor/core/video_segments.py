@@ -0,0 +1,53 @@
+from bisect import bisect_left, bisect_right
+from .audio_block import AudioBlock
+
+# Video boundaries closer than this to an existing boundary are dropped
+MIN_SEGMENT_DURATION = 1.0
+
+def merge_intervals(intervals, gap=0.0):
+    """Sorted (start, end) intervals with overlapping or nearly touching ones joined"""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1] + gap:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+def video_boundaries(cuts, freezes):
+    """Scene cuts plus the starts and ends of frozen stretches, sorted"""
+    points = set(cuts)
+    for start, end in freezes:
+        points.update((start, end))
+    return sorted(points)
+
+def merge_video_segments(blocks, cuts, freezes, min_duration=MIN_SEGMENT_DURATION):
+    """Split non-silence blocks at scene cuts and at the edges of frozen video.
+
+    Screen recordings and B-roll under music rarely go silent, so audio
+    detection leaves them as one long block; the video boundaries divide it
+    into shots and static stretches. A boundary is kept only if it is at
+    least min_duration from the block edges and from the previous kept
+    boundary. Silence blocks are left whole. Pieces keep the block's label
+    and visited state.
+    """
+    points = video_boundaries(cuts, freezes)
+    merged = []
+    for block in blocks:
+        if block.is_silence:
+            merged.append(block)
+            continue
+        edges = [block.start]
+        for point in points[bisect_right(points, block.start):bisect_left(points, block.end)]:
+            if point - edges[-1] >= min_duration and block.end - point >= min_duration:
+                edges.append(point)
+        edges.append(block.end)
+        if len(edges) == 2:
+            merged.append(block)
+            continue
+        for start, end in zip(edges, edges[1:]):
+            piece = AudioBlock(start, end, False)
+            piece.label = block.label
+            piece.visited = block.visited
+            merged.append(piece)
+    return merged
@@ -1,15 +1,24 @@
 """
 GUI components for the Video Block Editor.
+
+Names are imported on first access, so importing one module (or the
+package) does not load the whole GUI and its media stack.
 """
 
-from .video_player import VideoPlayer
-from .custom_widgets import CustomSlider, BlockTimeline
-from .dialogs import LabelDialog, PreviewDialog
-
-__all__ = [
-    'VideoPlayer',
-    'CustomSlider',
-    'BlockTimeline',
-    'LabelDialog',
-    'PreviewDialog'
-]
+from importlib import import_module
+
+_EXPORTS = {
+    'VideoPlayer': '.video_player',
+    'CustomSlider': '.custom_widgets',
+    'BlockTimeline': '.custom_widgets',
+    'LabelDialog': '.dialogs',
+    'PreviewDialog': '.dialogs',
+    'MediaDeck': '.media_deck'
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(_EXPORTS[name], __name__), name)
@@ -76,8 +76,7 @@ class BlockTimeline(QWidget):
         
         if clicked_block_index is not None:
             # Update position in media player
-            self.video_player.media_player.setPosition(int(self.blocks[clicked_block_index].start * 1000))
-            self.video_player.current_block_index = clicked_block_index
+            self.video_player.seek_to(self.blocks[clicked_block_index].start, clicked_block_index)
 
     def paintEvent(self, event):
         if not self.blocks or self.total_duration == 0:
@@ -116,8 +115,7 @@ class BlockTimeline(QWidget):
                     # Use the label's color if one is assigned
                     label = self.video_player.label_manager.get_label(block.label)
                     if label:
-                        color = label.color
-                        color.setAlpha(100)
+                        color = QColor(*label.color.with_alpha(100).rgba())
                     else:
                         color = QColor(150, 150, 150, 100)
                 else:
@@ -2,15 +2,19 @@ from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QFormLayout, QLabel, 
     QPushButton, QLineEdit, QListWidget, QListWidgetItem,
     QColorDialog, QMessageBox, QGroupBox, QCheckBox, QProgressDialog,
-    QFileDialog, QDoubleSpinBox, QWidget, QSizePolicy
+    QFileDialog, QDoubleSpinBox, QWidget, QSizePolicy, QComboBox
 )
 from PySide6.QtCore import Signal, Qt, QTimer
 from PySide6.QtGui import QColor
 from .custom_widgets import CustomSlider
+from ..core.color import Color
 from ..core.label_manager import Label
-import subprocess
+from ..utils.exporter import EXPORT_MODES, LOUDNESS_TARGET
 import os
 
+# Fire preview transitions slightly early to absorb timer and seek latency
+PREVIEW_LEAD_MS = 15
+
 class LabelDialog(QDialog):
     labels_changed = Signal()
     
@@ -66,7 +70,7 @@ class LabelDialog(QDialog):
         name = self.name_edit.text().strip()
         hotkey = self.hotkey_edit.text().strip()
         if name and hotkey:
-            label = Label(name, self.current_color, hotkey)
+            label = Label(name, Color(*self.current_color.getRgb()), hotkey)
             self.label_manager.add_label(label)
             self.label_manager.save_labels()
             self.update_label_list()
@@ -115,6 +119,21 @@ class SilenceSettingsDialog(QDialog):
         form.addRow("Non-silence Buffer:", self.buffer_spin)
         
         layout.addLayout(form)
+
+        # Screen recordings and music beds rarely go silent; cut them at shot changes instead
+        self.video_cuts_check = QCheckBox("Also split at scene changes and frozen video")
+        layout.addWidget(self.video_cuts_check)
+
+        # Editing proxy options
+        proxy_group = QGroupBox("Playback")
+        proxy_layout = QVBoxLayout(proxy_group)
+        self.editing_proxy_check = QCheckBox("Use a low-resolution proxy for heavy sources")
+        self.editing_proxy_check.setChecked(True)
+        self.wait_for_proxy_check = QCheckBox("Wait for the proxy before playback")
+        self.editing_proxy_check.toggled.connect(self.wait_for_proxy_check.setEnabled)
+        proxy_layout.addWidget(self.editing_proxy_check)
+        proxy_layout.addWidget(self.wait_for_proxy_check)
+        layout.addWidget(proxy_group)
         
         # Buttons
         button_box = QHBoxLayout()
@@ -131,7 +150,10 @@ class SilenceSettingsDialog(QDialog):
         return {
             'threshold': self.threshold_spin.value(),
             'duration': self.duration_spin.value(),
-            'buffer': self.buffer_spin.value()
+            'buffer': self.buffer_spin.value(),
+            'video_cuts': self.video_cuts_check.isChecked(),
+            'editing_proxy': self.editing_proxy_check.isChecked(),
+            'wait_for_proxy': self.wait_for_proxy_check.isChecked()
         }
 
 class PreviewDialog(QDialog):
@@ -162,6 +184,20 @@ class PreviewDialog(QDialog):
         label_group.setLayout(label_group_layout)
         layout.addWidget(label_group)
         
+        # Review queue: the selected blocks ordered by an acoustic feature
+        # Imported here so the editor starts without loading numpy
+        from ..core.features import REVIEW_ORDERS
+        order_layout = QHBoxLayout()
+        order_layout.addWidget(QLabel("Review order:"))
+        self.order_combo = QComboBox()
+        self.order_combo.addItems(list(REVIEW_ORDERS))
+        self.order_combo.currentIndexChanged.connect(self.update_block_list)
+        if self.block_manager.features is None:
+            self.order_combo.setEnabled(False)
+            self.order_combo.setToolTip("Block features are still being computed")
+        order_layout.addWidget(self.order_combo)
+        layout.addLayout(order_layout)
+
         # Block list and preview controls
         list_preview_layout = QHBoxLayout()
         
@@ -185,6 +221,14 @@ class PreviewDialog(QDialog):
         self.stop_preview_button.setEnabled(False)
         controls_layout.addWidget(self.stop_preview_button)
         
+        self.export_mode_combo = QComboBox()
+        for mode, name in EXPORT_MODES.items():
+            self.export_mode_combo.addItem(name, mode)
+        controls_layout.addWidget(self.export_mode_combo)
+
+        self.normalize_check = QCheckBox(f"Normalize loudness ({LOUDNESS_TARGET:g} LUFS)")
+        controls_layout.addWidget(self.normalize_check)
+
         self.export_button = QPushButton("Export Selected Labels")
         self.export_button.clicked.connect(self.export_selected)
         controls_layout.addWidget(self.export_button)
@@ -194,28 +238,55 @@ class PreviewDialog(QDialog):
         
         layout.addLayout(list_preview_layout)
         
-        # Preview state
-        self.preview_blocks = []
+        # Preview state: a playlist of (block_index, start, end) ranges
+        self.preview_playlist = []
         self.current_preview_index = 0
-        self.preview_timer = QTimer()
-        self.preview_timer.timeout.connect(self.check_preview_position)
+        self.block_rows = {}  # block index -> row in block_list
+        self.highlighted_row = None
+        self.preview_timer = QTimer(self)
+        self.preview_timer.setSingleShot(True)
+        self.preview_timer.setTimerType(Qt.PreciseTimer)
+        self.preview_timer.timeout.connect(self.advance_preview)
         
         # Initial update
         self.update_block_list()
 
+    def review_feature(self):
+        """(feature, descending) the block list is ordered by, or None for timeline order"""
+        from ..core.features import REVIEW_ORDERS
+        if self.block_manager.features is None:
+            return None
+        return REVIEW_ORDERS[self.order_combo.currentText()]
+
+    def selected_blocks(self):
+        """Return (index, block) pairs of visited blocks matching the selected labels, in review order"""
+        selected_labels = [name for name, cb in self.label_checkboxes.items() if cb.isChecked()]
+        blocks = self.block_manager.blocks
+        indices = [
+            i for i, block in enumerate(blocks)
+            if not block.is_silence and block.visited
+            and (not selected_labels or (block.label and block.label in selected_labels))
+        ]
+        if self.review_feature() is not None:
+            indices = self.block_manager.features.review_queue(indices, self.order_combo.currentText())
+        return [(i, blocks[i]) for i in indices]
+
     def update_block_list(self):
         self.block_list.clear()
-        selected_labels = [name for name, cb in self.label_checkboxes.items() if cb.isChecked()]
-        
-        for i, block in enumerate(self.block_manager.blocks):
-            if not block.is_silence and block.visited:
-                if not selected_labels or (block.label and block.label in selected_labels):
-                    duration = block.end - block.start
-                    label_text = block.label if block.label else "No Label"
-                    item_text = f"Block {i}: {duration:.2f}s - {label_text}"
-                    item = QListWidgetItem(item_text)
-                    item.setData(Qt.UserRole, i)  # Store block index
-                    self.block_list.addItem(item)
+        self.block_rows = {}
+        self.highlighted_row = None
+        feature = self.review_feature()
+        
+        for i, block in self.selected_blocks():
+            duration = block.end - block.start
+            label_text = block.label if block.label else "No Label"
+            item_text = f"Block {i}: {duration:.2f}s - {label_text}"
+            if feature is not None and feature[0] != 'duration':
+                item_text += f" ({feature[0]} {self.block_manager.features[feature[0]][i]:.3g})"
+            item = QListWidgetItem(item_text)
+            item.setData(Qt.UserRole, i)  # Store block index
+            self.block_rows[i] = self.block_list.count()
+            self.block_list.addItem(item)
 
     def jump_to_block(self, item):
         block_index = item.data(Qt.UserRole)
@@ -223,8 +294,7 @@ class PreviewDialog(QDialog):
             block = self.block_manager.blocks[block_index]
             parent = self.parent()
             if parent:
-                parent.media_player.setPosition(int(block.start * 1000))
-                parent.current_block_index = block_index
+                parent.seek_to(block.start, block_index)
 
     def toggle_preview(self, checked):
         if checked:
@@ -233,16 +303,10 @@ class PreviewDialog(QDialog):
             self.stop_preview()
 
     def start_preview(self):
-        # Get blocks for selected labels
-        selected_labels = [name for name, cb in self.label_checkboxes.items() if cb.isChecked()]
-        self.preview_blocks = []
-        
-        for i, block in enumerate(self.block_manager.blocks):
-            if not block.is_silence and block.visited:
-                if not selected_labels or (block.label and block.label in selected_labels):
-                    self.preview_blocks.append((i, block))
+        # Precompute the playlist for the selected labels
+        self.preview_playlist = [(i, block.start, block.end) for i, block in self.selected_blocks()]
         
-        if not self.preview_blocks:
+        if not self.preview_playlist:
             self.preview_button.setChecked(False)
             return
             
@@ -255,15 +319,17 @@ class PreviewDialog(QDialog):
             # Only hide the button container
             parent.button_container.hide()
             parent.toggle_controls_button.hide()
+
+            # The playlist already excludes silence, so don't let the player skip too
+            parent.skipping = False
+            parent.skip_timer.stop()
             
             # Start playback
-            block_index, block = self.preview_blocks[0]
-            parent.media_player.setPosition(int(block.start * 1000))
-            parent.current_block_index = block_index
+            block_index, start, _ = self.preview_playlist[0]
+            parent.seek_to(start, block_index)
             parent.media_player.play()
-            
-            # Start checking position
-            self.preview_timer.start(100)
+            self.highlight_playing_block(0)
+            self.schedule_preview_transition(start)
             
             # Add return button
             self.return_button = QPushButton("Return to Editor", parent)
@@ -319,42 +385,72 @@ class PreviewDialog(QDialog):
                     timeline_container.layout().insertWidget(0, parent.timeline_slider)
             
         # Clear highlight
-        for i in range(self.block_list.count()):
-            item = self.block_list.item(i)
-            item.setBackground(Qt.transparent)
+        self.highlight_playing_block(-1)
 
-    def check_preview_position(self):
+    def schedule_preview_transition(self, position):
+        """Arm the preview timer for the end of the current playlist range"""
         parent = self.parent()
-        if not parent or not self.preview_blocks:
+        if not parent or not self.preview_playlist:
+            return
+        _, _, end = self.preview_playlist[self.current_preview_index]
+        rate = parent.media_player.playbackRate() or 1.0
+        remaining_ms = (end - position) * 1000 / rate
+        self.preview_timer.start(max(0, int(remaining_ms) - PREVIEW_LEAD_MS))
+
+    def advance_preview(self):
+        parent = self.parent()
+        if not parent or not self.preview_playlist:
             return
             
-        current_position = parent.media_player.position() / 1000.0
-        _, current_block = self.preview_blocks[self.current_preview_index]
-        
-        # If we've reached the end of current block
-        if current_position >= current_block.end:
-            self.current_preview_index += 1
-            
-            # If there are more blocks to play
-            if self.current_preview_index < len(self.preview_blocks):
-                block_index, next_block = self.preview_blocks[self.current_preview_index]
-                parent.media_player.setPosition(int(next_block.start * 1000))
-                parent.current_block_index = block_index
-                self.highlight_playing_block(self.current_preview_index)
+        current_position = parent.current_position()
+        _, start, end = self.preview_playlist[self.current_preview_index]
+
+        # Timer fired before the range really ended (e.g. the seek was slow)
+        if current_position < end - 2 * PREVIEW_LEAD_MS / 1000.0:
+            self.schedule_preview_transition(max(current_position, start))
+            return
+
+        self.current_preview_index += 1
+        
+        # If there are more blocks to play
+        if self.current_preview_index < len(self.preview_playlist):
+            block_index, next_start, _ = self.preview_playlist[self.current_preview_index]
+            if abs(next_start - end) * 1000 > PREVIEW_LEAD_MS:
+                # The player has the next range pre-seeked when gapless jumps are on
+                parent.seek_to(next_start, block_index)
             else:
-                # End of preview
-                self.stop_preview()
+                # Contiguous ranges play straight through
+                parent.current_block_index = block_index
+                parent.preload_next_jump()
+            self.highlight_playing_block(self.current_preview_index)
+            self.schedule_preview_transition(max(current_position, next_start))
+        else:
+            # End of preview
+            self.stop_preview()
+
+    def next_preview_block(self):
+        """Return the (index, start, end) range the running preview will jump to next, if any"""
+        if not self.preview_button.isChecked():
+            return None
+        next_index = self.current_preview_index + 1
+        if 0 <= next_index < len(self.preview_playlist):
+            return self.preview_playlist[next_index]
+        return None
 
     def highlight_playing_block(self, preview_index):
-        # Clear previous highlights
-        for i in range(self.block_list.count()):
-            item = self.block_list.item(i)
-            item.setBackground(Qt.transparent)
+        # Only the previously highlighted row and the new one change
+        if self.highlighted_row is not None:
+            item = self.block_list.item(self.highlighted_row)
+            if item:
+                item.setBackground(Qt.transparent)
+            self.highlighted_row = None
             
         # Highlight current block
-        if 0 <= preview_index < self.block_list.count():
-            item = self.block_list.item(preview_index)
-            item.setBackground(QColor(200, 200, 255))
+        if 0 <= preview_index < len(self.preview_playlist):
+            row = self.block_rows.get(self.preview_playlist[preview_index][0])
+            if row is not None:
+                self.block_list.item(row).setBackground(QColor(200, 200, 255))
+                self.highlighted_row = row
 
     def export_selected(self):
         if not self.block_manager.video_path or not self.block_manager.blocks:
@@ -365,114 +461,23 @@ class PreviewDialog(QDialog):
             QMessageBox.warning(self, "Export Error", "Please select at least one label to export!")
             return
 
-        try:
-            output_dir = QFileDialog.getExistingDirectory(self, "Select Output Directory")
-            if not output_dir:
-                return
-
-            props = self.parent().get_video_properties(self.block_manager.video_path)
-            
-            # Create temporary directory for segments
-            temp_dir = os.path.abspath("temp_segments")
-            os.makedirs(temp_dir, exist_ok=True)
-
-            for label_name in selected_labels:
-                # Get blocks for this label and sort them by start time
-                label_blocks = [(i, block) for i, block in enumerate(self.block_manager.blocks) 
-                              if block.label == label_name]
-                label_blocks.sort(key=lambda x: x[1].start)  # Sort by block start time
-                
-                if not label_blocks:
-                    print(f"[DEBUG] No blocks found for label: {label_name}")
-                    continue
-
-                # Create segments list file for this label
-                segments_file = os.path.join(temp_dir, f"segments_{label_name}.txt")
-                with open(segments_file, "w") as f:
-                    buffer_duration = 0.3  # Buffer duration in seconds
-                    
-                    for idx, (_, block) in enumerate(label_blocks):
-                        # Extract segment
-                        segment_name = f"segment_{label_name}_{idx}.mp4"
-                        segment_path = os.path.join(temp_dir, segment_name)
-                        
-                        # Calculate buffered start and end times
-                        buffered_start = max(0, block.start - buffer_duration)
-                        buffered_end = block.end + buffer_duration
-                        
-                        # Adjust for overlaps with previous block
-                        if idx > 0:
-                            prev_block = label_blocks[idx-1][1]
-                            prev_end = prev_block.end + buffer_duration
-                            if buffered_start < prev_end:
-                                # Find midpoint between blocks for clean separation
-                                midpoint = (prev_block.end + block.start) / 2
-                                buffered_start = midpoint
-                        
-                        # Adjust for overlaps with next block
-                        if idx < len(label_blocks) - 1:
-                            next_block = label_blocks[idx+1][1]
-                            if buffered_end > next_block.start - buffer_duration:
-                                # Find midpoint between blocks for clean separation
-                                midpoint = (block.end + next_block.start) / 2
-                                buffered_end = midpoint
-                        
-                        # Calculate final duration
-                        duration = buffered_end - buffered_start
-                        if duration < 0.1:  # Ensure minimum duration
-                            print(f"[DEBUG] Warning: Block {idx} duration too short ({duration}s), adjusting to 0.1s")
-                            duration = 0.1
-                            buffered_end = buffered_start + duration
-                        
-                        start_time = str(round(buffered_start, 3))
-                        duration_str = str(round(duration, 3))
-                        
-                        print(f"[DEBUG] Extracting segment {idx} for {label_name}:")
-                        print(f"[DEBUG]   Original: {str(round(block.start, 3))}s to {str(round(block.end, 3))}s")
-                        print(f"[DEBUG]   Buffered: {start_time}s to {str(round(buffered_end, 3))}s")
-                        
-                        # Cut segment using ffmpeg
-                        subprocess.run([
-                            "ffmpeg", "-y",
-                            "-ss", start_time,
-                            "-t", duration_str,
-                            "-i", self.block_manager.video_path,
-                            "-c:v", props['video_codec'],
-                            "-c:a", props['audio_codec'],
-                            "-copyts",
-                            "-avoid_negative_ts", "make_zero",
-                            segment_path
-                        ], check=True)
-                        
-                        # Write absolute path to segments file
-                        f.write(f"file '{os.path.abspath(segment_path)}'\n")
-
-                # Concatenate segments for this label
-                output_path = os.path.join(output_dir, f"{label_name}_blocks.mp4")
-                subprocess.run([
-                    "ffmpeg", "-y",
-                    "-f", "concat",
-                    "-safe", "0",
-                    "-i", segments_file,
-                    "-c:v", props['video_codec'],
-                    "-c:a", props['audio_codec'],
-                    output_path
-                ], check=True)
+        output_dir = QFileDialog.getExistingDirectory(self, "Select Output Directory")
+        if not output_dir:
+            return
 
-            QMessageBox.information(self, "Export Complete", "Selected labels have been exported successfully!")
+        blocks_by_label = {}
+        output_paths = {}
+        for label_name in selected_labels:
+            label_blocks = [block for block in self.block_manager.blocks if block.label == label_name]
+            if not label_blocks:
+                print(f"[DEBUG] No blocks found for label: {label_name}")
+                continue
+            blocks_by_label[label_name] = label_blocks
+            output_paths[label_name] = os.path.join(output_dir, f"{label_name}_blocks.mp4")
+        if not blocks_by_label:
+            return
 
-        except Exception as e:
-            QMessageBox.critical(self, "Export Error", f"An error occurred during export: {e}")
-            print(f"[DEBUG] Export error: {str(e)}")
-        finally:
-            # Clean up temporary files
-            if os.path.exists(temp_dir):
-                for file in os.listdir(temp_dir):
-                    try:
-                        os.remove(os.path.join(temp_dir, file))
-                    except Exception as e:
-                        print(f"[DEBUG] Error removing temp file {file}: {e}")
-                try:
-                    os.rmdir(temp_dir)
-                except Exception as e:
-                    print(f"[DEBUG] Error removing temp directory: {e}")
+        # The main window's queue runs the export so editing can continue
+        loudness_target = LOUDNESS_TARGET if self.normalize_check.isChecked() else None
+        self.parent().queue_export(blocks_by_label, output_paths, self.export_mode_combo.currentData(),
+                                   loudness_target)
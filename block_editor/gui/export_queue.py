@@ -0,0 +1,142 @@
+import copy
+import tempfile
+from PySide6.QtCore import QObject, Signal
+
+from ..utils.exporter import VideoExporter, get_video_properties
+from ..utils.segment_cache import SegmentCache
+from ..utils import toolchain
+from .workers import Worker
+
+class ExportJob:
+    """One queued export: a snapshot of the blocks to write for each label"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    def __init__(self, video_path, blocks_by_label, output_paths, mode, loudness_target=None):
+        self.video_path = video_path
+        # Copy the blocks so relabeling while the job waits does not change it
+        self.blocks_by_label = {
+            label_name: [copy.copy(block) for block in blocks]
+            for label_name, blocks in blocks_by_label.items()
+        }
+        self.output_paths = dict(output_paths)
+        self.mode = mode
+        self.loudness_target = loudness_target
+        self.status = self.QUEUED
+        self.progress = 0.0
+        self.elapsed = None
+        self.error = None
+        self.exporter = None
+
+    @property
+    def description(self):
+        return ", ".join(self.blocks_by_label)
+
+    @property
+    def finished(self):
+        return self.status in (self.DONE, self.FAILED, self.CANCELLED)
+
+class ExportQueue(QObject):
+    """Runs export jobs one at a time off the GUI thread.
+
+    The queue is owned by the main window, so jobs keep running after the
+    dialog that queued them is closed.
+    """
+    job_added = Signal(object)
+    job_progress = Signal(object)
+    job_finished = Signal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.jobs = []
+        self.current = None
+        self.worker = None
+
+    def pending(self):
+        return [job for job in self.jobs if not job.finished]
+
+    def submit(self, job):
+        self.jobs.append(job)
+        self.job_added.emit(job)
+        self.start_next()
+        return job
+
+    def start_next(self):
+        if self.current is not None:
+            return
+        job = next((job for job in self.jobs if job.status == ExportJob.QUEUED), None)
+        if job is None:
+            return
+
+        def run_export():
+            exporter = VideoExporter(
+                job.video_path,
+                get_video_properties(job.video_path),
+                tempfile.mkdtemp(prefix="video_editor_export_"),
+                mode=job.mode,
+                segment_cache=SegmentCache(),
+                loudness_target=job.loudness_target,
+                toolchain=toolchain.current(),
+                progress_callback=lambda fraction: worker.progress.emit(int(fraction * 1000), 1000)
+            )
+            job.exporter = exporter
+            if job.status == ExportJob.CANCELLED:
+                # Cancelled while the exporter was being set up
+                exporter.abort()
+            try:
+                return exporter.export_labels(job.blocks_by_label, job.output_paths)
+            finally:
+                exporter.cleanup()
+
+        # Bound slots, so the signals from the export threads are queued to this thread
+        worker = Worker(run_export, parent=self)
+        worker.progress.connect(self.current_progress)
+        worker.result_ready.connect(self.current_done)
+        worker.failed.connect(self.current_failed)
+        job.status = ExportJob.RUNNING
+        self.current = job
+        self.worker = worker
+        worker.start()
+
+    def current_progress(self, done, total):
+        if self.current is not None:
+            self.current.progress = done / total
+            self.job_progress.emit(self.current)
+
+    def current_done(self, elapsed):
+        self.finish(self.current, ExportJob.DONE, elapsed=elapsed)
+
+    def current_failed(self, error):
+        self.finish(self.current, ExportJob.FAILED, error=error)
+
+    def cancel(self, job):
+        """Drop a queued job, or kill a running one's ffmpeg processes"""
+        if job.finished:
+            return
+        if job.status == ExportJob.QUEUED:
+            job.status = ExportJob.CANCELLED
+            self.job_finished.emit(job)
+            return
+        job.status = ExportJob.CANCELLED
+        if job.exporter is not None:
+            job.exporter.abort()
+
+    def cancel_all(self):
+        for job in self.pending():
+            self.cancel(job)
+
+    def finish(self, job, status, elapsed=None, error=None):
+        if job.status != ExportJob.CANCELLED:
+            job.status = status
+            job.elapsed = elapsed
+            job.error = error
+            if status == ExportJob.DONE:
+                job.progress = 1.0
+        job.exporter = None
+        self.current = None
+        self.worker = None
+        self.job_finished.emit(job)
+        self.start_next()
@@ -0,0 +1,144 @@
+from PySide6.QtWidgets import QStackedWidget
+from PySide6.QtCore import QObject, Signal, QUrl
+from PySide6.QtMultimedia import QMediaPlayer, QAudioOutput
+from PySide6.QtMultimediaWidgets import QVideoWidget
+
+# How close (in ms) a jump target must be to the standby player's pre-seek to swap
+SWAP_TOLERANCE_MS = 40
+
+class MediaDeck(QObject):
+    """Two media players sharing one source, so a jump can swap to a pre-seeked player.
+
+    Only the active player is shown and audible. When gapless mode is on, the
+    standby player is kept paused at the predicted next jump target; jumping
+    there swaps the players instead of seeking the active one.
+    """
+    positionChanged = Signal(int)
+    durationChanged = Signal(int)
+    playbackStateChanged = Signal(object)
+    activePlayerChanged = Signal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.widget = QStackedWidget()
+        self.players = []
+        self.audio_outputs = []
+        self.video_widgets = []
+        self.active_index = 0
+        self.gapless = False
+        self.source = None
+        self.standby_target = None
+        self.volume = 1.0
+
+        for i in range(2):
+            player = QMediaPlayer()
+            audio_output = QAudioOutput()
+            video_widget = QVideoWidget()
+            video_widget.setStyleSheet("background-color: #1a1a1a;")
+            player.setAudioOutput(audio_output)
+            player.setVideoOutput(video_widget)
+
+            # Forward signals from whichever player is currently active
+            player.positionChanged.connect(lambda position, p=player: self._forward(p, self.positionChanged, position))
+            player.durationChanged.connect(lambda duration, p=player: self._forward(p, self.durationChanged, duration))
+            player.playbackStateChanged.connect(lambda state, p=player: self._forward(p, self.playbackStateChanged, state))
+
+            self.players.append(player)
+            self.audio_outputs.append(audio_output)
+            self.video_widgets.append(video_widget)
+            self.widget.addWidget(video_widget)
+
+        self.audio_outputs[1].setMuted(True)
+        self.widget.setCurrentIndex(0)
+
+    @property
+    def player(self):
+        return self.players[self.active_index]
+
+    @property
+    def audio_output(self):
+        return self.audio_outputs[self.active_index]
+
+    @property
+    def standby(self):
+        return self.players[1 - self.active_index]
+
+    def is_playing(self):
+        return self.player.playbackState() == QMediaPlayer.PlayingState
+
+    def _forward(self, player, signal, value):
+        if player is self.player:
+            signal.emit(value)
+
+    def setSource(self, url):
+        """Load a source on the active player, and on the standby one in gapless mode"""
+        self.source = url
+        self.standby_target = None
+        self.player.setSource(url)
+        if self.gapless:
+            self.standby.setSource(url)
+        else:
+            self.standby.setSource(QUrl())
+
+    def set_gapless(self, enabled):
+        self.gapless = enabled
+        self.standby_target = None
+        if enabled and self.source is not None:
+            self.standby.setSource(self.source)
+        elif not enabled:
+            self.standby.stop()
+            self.standby.setSource(QUrl())
+
+    def set_volume(self, volume):
+        self.volume = volume
+        self.audio_output.setVolume(volume)
+        self.audio_output.setMuted(False)
+
+    def preload(self, position_ms):
+        """Pre-seek the standby player to the predicted next jump target"""
+        if not self.gapless or position_ms is None or self.source is None:
+            return
+        position_ms = int(position_ms)
+        if self.standby_target == position_ms:
+            return
+        self.standby_target = position_ms
+        standby = self.standby
+        standby.setPosition(position_ms)
+        if standby.playbackState() != QMediaPlayer.PausedState:
+            standby.pause()
+
+    def standby_ready(self, position_ms):
+        if not self.gapless or self.standby_target is None:
+            return False
+        if abs(self.standby_target - int(position_ms)) > SWAP_TOLERANCE_MS:
+            return False
+        return self.standby.mediaStatus() in (
+            QMediaPlayer.LoadedMedia, QMediaPlayer.BufferedMedia, QMediaPlayer.BufferingMedia
+        )
+
+    def jump(self, position_ms):
+        """Move playback to position_ms, swapping players when the standby is ready.
+
+        Returns True when the players were swapped.
+        """
+        if not self.standby_ready(position_ms):
+            self.player.setPosition(int(position_ms))
+            return False
+
+        old_index = self.active_index
+        was_playing = self.player.playbackState() == QMediaPlayer.PlayingState
+        self.active_index = 1 - old_index
+        self.standby_target = None
+
+        # Bring up the pre-seeked player before silencing the old one
+        self.audio_outputs[self.active_index].setVolume(self.volume)
+        self.audio_outputs[self.active_index].setMuted(False)
+        if was_playing:
+            self.player.play()
+        self.widget.setCurrentIndex(self.active_index)
+        self.audio_outputs[old_index].setMuted(True)
+        self.players[old_index].pause()
+
+        self.activePlayerChanged.emit(self.player)
+        self.positionChanged.emit(self.player.position())
+        return True
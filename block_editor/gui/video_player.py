@@ -5,23 +5,41 @@ import json
 from PySide6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
     QSlider, QPushButton, QFileDialog, QLabel, QMessageBox, QProgressBar,
-    QGroupBox, QProgressDialog, QSizePolicy, QScrollArea, QDialog, QApplication
+    QGroupBox, QProgressDialog, QSizePolicy, QScrollArea, QDialog, QApplication, QComboBox
 )
 from PySide6.QtGui import QShortcut, QKeySequence
 from PySide6.QtCore import Qt, QTimer, QUrl
-from PySide6.QtMultimedia import QMediaPlayer, QAudioOutput
-from PySide6.QtMultimediaWidgets import QVideoWidget
 
 from ..core.block_manager import BlockManager
 from ..core.label_manager import LabelManager
+from ..core.project import Project
+from ..core.time_map import TimeMap
+from ..utils.speech_proxy import SpeechProxyRenderer
+from ..utils.editing_proxy import EditingProxy, PROXY_HEIGHT
+from ..utils.exporter import get_video_properties
+from ..utils.prefetcher import Prefetcher
+from ..utils import ffmpeg_scheduler
 from .custom_widgets import CustomSlider, BlockTimeline
+from .workers import Worker
+from .export_queue import ExportQueue, ExportJob
 from .dialogs import LabelDialog, PreviewDialog, SilenceSettingsDialog
 
+# Fire the skip timer slightly before a boundary to absorb timer and seek latency
+SKIP_LEAD_MS = 15
+# Blocks shorter than this are skipped during playback
+MIN_PLAYABLE_DURATION = 0.3
+# Label given to every take of a repeated line but the last
+RETAKE_LABEL = "remove"
+# Block edits within this long of each other update the speech-only proxy once
+SPEECH_PROXY_REFRESH_DELAY_MS = 1000
+
 class VideoPlayer(QMainWindow):
     def __init__(self, debug=False):
         super().__init__()
         self.debug = debug
         self.block_manager = BlockManager()
+        # Multi-video project; block_manager is then the active source's session
+        self.project = None
         self.current_block_index = 0
         self.last_jumped_block_index = 0
         self.label_manager = LabelManager()
@@ -29,35 +47,77 @@ class VideoPlayer(QMainWindow):
         self.label_shortcuts = {}
 
         # Initialize UI components to None
+        self.media_deck = None
         self.media_player = None
         self.audio_output = None
         self.video_widget = None
+        self.video_container = None
+        self.preview_dialog = None
         self.timeline_slider = None
         self.block_timeline = None
         self.progress_bar = None
         self.mode_label = None
+        self.status_label = None
         self.skip_timer = None
+        self.skipping = False
+        self.skip_block_index = None
+        self.jump_forward = True
+
+        # Speech-only review: the proxy being played and its time map (None = original)
+        self.time_map = None
+        self.speech_proxy_worker = None
+        self.speech_proxy_timer = None
+        self.speech_proxy_stale = False  # Blocks changed while the proxy was rendering
+
+        # File the player reads for original-time playback: the source or its editing proxy
+        self.playback_path = None
+        self.editing_proxy_worker = None
+        self.feature_worker = None
+        self.retake_worker = None
+        self.waiting_for_proxy = False
+
+        # Analyzes the next files while this one is edited; paused during playback
+        self.prefetcher = Prefetcher()
+        self.holding_prefetch = False
+
+        # Exports run in the background and outlive the preview dialog
+        self.export_queue = ExportQueue(self)
+        self.export_row = None
+        self.export_status_label = None
+        self.export_progress_bar = None
+        self.cancel_export_button = None
 
         # Initialize control buttons to None
         self.toggle_controls_button = None
         self.button_container = None
         self.play_pause_button = None
+        self.gapless_button = None
+        self.speech_only_button = None
         self.prev_block_button = None
         self.next_block_button = None
         self.open_file_button = None
+        self.open_project_button = None
+        self.add_videos_button = None
+        self.source_combo = None
+        self.project_totals_label = None
         self.save_state_button = None
         self.load_state_button = None
         self.reset_blocks_button = None
+        self.retakes_button = None
         self.export_button = None
         self.preview_button = None
         self.zoom_in_button = None
         self.zoom_out_button = None
         self.help_button = None
 
-        # Initialize UI
+        # Initialize UI; the media stack and the welcome screen follow in start()
         self.init_ui()
         self.setup_shortcuts()
         self.set_initial_button_states()
+
+    def start(self):
+        """Finish startup once the window is on screen"""
+        self.init_media()
         self.show_welcome_screen()
 
     def set_initial_button_states(self):
@@ -71,7 +131,8 @@ class VideoPlayer(QMainWindow):
             self.preview_button,
             self.zoom_in_button,
             self.zoom_out_button,
-            self.reset_blocks_button
+            self.reset_blocks_button,
+            self.retakes_button
         ]
         
         for button in buttons_requiring_video:
@@ -100,7 +161,11 @@ class VideoPlayer(QMainWindow):
             if self.debug:
                 print(f"[DEBUG] load_video: Loading video from {video_path}")
                 
-            self.media_player.setSource(QUrl.fromLocalFile(video_path))
+            self.time_map = None
+            self.playback_path = video_path
+            self.waiting_for_proxy = False
+            self.set_status(None)
+            self.media_deck.setSource(QUrl.fromLocalFile(video_path))
             self.block_manager.set_video_path(video_path)
             
             # Show processing dialog
@@ -110,6 +175,8 @@ class VideoPlayer(QMainWindow):
             settings_dialog = SilenceSettingsDialog(self)
             if settings_dialog.exec():
                 settings = settings_dialog.get_settings()
+                if settings['editing_proxy']:
+                    self.start_editing_proxy(video_path, wait=settings['wait_for_proxy'])
                 success = self.block_manager.process_blocks(settings)
             else:
                 dialog.close()
@@ -122,12 +189,17 @@ class VideoPlayer(QMainWindow):
                     
                 self.current_block_index = 0
                 self.last_jumped_block_index = 0
+                self.prefetch_after(video_path, settings)
+                self.start_feature_extraction()
                 self.block_timeline.setBlocks(self.block_manager.blocks, self.media_player.duration() / 1000.0)
-                self.enable_controls()
+                if not self.waiting_for_proxy:
+                    self.enable_controls()
                 
                 # Ensure audio is enabled and unmuted
-                self.audio_output.setMuted(False)
-                self.audio_output.setVolume(1.0)
+                self.media_deck.set_volume(1.0)
+
+                if self.speech_only_button.isChecked():
+                    self.refresh_speech_proxy()
                 
                 if self.debug:
                     print("[DEBUG] load_video: Setup complete")
@@ -153,7 +225,112 @@ class VideoPlayer(QMainWindow):
         video_path, _ = file_dialog.getOpenFileName(self, "Open Video File", "", "Video Files (*.mp4 *.avi *.mov)")
         
         if video_path:
+            self.leave_project()
+            self.load_video(video_path)
+
+    def open_project(self):
+        filepath, _ = QFileDialog.getSaveFileName(
+            self, "Open or Create Project", "", "Project Files (*.json)",
+            options=QFileDialog.DontConfirmOverwrite
+        )
+        if not filepath:
+            return
+        try:
+            if os.path.exists(filepath):
+                project = Project.load(filepath)
+            else:
+                project = Project(filepath)
+                project.save()
+        except Exception as e:
+            QMessageBox.warning(self, "Error", f"Failed to open project: {e}")
+            return
+        self.leave_project()
+        self.project = project
+        self.add_videos_button.setEnabled(True)
+        self.update_source_combo()
+        if not project.sources:
+            self.add_project_videos()
+        elif project.active in project.sources:
+            self.open_project_source(project.active)
+        else:
+            self.open_project_source(project.sources[0])
+
+    def add_project_videos(self):
+        if self.project is None:
+            return
+        video_paths, _ = QFileDialog.getOpenFileNames(self, "Add Videos", "", "Video Files (*.mp4 *.avi *.mov)")
+        if not video_paths:
+            return
+        for video_path in video_paths:
+            self.project.add_source(video_path)
+        self.project.save()
+        self.update_source_combo()
+        if self.project.active is None:
+            self.open_project_source(self.project.sources[0])
+
+    def update_source_combo(self):
+        self.source_combo.blockSignals(True)
+        self.source_combo.clear()
+        if self.project is not None:
+            for video_path in self.project.sources:
+                analyzed = "" if self.project.is_analyzed(video_path) else " (not analyzed)"
+                self.source_combo.addItem(os.path.basename(video_path) + analyzed, video_path)
+            if self.project.active in self.project.sources:
+                self.source_combo.setCurrentIndex(self.project.sources.index(self.project.active))
+        self.source_combo.setVisible(self.project is not None)
+        self.source_combo.blockSignals(False)
+        self.update_project_totals()
+
+    def update_project_totals(self):
+        """Show every label's block count and duration summed over the project's sources"""
+        if self.project is None:
+            self.project_totals_label.hide()
+            return
+        totals = self.project.label_totals()
+        lines = [
+            f"{label}: {total['count']} blocks, {total['duration'] / 60:.1f} min in {total['sources']} sources"
+            for label, total in sorted(totals.items())
+        ]
+        self.project_totals_label.setText("\n".join(lines) or "No labeled blocks yet")
+        self.project_totals_label.show()
+
+    def source_selected(self, index):
+        if self.project is not None and index >= 0:
+            self.open_project_source(self.source_combo.itemData(index))
+
+    def open_project_source(self, video_path):
+        """Switch to a project source, running detection only if it was never analyzed"""
+        if self.project.active is not None:
+            # Refresh the summary of the source being left
+            self.project.save_session(self.project.active)
+        self.block_manager = self.project.session(video_path, activate=True)
+        if self.block_manager.blocks:
+            self.show_session()
+            self.prefetch_after(video_path)
+        else:
             self.load_video(video_path)
+        self.project.save()
+        self.update_source_combo()
+
+    def prefetch_after(self, video_path, settings=None):
+        """Analyze the files after video_path: the next project sources, or the next files in its folder"""
+        following = None
+        if self.project is not None and video_path in self.project.sources:
+            index = self.project.sources.index(video_path)
+            following = [path for path in self.project.sources[index + 1:] if not self.project.is_analyzed(path)]
+        if settings is not None:
+            self.prefetcher.proxies = settings.get('editing_proxy', True)
+        self.prefetcher.schedule(video_path, settings, following)
+
+    def leave_project(self):
+        """Save the project and go back to editing a single video"""
+        if self.project is None:
+            return
+        self.project.save()
+        self.project = None
+        self.block_manager = BlockManager()
+        self.add_videos_button.setEnabled(False)
+        self.update_source_combo()
 
     def init_ui(self):
         self.setWindowTitle("Video Player with Block Editor")
@@ -179,23 +356,23 @@ class VideoPlayer(QMainWindow):
         self.setup_video_widget(main_layout)
         self.setup_timeline(main_layout)
         self.setup_progress_bar(main_layout)
+        self.setup_status_label(main_layout)
+        self.setup_export_row(main_layout)
         self.setup_mode_label(main_layout)
         self.setup_label_controls(main_layout)
 
-        # Media player setup
-        self.media_player = QMediaPlayer()
-        self.audio_output = QAudioOutput()
-        self.media_player.setAudioOutput(self.audio_output)
-        self.media_player.setVideoOutput(self.video_widget)
-
-        # Connect media player signals
-        self.media_player.positionChanged.connect(self.position_changed)
-        self.media_player.durationChanged.connect(self.duration_changed)
-
-        # Timer for skipping silences
+        # One-shot timer armed just before the end of the current playable block
         self.skip_timer = QTimer(self)
+        self.skip_timer.setSingleShot(True)
+        self.skip_timer.setTimerType(Qt.PreciseTimer)
         self.skip_timer.timeout.connect(self.skip_silence)
 
+        # Coalesces block edits into one incremental speech-only proxy update
+        self.speech_proxy_timer = QTimer(self)
+        self.speech_proxy_timer.setSingleShot(True)
+        self.speech_proxy_timer.setInterval(SPEECH_PROXY_REFRESH_DELAY_MS)
+        self.speech_proxy_timer.timeout.connect(self.refresh_speech_proxy)
+
     def setup_controls(self, main_layout):
         # Toggle button for showing/hiding controls
         self.toggle_controls_button = QPushButton("Show Controls")
@@ -227,10 +404,24 @@ class VideoPlayer(QMainWindow):
         self.save_state_button.clicked.connect(self.save_state)
         self.load_state_button = QPushButton("Load State")
         self.load_state_button.clicked.connect(self.load_state)
+        self.open_project_button = QPushButton("Open Project")
+        self.open_project_button.clicked.connect(self.open_project)
+        self.add_videos_button = QPushButton("Add Videos")
+        self.add_videos_button.clicked.connect(self.add_project_videos)
+        self.add_videos_button.setEnabled(False)
+        self.source_combo = QComboBox()
+        self.source_combo.currentIndexChanged.connect(self.source_selected)
+        self.source_combo.setVisible(False)
+        self.project_totals_label = QLabel()
+        self.project_totals_label.setVisible(False)
         
         file_layout.addWidget(self.open_file_button)
         file_layout.addWidget(self.save_state_button)
         file_layout.addWidget(self.load_state_button)
+        file_layout.addWidget(self.open_project_button)
+        file_layout.addWidget(self.add_videos_button)
+        file_layout.addWidget(self.source_combo)
+        file_layout.addWidget(self.project_totals_label)
         parent_layout.addWidget(file_group)
 
     def create_playback_group(self, parent_layout):
@@ -239,12 +430,20 @@ class VideoPlayer(QMainWindow):
         
         self.play_pause_button = QPushButton("Play")
         self.play_pause_button.clicked.connect(self.play_pause)
+        self.gapless_button = QPushButton("Gapless Jumps")
+        self.gapless_button.setCheckable(True)
+        self.gapless_button.toggled.connect(self.toggle_gapless)
+        self.speech_only_button = QPushButton("Speech-Only Mode")
+        self.speech_only_button.setCheckable(True)
+        self.speech_only_button.toggled.connect(self.toggle_speech_only)
         self.prev_block_button = QPushButton("Previous")
         self.prev_block_button.clicked.connect(self.goto_previous_block)
         self.next_block_button = QPushButton("Next")
         self.next_block_button.clicked.connect(self.goto_next_block)
         
         playback_layout.addWidget(self.play_pause_button)
+        playback_layout.addWidget(self.gapless_button)
+        playback_layout.addWidget(self.speech_only_button)
         playback_layout.addWidget(self.prev_block_button)
         playback_layout.addWidget(self.next_block_button)
         parent_layout.addWidget(playback_group)
@@ -255,6 +454,9 @@ class VideoPlayer(QMainWindow):
         
         self.reset_blocks_button = QPushButton("Reset")
         self.reset_blocks_button.clicked.connect(self.reset_blocks)
+        self.retakes_button = QPushButton("Find Retakes")
+        self.retakes_button.setToolTip(f"Label all but the last take of each repeated line as \"{RETAKE_LABEL}\"")
+        self.retakes_button.clicked.connect(self.find_retakes)
         self.export_button = QPushButton("Preview/Export Labels")
         self.export_button.clicked.connect(self.show_preview)
         self.export_button.setEnabled(False)
@@ -263,6 +465,7 @@ class VideoPlayer(QMainWindow):
         self.preview_button.setEnabled(False)
         
         block_layout.addWidget(self.reset_blocks_button)
+        block_layout.addWidget(self.retakes_button)
         block_layout.addWidget(self.export_button)
         block_layout.addWidget(self.preview_button)
         parent_layout.addWidget(block_group)
@@ -287,12 +490,34 @@ class VideoPlayer(QMainWindow):
         parent_layout.addWidget(view_group)
 
     def setup_video_widget(self, main_layout):
-        """Setup the video widget"""
-        self.video_widget = QVideoWidget()
-        self.video_widget.setStyleSheet("background-color: #1a1a1a;")
+        """Setup the area the video widget goes in once the media stack is up"""
+        self.video_container = QWidget()
+        self.video_container.setStyleSheet("background-color: #1a1a1a;")
+        self.video_container.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.video_container.setMinimumHeight(300)  # Ensure minimum height for visibility
+        QVBoxLayout(self.video_container).setContentsMargins(0, 0, 0, 0)
+        main_layout.addWidget(self.video_container, 10)  # Higher stretch factor for video
+
+    def init_media(self):
+        """Create the media players. QtMultimedia is slow to load, so this runs after the window shows."""
+        if self.media_deck is not None:
+            return
+        from .media_deck import MediaDeck
+
+        self.media_deck = MediaDeck(self)
+        self.video_widget = self.media_deck.widget
         self.video_widget.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
-        self.video_widget.setMinimumHeight(300)  # Ensure minimum height for visibility
-        main_layout.addWidget(self.video_widget, 10)  # Higher stretch factor for video
+        self.video_container.layout().addWidget(self.video_widget)
+
+        # Media player setup (the deck owns the active and standby players)
+        self.media_player = self.media_deck.player
+        self.audio_output = self.media_deck.audio_output
+
+        # Connect media player signals
+        self.media_deck.positionChanged.connect(self.position_changed)
+        self.media_deck.durationChanged.connect(self.duration_changed)
+        self.media_deck.playbackStateChanged.connect(self.playback_state_changed)
+        self.media_deck.activePlayerChanged.connect(self.active_player_changed)
 
     def setup_timeline(self, main_layout):
         """Setup the timeline widgets"""
@@ -321,6 +546,81 @@ class VideoPlayer(QMainWindow):
         self.progress_bar.setRange(0, 100)
         main_layout.addWidget(self.progress_bar)
 
+    def setup_status_label(self, main_layout):
+        """Setup the label reporting background jobs"""
+        self.status_label = QLabel()
+        self.status_label.hide()
+        main_layout.addWidget(self.status_label)
+
+    def set_status(self, text):
+        if text:
+            self.status_label.setText(text)
+            self.status_label.show()
+        else:
+            self.status_label.clear()
+            self.status_label.hide()
+
+    def setup_export_row(self, main_layout):
+        """Setup the progress row for background exports"""
+        self.export_row = QWidget()
+        layout = QHBoxLayout(self.export_row)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.export_status_label = QLabel()
+        self.export_progress_bar = QProgressBar()
+        self.export_progress_bar.setRange(0, 100)
+        self.cancel_export_button = QPushButton("Cancel Export")
+        self.cancel_export_button.clicked.connect(self.cancel_export)
+        layout.addWidget(self.export_status_label)
+        layout.addWidget(self.export_progress_bar)
+        layout.addWidget(self.cancel_export_button)
+        self.export_row.hide()
+        main_layout.addWidget(self.export_row)
+
+        self.export_queue.job_added.connect(self.update_export_row)
+        self.export_queue.job_progress.connect(self.update_export_row)
+        self.export_queue.job_finished.connect(self.export_finished)
+
+    def queue_export(self, blocks_by_label, output_paths, mode, loudness_target=None):
+        job = ExportJob(self.block_manager.video_path, blocks_by_label, output_paths, mode, loudness_target)
+        return self.export_queue.submit(job)
+
+    def update_export_row(self, job=None):
+        current = self.export_queue.current
+        pending = self.export_queue.pending()
+        if not pending:
+            self.export_row.hide()
+            return
+        queued = len(pending) - (1 if current else 0)
+        text = f"Exporting {current.description}" if current else "Export queued"
+        if queued:
+            text += f" (+{queued} queued)"
+        self.export_status_label.setText(text)
+        self.export_progress_bar.setValue(int(current.progress * 100) if current else 0)
+        self.export_row.show()
+
+    def cancel_export(self):
+        if self.export_queue.current is not None:
+            self.export_queue.cancel(self.export_queue.current)
+
+    def export_finished(self, job):
+        self.update_export_row()
+        if job.status == ExportJob.DONE:
+            self.set_status(f"Exported {job.description} in {job.elapsed:.1f}s")
+        elif job.status == ExportJob.CANCELLED:
+            self.set_status(f"Export of {job.description} cancelled")
+        else:
+            QMessageBox.critical(self, "Export Error", f"An error occurred during export: {job.error}")
+
+    def closeEvent(self, event):
+        if self.project is not None:
+            self.project.save()
+        self.prefetcher.stop()
+        # Kill running ffmpeg jobs rather than leaving them behind
+        self.export_queue.cancel_all()
+        if self.export_queue.worker is not None:
+            self.export_queue.worker.wait()
+        super().closeEvent(event)
+
     def setup_mode_label(self, main_layout):
         self.mode_label = QLabel()
         self.update_mode_label()
@@ -371,25 +671,233 @@ class VideoPlayer(QMainWindow):
 
     def set_position(self, position):
         """Set the media player position when the slider is moved"""
-        self.media_player.setPosition(position)
+        self.seek_to(position / 1000.0)
+
+    def to_media_ms(self, seconds):
+        """Translate an original position in seconds to the playing source's ms"""
+        if self.time_map is not None:
+            seconds = self.time_map.to_proxy(seconds)
+        return int(seconds * 1000)
+
+    def to_original_seconds(self, position_ms):
+        """Translate the playing source's position in ms to original seconds"""
+        seconds = position_ms / 1000.0
+        if self.time_map is not None:
+            seconds = self.time_map.to_original(seconds)
+        return seconds
+
+    def current_position(self):
+        """Current playback position in original seconds"""
+        return self.to_original_seconds(self.media_player.position())
+
+    def seek_to(self, seconds, block_index=None):
+        """Seek to a position in seconds and re-arm silence skipping from there"""
+        swapped = self.media_deck.jump(self.to_media_ms(seconds))
+        if self.debug and swapped:
+            print(f"[DEBUG] seek_to: Swapped to pre-seeked player at {seconds:.3f}s")
+        if block_index is None:
+            block_index = self.block_manager.find_block_index(seconds)
+        if block_index is not None:
+            self.current_block_index = block_index
+        self.schedule_skip(seconds, block_index)
+        self.preload_next_jump()
+
+    def active_player_changed(self, player):
+        """Follow the media deck when it swaps to the standby player"""
+        self.media_player = player
+        self.audio_output = self.media_deck.audio_output
+
+    def toggle_gapless(self, checked):
+        self.media_deck.set_gapless(checked)
+        if checked:
+            self.preload_next_jump()
+
+    def predict_next_jump(self):
+        """Predict where the next jump will land, in seconds.
+
+        An active label preview decides first, then the direction of the last
+        manual navigation, then ordinary forward silence skipping.
+        """
+        if self.preview_dialog is not None:
+            upcoming = self.preview_dialog.next_preview_block()
+            if upcoming is not None:
+                return upcoming[1]
+
+        blocks = self.block_manager.blocks
+        if not blocks:
+            return None
+        if self.jump_forward:
+            index = self.block_manager.find_playable_block(
+                self.current_block_index, forward=True, min_duration=MIN_PLAYABLE_DURATION
+            )
+        else:
+            index = self.block_manager.find_playable_block(self.current_block_index, forward=False)
+        return blocks[index].start if index is not None else None
+
+    def preload_next_jump(self):
+        if not self.media_deck.gapless:
+            return
+        target = self.predict_next_jump()
+        if target is not None:
+            self.media_deck.preload(self.to_media_ms(target))
+
+    def toggle_speech_only(self, checked):
+        if checked:
+            self.refresh_speech_proxy()
+        else:
+            self.speech_proxy_timer.stop()
+            self.use_original_source()
+
+    def blocks_edited(self):
+        """Update what depends on the blocks after they were labeled or split"""
+        if self.project is not None:
+            self.update_project_totals()
+        if self.speech_only_button.isChecked():
+            self.speech_proxy_timer.start()
+
+    def refresh_speech_proxy(self):
+        """Render (or incrementally update) the speech-only proxy in the background"""
+        if not self.block_manager.video_path or not self.block_manager.blocks:
+            self.speech_only_button.setChecked(False)
+            return
+        if self.speech_proxy_worker is not None and self.speech_proxy_worker.isRunning():
+            # Rendered again from the current blocks once this render finishes
+            self.speech_proxy_stale = True
+            return
+
+        video_path = self.playback_path or self.block_manager.video_path
+        ranges = TimeMap.from_blocks(self.block_manager.blocks, MIN_PLAYABLE_DURATION).ranges
+        if self.time_map is not None and ranges == self.time_map.ranges:
+            # The edit left the playable ranges as they were
+            return
+        self.speech_proxy_stale = False
+
+        def render_speech_proxy():
+            renderer = SpeechProxyRenderer(video_path)
+            return renderer.render(ranges, progress_callback=worker.progress.emit)
+
+        worker = Worker(render_speech_proxy, parent=self)
+        worker.progress.connect(
+            lambda done, total: self.set_status(f"Rendering speech-only proxy... {done}/{total}")
+        )
+        worker.result_ready.connect(self.speech_proxy_ready)
+        worker.failed.connect(self.speech_proxy_failed)
+        worker.finished.connect(self.speech_proxy_finished)
+        self.speech_proxy_worker = worker
+        self.set_status("Rendering speech-only proxy...")
+        worker.start()
+
+    def speech_proxy_ready(self, result):
+        self.set_status(None)
+        if not self.speech_only_button.isChecked() or self.speech_proxy_stale:
+            return
+        proxy_path, time_map = result
+        self.switch_source(proxy_path, time_map)
+
+    def speech_proxy_finished(self):
+        if self.speech_proxy_stale and self.speech_only_button.isChecked():
+            # Only the chunks of ranges that changed are rendered
+            self.refresh_speech_proxy()
+
+    def speech_proxy_failed(self, error):
+        self.set_status(None)
+        self.speech_only_button.setChecked(False)
+        QMessageBox.warning(self, "Error", f"Failed to render speech-only proxy: {error}")
+
+    def use_original_source(self):
+        if self.time_map is None:
+            return
+        self.switch_source(self.playback_path, None)
+
+    def start_editing_proxy(self, video_path, wait=False):
+        """Play from a cached editing proxy, or transcode one in the background.
+
+        With wait=True the playback controls stay disabled until the proxy is
+        ready; otherwise playback starts on the original and switches over.
+        """
+        proxy = EditingProxy(video_path)
+        if proxy.exists():
+            self.editing_proxy_ready((video_path, proxy.path))
+            return
+
+        def render_editing_proxy():
+            if not proxy.needed():
+                return video_path, None
+            path = proxy.render(progress_callback=lambda fraction: worker.progress.emit(int(fraction * 100), 100))
+            return video_path, path
+
+        worker = Worker(render_editing_proxy, parent=self)
+        worker.progress.connect(lambda done, total: self.set_status(f"Preparing editing proxy... {done}%"))
+        worker.result_ready.connect(self.editing_proxy_ready)
+        worker.failed.connect(self.editing_proxy_failed)
+        self.editing_proxy_worker = worker
+        self.waiting_for_proxy = wait
+        self.set_status("Preparing editing proxy...")
+        worker.start()
+
+    def start_feature_extraction(self):
+        """Compute the blocks' acoustic features (for the review queue) in the background"""
+        blocks = self.block_manager.blocks
+        if not blocks:
+            return
+
+        worker = Worker(self.block_manager.compute_features, blocks, parent=self)
+        worker.result_ready.connect(lambda table: self.block_manager.set_features(blocks, table))
+        worker.failed.connect(lambda error: print(f"[DEBUG] Feature extraction failed: {error}"))
+        self.feature_worker = worker
+        worker.start()
+
+    def editing_proxy_ready(self, result):
+        video_path, proxy_path = result
+        if video_path != self.block_manager.video_path:
+            # A different video was opened while this one was transcoding
+            return
+        if proxy_path is None:
+            self.set_status(None)
+        else:
+            self.playback_path = proxy_path
+            if self.time_map is None:
+                self.switch_source(proxy_path, None)
+            self.set_status(f"Playing {PROXY_HEIGHT}p editing proxy")
+        if self.waiting_for_proxy:
+            self.waiting_for_proxy = False
+            if self.block_manager.blocks:
+                self.enable_controls()
+
+    def editing_proxy_failed(self, error):
+        self.set_status(None)
+        if self.waiting_for_proxy:
+            self.waiting_for_proxy = False
+            if self.block_manager.blocks:
+                self.enable_controls()
+        QMessageBox.warning(self, "Error", f"Failed to create editing proxy, playing the original: {error}")
+
+    def switch_source(self, path, time_map):
+        """Swap the playing file while keeping the original-time position"""
+        position = self.current_position()
+        was_playing = self.media_deck.is_playing()
+        self.time_map = time_map
+        self.media_deck.setSource(QUrl.fromLocalFile(path))
+        self.seek_to(position)
+        if was_playing:
+            self.media_player.play()
 
     def position_changed(self, position):
         """Handle media player position changes"""
         if not self.block_manager.blocks:
             return
             
-        current_position = position / 1000.0  # Convert to seconds
+        current_position = self.to_original_seconds(position)
         
         # Only update UI elements if they exist and we're not in preview mode
         if hasattr(self, 'timeline_slider') and self.timeline_slider and not self.timeline_slider.isDestroyed():
-            self.timeline_slider.setValue(position)
+            self.timeline_slider.setValue(int(current_position * 1000))
             self.block_timeline.setCurrentPosition(current_position)
             
         # Update current block index based on position
-        new_block_index = next((i for i, block in enumerate(self.block_manager.blocks) 
-                            if block.start <= current_position <= block.end), 0)
+        new_block_index = self.block_manager.find_block_index(current_position)
         
-        if new_block_index < len(self.block_manager.blocks):
+        if new_block_index is not None:
             current_block = self.block_manager.blocks[new_block_index]
             
             # Only log for non-silence blocks or when transitioning blocks
@@ -402,8 +910,10 @@ class VideoPlayer(QMainWindow):
             # Mark non-silence blocks as visited and apply selected label
             if not current_block.is_silence:
                 current_block.visited = True
-                if self.label_manager.selected_label:
-                    current_block.label = self.label_manager.selected_label.name
+                selected_label = self.label_manager.selected_label
+                if selected_label and current_block.label != selected_label.name:
+                    current_block.label = selected_label.name
+                    self.blocks_edited()
                 
             # Update current block index
             if self.current_block_index != new_block_index:
@@ -414,6 +924,11 @@ class VideoPlayer(QMainWindow):
 
     def duration_changed(self, duration):
         """Handle media player duration changes"""
+        if self.time_map is not None:
+            # Keep the slider and timeline in original time while playing the proxy
+            if not self.block_manager.blocks:
+                return
+            duration = int(self.block_manager.blocks[-1].end * 1000)
         self.timeline_slider.setRange(0, duration)
         self.block_timeline.setBlocks(self.block_manager.blocks, duration / 1000.0)
 
@@ -511,31 +1026,48 @@ class VideoPlayer(QMainWindow):
                 print("[DEBUG] update_label_buttons: ERROR - Label group not found!")
 
     def play_pause(self):
-        if self.media_player.playbackState() == QMediaPlayer.PlayingState:
+        if self.media_deck.is_playing():
             self.media_player.pause()
             self.play_pause_button.setText("Play")
+            self.skipping = False
             self.skip_timer.stop()
         else:
             self.media_player.play()
             self.play_pause_button.setText("Pause")
-            self.skip_timer.start(100)
+            self.skipping = True
+            self.schedule_skip()
+
+    def playback_state_changed(self, state):
+        """Keep the skip timer idle whenever playback is not running"""
+        playing = self.media_deck.is_playing()
+        if playing != self.holding_prefetch:
+            # Decoding for playback needs the CPU more than prefetching does
+            if playing:
+                ffmpeg_scheduler.hold()
+            else:
+                ffmpeg_scheduler.release()
+            self.holding_prefetch = playing
+        if not playing:
+            self.skip_timer.stop()
+        elif self.skipping and not self.skip_timer.isActive():
+            self.schedule_skip()
 
     def goto_previous_block(self):
         if self.debug:
             print(f"[DEBUG] goto_previous_block: Starting from index {self.current_block_index}")
         next_index = self.find_next_non_silence_block(self.current_block_index, forward=False)
+        self.jump_forward = False
         
         if next_index is not None:
-            was_playing = self.media_player.playbackState() == QMediaPlayer.PlayingState
+            was_playing = self.media_deck.is_playing()
             if self.debug:
                 print(f"[DEBUG] goto_previous_block: Found next block at index {next_index}, was_playing={was_playing}")
             
-            self.current_block_index = next_index
-            target_position = int(self.block_manager.blocks[next_index].start * 1000)
+            target_position = self.block_manager.blocks[next_index].start
             if self.debug:
-                print(f"[DEBUG] goto_previous_block: Setting position to {target_position}ms")
+                print(f"[DEBUG] goto_previous_block: Setting position to {target_position:.3f}s")
             
-            self.media_player.setPosition(target_position)
+            self.seek_to(target_position, next_index)
             
             if was_playing:
                 if self.debug:
@@ -549,18 +1081,18 @@ class VideoPlayer(QMainWindow):
         if self.debug:
             print(f"[DEBUG] goto_next_block: Starting from index {self.current_block_index}")
         next_index = self.find_next_non_silence_block(self.current_block_index, forward=True)
+        self.jump_forward = True
         
         if next_index is not None:
-            was_playing = self.media_player.playbackState() == QMediaPlayer.PlayingState
+            was_playing = self.media_deck.is_playing()
             if self.debug:
                 print(f"[DEBUG] goto_next_block: Found next block at index {next_index}, was_playing={was_playing}")
             
-            self.current_block_index = next_index
-            target_position = int(self.block_manager.blocks[next_index].start * 1000)
+            target_position = self.block_manager.blocks[next_index].start
             if self.debug:
-                print(f"[DEBUG] goto_next_block: Setting position to {target_position}ms")
+                print(f"[DEBUG] goto_next_block: Setting position to {target_position:.3f}s")
             
-            self.media_player.setPosition(target_position)
+            self.seek_to(target_position, next_index)
             
             if was_playing:
                 if self.debug:
@@ -571,16 +1103,7 @@ class VideoPlayer(QMainWindow):
                 print("[DEBUG] goto_next_block: No next non-silence block found")
 
     def find_next_non_silence_block(self, start_index, forward=True):
-        blocks = self.block_manager.blocks
-        if forward:
-            for i in range(start_index + 1, len(blocks)):
-                if not blocks[i].is_silence:
-                    return i
-        else:
-            for i in range(start_index - 1, -1, -1):
-                if not blocks[i].is_silence:
-                    return i
-        return None
+        return self.block_manager.find_playable_block(start_index, forward=forward)
 
     def reset_blocks(self):
         if not self.block_manager.blocks:
@@ -588,6 +1111,53 @@ class VideoPlayer(QMainWindow):
         
         self.block_manager.reset_blocks()
         self.block_timeline.update()
+        self.blocks_edited()
+
+    def find_retakes(self):
+        """Group repeated takes of a line in the background, then offer to label them"""
+        if not self.block_manager.blocks:
+            return
+        if self.retake_worker is not None and self.retake_worker.isRunning():
+            return
+        if self.label_manager.get_label(RETAKE_LABEL) is None:
+            QMessageBox.warning(self, "Find Retakes", f"Create a \"{RETAKE_LABEL}\" label first.")
+            return
+
+        blocks = self.block_manager.blocks
+        worker = Worker(self.block_manager.find_retakes, parent=self)
+        worker.result_ready.connect(lambda groups: self.retakes_found(blocks, groups))
+        worker.failed.connect(self.retakes_failed)
+        self.retake_worker = worker
+        self.retakes_button.setEnabled(False)
+        self.set_status("Finding retakes...")
+        worker.start()
+
+    def retakes_found(self, blocks, groups):
+        from ..core.retakes import label_retakes
+
+        self.set_status(None)
+        self.retakes_button.setEnabled(True)
+        if blocks is not self.block_manager.blocks:
+            # A different video was opened while searching
+            return
+        if not groups:
+            QMessageBox.information(self, "Find Retakes", "No repeated takes found.")
+            return
+        takes = sum(len(group) - 1 for group in groups)
+        answer = QMessageBox.question(
+            self, "Find Retakes",
+            f"Found {len(groups)} lines with more than one take.\n"
+            f"Label all but the last take of each ({takes} blocks) as \"{RETAKE_LABEL}\"?"
+        )
+        if answer == QMessageBox.Yes:
+            label_retakes(blocks, groups, RETAKE_LABEL)
+            self.block_timeline.update()
+            self.blocks_edited()
+
+    def retakes_failed(self, error):
+        self.set_status(None)
+        self.retakes_button.setEnabled(True)
+        QMessageBox.warning(self, "Error", f"Failed to find retakes: {error}")
 
     def zoom_in(self):
         self.block_timeline.setVisibleBlocks(max(1, self.block_timeline.visible_blocks // 2))
@@ -602,7 +1172,11 @@ class VideoPlayer(QMainWindow):
 
     def show_preview(self):
         dialog = PreviewDialog(self.block_manager, self.label_manager, self)
-        dialog.exec()
+        self.preview_dialog = dialog
+        try:
+            dialog.exec()
+        finally:
+            self.preview_dialog = None
 
     def show_help(self):
         help_text = """
@@ -617,6 +1191,8 @@ class VideoPlayer(QMainWindow):
         Buttons:
         - Open Video: Open a video file
         - Play/Pause: Control video playback
+        - Gapless Jumps: Pre-seek a second player to the next block so jumps don't stall
+        - Speech-Only Mode: Play a rendered proxy containing only the non-silence blocks
         - Previous Block: Move to the previous block
         - Next Block: Move to the next block
         - Save State: Save current block states to a file
@@ -629,79 +1205,84 @@ class VideoPlayer(QMainWindow):
         """
         QMessageBox.information(self, "Help", help_text)
 
+    def schedule_skip(self, position=None, block_index=None):
+        """Arm the skip timer to fire just before the next speech/silence boundary.
+
+        The timer stays idle between boundaries instead of polling the position.
+        """
+        self.skip_timer.stop()
+        if not self.skipping or not self.block_manager.blocks:
+            return
+        if not self.media_deck.is_playing():
+            return
+        if self.time_map is not None:
+            # The speech-only proxy has no silence left to skip
+            return
+
+        if position is None:
+            position = self.current_position()
+        if block_index is None:
+            block_index = self.block_manager.find_block_index(position)
+
+        block = self.block_manager.blocks[block_index]
+        if block.is_silence or block.end - block.start < MIN_PLAYABLE_DURATION:
+            # Already inside something we skip, so jump right away
+            self.skip_block_index = block_index
+            self.skip_timer.start(0)
+            return
+
+        rate = self.media_player.playbackRate() or 1.0
+        remaining_ms = (block.end - position) * 1000 / rate
+        self.skip_block_index = block_index
+        self.skip_timer.start(max(0, int(remaining_ms) - SKIP_LEAD_MS))
+        if self.debug:
+            print(f"[DEBUG] schedule_skip: Block {block_index} ends at {block.end:.3f}s, firing in {max(0, int(remaining_ms) - SKIP_LEAD_MS)}ms")
+
     def skip_silence(self):
-        if not self.block_manager.blocks:
+        if not self.block_manager.blocks or self.skip_block_index is None:
             if self.debug:
                 print("[DEBUG] skip_silence: No blocks available")
             return
-            
-        current_position = self.media_player.position() / 1000.0
-        if self.debug:
-            print(f"[DEBUG] skip_silence: Current position {current_position:.3f}s")
-        
-        if self.current_block_index >= len(self.block_manager.blocks):
-            if self.debug:
-                print(f"[DEBUG] skip_silence: Adjusting index from {self.current_block_index} to {len(self.block_manager.blocks) - 1}")
-            self.current_block_index = len(self.block_manager.blocks) - 1
-            
-        current_block = self.block_manager.blocks[self.current_block_index]
-        
-        # Check if we're near the end of the current block
-        time_in_block = current_position - current_block.start
-        time_remaining = current_block.end - current_position
-        
-        if self.debug:
-            print(f"[DEBUG] skip_silence: Current block - Index: {self.current_block_index}, Start: {current_block.start:.3f}s, End: {current_block.end:.3f}s, Is Silence: {current_block.is_silence}")
-            print(f"[DEBUG] skip_silence: Time in block: {time_in_block:.3f}s, Time remaining: {time_remaining:.3f}s")
 
-        # Skip if we're in a silence block or near the end of any block
-        should_skip = current_block.is_silence or time_remaining < 0.1
-            
-        if should_skip:
-            # Find the next suitable non-silence block
-            next_block_index = self.current_block_index + 1
-            min_block_duration = 0.3  # Increased minimum duration for stability
-            
-            while next_block_index < len(self.block_manager.blocks):
-                next_block = self.block_manager.blocks[next_block_index]
-                block_duration = next_block.end - next_block.start
-                
-                # Skip silence blocks and blocks that are too short
-                if not next_block.is_silence and block_duration >= min_block_duration:
-                    if self.debug:
-                        print(f"[DEBUG] skip_silence: Found suitable block {next_block_index} with duration {block_duration:.3f}s")
-                    break
-                    
-                if self.debug and next_block.is_silence:
-                    print(f"[DEBUG] skip_silence: Skipping silence block {next_block_index}")
-                elif self.debug:
-                    print(f"[DEBUG] skip_silence: Skipping short block {next_block_index} ({block_duration:.3f}s)")
-                    
-                next_block_index += 1
-                
-            if next_block_index < len(self.block_manager.blocks):
-                next_block = self.block_manager.blocks[next_block_index]
-                # Add a small offset to avoid boundary issues
-                target_position = next_block.start + 0.05
-                if self.debug:
-                    print(f"[DEBUG] skip_silence: Skipping to next suitable block at {target_position:.3f}s")
-                self.media_player.setPosition(int(target_position * 1000))
-                self.current_block_index = next_block_index
-            else:
-                # If no more suitable blocks, stop playback
-                if self.debug:
-                    print("[DEBUG] skip_silence: No more suitable blocks, stopping playback")
-                self.media_player.stop()
+        blocks = self.block_manager.blocks
+        current_index = min(self.skip_block_index, len(blocks) - 1)
+        current_block = blocks[current_index]
+        current_position = self.current_position()
+
+        # The seek that armed us may still be settling; re-arm for the remainder
+        lead = SKIP_LEAD_MS / 1000.0
+        if not current_block.is_silence and current_block.end - current_block.start >= MIN_PLAYABLE_DURATION:
+            if current_position < current_block.end - 2 * lead:
+                self.schedule_skip(max(current_position, current_block.start), current_index)
                 return
-            
-            playback_state = self.media_player.playbackState()
+
+        next_block_index = self.block_manager.find_playable_block(
+            current_index, forward=True, min_duration=MIN_PLAYABLE_DURATION
+        )
+        if next_block_index is None:
+            # If no more suitable blocks, stop playback
             if self.debug:
-                print(f"[DEBUG] skip_silence: Playback state is {playback_state}")
-            
-            if playback_state != QMediaPlayer.PlayingState:
-                if self.debug:
-                    print("[DEBUG] skip_silence: Resuming playback")
-                self.media_player.play()
+                print("[DEBUG] skip_silence: No more suitable blocks, stopping playback")
+            self.skipping = False
+            self.media_player.stop()
+            return
+
+        next_block = blocks[next_block_index]
+        if self.debug:
+            overshoot = (current_position - current_block.end) * 1000
+            print(f"[DEBUG] skip_silence: Boundary at {current_block.end:.3f}s, position {current_position:.3f}s (overshoot {overshoot:.0f}ms)")
+
+        if next_block.start - current_block.end < lead and not current_block.is_silence:
+            # Adjacent playable block, keep playing without a seek
+            self.current_block_index = next_block_index
+            self.schedule_skip(max(current_position, next_block.start), next_block_index)
+            self.preload_next_jump()
+            return
+
+        if self.debug:
+            print(f"[DEBUG] skip_silence: Skipping to block {next_block_index} at {next_block.start:.3f}s")
+        self.jump_forward = True
+        self.seek_to(next_block.start, next_block_index)
 
     def save_state(self):
         if not self.block_manager.blocks:
@@ -722,55 +1303,40 @@ class VideoPlayer(QMainWindow):
             self, "Load Block State", "", "JSON Files (*.json)"
         )
         if filepath:
+            # A state file is a single video; loading one leaves project mode
+            self.leave_project()
             if self.block_manager.load_state(filepath):
-                # Update UI with loaded state
-                self.media_player.setSource(QUrl.fromLocalFile(self.block_manager.video_path))
-                self.current_block_index = 0
-                self.last_jumped_block_index = 0
-                
-                # Wait for media player to load and get duration
-                def on_duration_changed(duration):
-                    self.block_timeline.setBlocks(self.block_manager.blocks, duration / 1000.0)
-                    self.media_player.durationChanged.disconnect(on_duration_changed)
-                
-                self.media_player.durationChanged.connect(on_duration_changed)
-                self.enable_controls()
+                self.show_session()
                 QMessageBox.information(self, "Success", "State loaded successfully!")
             else:
                 QMessageBox.warning(self, "Error", "Failed to load state!")
 
+    def show_session(self):
+        """Show the block manager's video with its existing blocks, without detection"""
+        self.time_map = None
+        self.playback_path = self.block_manager.video_path
+        self.waiting_for_proxy = False
+        self.set_status(None)
+        self.media_deck.setSource(QUrl.fromLocalFile(self.block_manager.video_path))
+        self.start_editing_proxy(self.block_manager.video_path)
+        self.current_block_index = 0
+        self.last_jumped_block_index = 0
+
+        # Wait for media player to load and get duration
+        def on_duration_changed(duration):
+            self.block_timeline.setBlocks(self.block_manager.blocks, duration / 1000.0)
+            self.media_deck.durationChanged.disconnect(on_duration_changed)
+
+        self.media_deck.durationChanged.connect(on_duration_changed)
+        self.enable_controls()
+        if self.block_manager.features is None:
+            self.start_feature_extraction()
+        if self.speech_only_button.isChecked():
+            self.refresh_speech_proxy()
+
     def get_video_properties(self, video_path):
         """Get video properties using ffprobe"""
-        cmd = [
-            "ffprobe",
-            "-v", "error",
-            "-select_streams", "v:0",
-            "-show_entries", "stream=r_frame_rate,codec_name",
-            "-of", "json",
-            video_path
-        ]
-        video_info = json.loads(subprocess.check_output(cmd).decode())
-        
-        cmd = [
-            "ffprobe",
-            "-v", "error",
-            "-select_streams", "a:0",
-            "-show_entries", "stream=codec_name,bit_rate",
-            "-of", "json",
-            video_path
-        ]
-        audio_info = json.loads(subprocess.check_output(cmd).decode())
-        
-        # Parse frame rate fraction
-        num, den = map(int, video_info['streams'][0]['r_frame_rate'].split('/'))
-        frame_rate = num/den
-        
-        return {
-            'video_codec': video_info['streams'][0]['codec_name'],
-            'audio_codec': audio_info['streams'][0]['codec_name'],
-            'frame_rate': frame_rate,
-            'audio_bitrate': audio_info['streams'][0].get('bit_rate', '192k')
-        }
+        return get_video_properties(video_path)
 
 
     def update_mode_label(self):
@@ -785,6 +1351,7 @@ class VideoPlayer(QMainWindow):
                 current_block.label = label.name
                 current_block.visited = True
                 self.block_timeline.update()
+                self.blocks_edited()
         
         # Update all button styles
         for name, btn in self.label_buttons.items():
@@ -805,4 +1372,5 @@ class VideoPlayer(QMainWindow):
         self.zoom_out_button.setEnabled(True)
         self.export_button.setEnabled(True)
         self.preview_button.setEnabled(True)
+        self.retakes_button.setEnabled(True)
         self.save_state_button.setEnabled(True)
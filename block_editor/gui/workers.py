@@ -0,0 +1,22 @@
+from PySide6.QtCore import QThread, Signal
+
+class Worker(QThread):
+    """Runs a function off the GUI thread and reports its result via signals"""
+    result_ready = Signal(object)
+    failed = Signal(str)
+    progress = Signal(int, int)
+
+    def __init__(self, func, *args, parent=None, **kwargs):
+        super().__init__(parent)
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+
+    def run(self):
+        try:
+            result = self.func(*self.args, **self.kwargs)
+        except Exception as e:
+            print(f"[DEBUG] Worker: {self.func.__name__} failed - {str(e)}")
+            self.failed.emit(str(e))
+        else:
+            self.result_ready.emit(result)
@@ -1,7 +1,25 @@
 """
 Utility functions for the Video Block Editor.
+
+Names are imported on first access, so importing one module (or the
+package) does not load every utility.
 """
 
-from .silence_detector import SilenceDetector
+from importlib import import_module
+
+_EXPORTS = {
+    'SilenceDetector': '.silence_detector',
+    'SpeechProxyRenderer': '.speech_proxy',
+    'EditingProxy': '.editing_proxy',
+    'FeatureExtractor': '.feature_extractor',
+    'VideoSegmenter': '.video_segmenter',
+    'VideoExporter': '.exporter',
+    'SegmentCache': '.segment_cache'
+}
+
+__all__ = list(_EXPORTS)
 
-__all__ = ['SilenceDetector']
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(_EXPORTS[name], __name__), name)
@@ -0,0 +1,76 @@
+import json
+import os
+from ..core.audio_block import AudioBlock
+from ..core.loudness import LoudnessStats
+from .media_cache import cache_dir, cache_key, source_identity
+
+# Bump when the stored results change shape or meaning
+ANALYSIS_VERSION = 1
+# SilenceDetector's defaults, used when no settings are given
+DEFAULT_DETECTION = {'threshold': -40, 'duration': 0.1, 'buffer': 0.3, 'video_cuts': False}
+
+def detection_params(settings=None):
+    """The detection settings that determine the blocks, with defaults filled in"""
+    settings = settings or {}
+    return {name: settings.get(name, default) for name, default in DEFAULT_DETECTION.items()}
+
+def block_bounds(blocks):
+    """Key for a block list's boundaries; features are cached per set of blocks"""
+    return cache_key([(round(block.start, 3), round(block.end, 3)) for block in blocks])
+
+def detection_to_dict(blocks, loudness):
+    return {
+        'blocks': [block.to_dict() for block in blocks],
+        'loudness': loudness.to_dict() if loudness else None
+    }
+
+def detection_from_dict(data):
+    """(blocks, loudness) from detection_to_dict()"""
+    blocks = [AudioBlock.from_dict(block_data) for block_data in data['blocks']]
+    loudness = LoudnessStats.from_dict(data['loudness']) if data.get('loudness') else None
+    return blocks, loudness
+
+class AnalysisCache:
+    """Per-source analysis results stored on disk by source identity.
+
+    Each result has a kind ("probe", "detection", "features") and the parameters it was
+    computed with, so changing the detection settings or replacing the file
+    misses instead of returning stale results. Lets a prefetched file open
+    without probing or detecting again.
+    """
+    def __init__(self, root=None):
+        self.root = root or cache_dir("analysis")
+        os.makedirs(self.root, exist_ok=True)
+
+    def path(self, video_path, kind, params=None):
+        key = cache_key(ANALYSIS_VERSION, source_identity(video_path), kind, params)
+        return os.path.join(self.root, f"{key}.json")
+
+    def get(self, video_path, kind, params=None):
+        try:
+            with open(self.path(video_path, kind, params), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, video_path, kind, value, params=None):
+        path = self.path(video_path, kind, params)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(value, f)
+        os.replace(tmp_path, path)
+
+    def get_detection(self, video_path, settings=None):
+        """(blocks, loudness) from an earlier detection with the same settings, or None"""
+        data = self.get(video_path, "detection", detection_params(settings))
+        return None if data is None else detection_from_dict(data)
+
+    def put_detection(self, video_path, settings, blocks, loudness):
+        self.put(video_path, "detection", detection_to_dict(blocks, loudness), detection_params(settings))
+
+    def get_features(self, video_path, blocks):
+        """The FeatureTable.to_dict() computed earlier for the same blocks, or None"""
+        return self.get(video_path, "features", block_bounds(blocks))
+
+    def put_features(self, video_path, blocks, table):
+        self.put(video_path, "features", table.to_dict(), block_bounds(blocks))
@@ -0,0 +1,366 @@
+"""
+Local analysis service shared by every editor instance on a machine.
+
+Run it with
+
+    python -m block_editor.utils.analysis_service [--address PATH_OR_HOST:PORT]
+
+Clients speak newline-delimited JSON-RPC 2.0 over a Unix socket (or a
+localhost TCP port where Unix sockets are unavailable):
+
+    submit {kind, path, params}  -> job status; kind is detect, probe or proxy
+    status {job}                 -> job status
+    result {job, timeout}        -> the job's result, waiting for it to finish
+    watch {job}                  -> "progress" notifications, then the final status
+    ping                         -> "pong"
+"""
+import argparse
+import itertools
+import json
+import os
+import socket
+import socketserver
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .analysis_cache import AnalysisCache, detection_from_dict, detection_params, detection_to_dict
+from .editing_proxy import EditingProxy
+from .media_cache import CACHE_ROOT, cache_key, source_identity
+from .silence_detector import SilenceDetector
+from . import toolchain
+
+# Overrides the address the service listens on and clients connect to
+SERVICE_ENV = "VIDEO_EDITOR_ANALYSIS_SERVICE"
+DEFAULT_SOCKET = os.path.join(CACHE_ROOT, "analysis.sock")
+DEFAULT_PORT = 47311
+CONNECT_TIMEOUT = 0.5
+JOB_KINDS = ('detect', 'probe', 'proxy')
+SERVICE_WORKERS = 4
+# Finished jobs remembered for deduplication; results also live in the AnalysisCache
+MAX_FINISHED_JOBS = 256
+WATCH_INTERVAL = 0.2
+
+# JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+JOB_FAILED = -32000
+JOB_PENDING = -32001
+
+class ServiceError(Exception):
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+
+def service_address():
+    if os.environ.get(SERVICE_ENV):
+        return os.environ[SERVICE_ENV]
+    return DEFAULT_SOCKET if hasattr(socket, "AF_UNIX") else f"127.0.0.1:{DEFAULT_PORT}"
+
+def parse_address(address):
+    """(family, address) for a Unix socket path or a host:port"""
+    host, sep, port = address.rpartition(":")
+    if sep and port.isdigit() and "/" not in address:
+        return socket.AF_INET, (host or "127.0.0.1", int(port))
+    return socket.AF_UNIX, address
+
+def param(params, name, types, default=None):
+    """params[name], or default if missing; ServiceError unless it is one of types.
+
+    A default of None makes the parameter optional. Booleans are not numbers here.
+    """
+    value = params.get(name, default)
+    if value is None and default is None:
+        return None
+    if not isinstance(value, types) or isinstance(value, bool):
+        raise ServiceError(INVALID_PARAMS, f"Invalid {name}: {value!r}")
+    return value
+
+class AnalysisJob:
+    def __init__(self, job_id, kind, path, params):
+        self.id = job_id
+        self.kind = kind
+        self.path = path
+        self.params = params
+        self.state = "queued"  # then running, done or failed
+        self.progress = 0.0
+        self.result = None
+        self.error = None
+        self.finished = threading.Event()
+
+    def status(self):
+        return {
+            'job': self.id, 'kind': self.kind, 'path': self.path,
+            'state': self.state, 'progress': self.progress, 'error': self.error
+        }
+
+class AnalysisService:
+    """Runs detection, probe and proxy jobs on behalf of every client.
+
+    Requests for the same kind, source identity and parameters share one
+    job, whichever client sent them, and detection and probe results go to
+    the shared AnalysisCache, so a file is analyzed once per workstation.
+    """
+    def __init__(self, workers=SERVICE_WORKERS):
+        self.jobs = {}
+        self._by_key = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers)
+
+    def submit(self, kind, path, params=None):
+        if kind not in JOB_KINDS:
+            raise ServiceError(INVALID_PARAMS, f"Unknown job kind: {kind}")
+        path = os.path.abspath(path)
+        try:
+            identity = source_identity(path)
+        except OSError as e:
+            raise ServiceError(INVALID_PARAMS, f"Cannot read {path}: {e}")
+        if kind == 'detect':
+            params = detection_params(params)
+        key = cache_key(kind, identity, params)
+        with self._lock:
+            job = self._by_key.get(key)
+            # A partial detection is run again rather than shared
+            if job is not None and job.state != "failed" and not (job.result or {}).get('partial'):
+                return job.status()
+            job = AnalysisJob(str(next(self._ids)), kind, path, params)
+            self.jobs[job.id] = job
+            self._by_key[key] = job
+        self._pool.submit(self._run, job)
+        return job.status()
+
+    def _run(self, job):
+        job.state = "running"
+        try:
+            job.result = getattr(self, f"run_{job.kind}")(job)
+        except Exception as e:
+            print(f"[DEBUG] AnalysisService: {job.kind} of {job.path} failed: {e}")
+            job.error = str(e)
+            job.state = "failed"
+        else:
+            job.progress = 1.0
+            job.state = "done"
+        finally:
+            job.finished.set()
+            self._forget_finished()
+
+    def _forget_finished(self):
+        with self._lock:
+            finished = [job for job in self.jobs.values() if job.finished.is_set()]
+            for job in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+                del self.jobs[job.id]
+                for key in [key for key, other in self._by_key.items() if other is job]:
+                    del self._by_key[key]
+
+    def run_detect(self, job):
+        cache = AnalysisCache()
+        cached = cache.get(job.path, "detection", job.params)
+        if cached is not None:
+            return cached
+        detector = SilenceDetector.from_params(job.path, job.params, toolchain=toolchain.current())
+        result = detection_to_dict(detector.detect_blocks(), detector.loudness)
+        if not detector.complete:
+            # Audio-only blocks for settings that ask for video cuts
+            result['partial'] = True
+            return result
+        cache.put(job.path, "detection", result, job.params)
+        return result
+
+    def run_probe(self, job):
+        return EditingProxy(job.path).probe()
+
+    def run_proxy(self, job):
+        def progress(fraction):
+            job.progress = fraction
+        return {'path': EditingProxy(job.path).render(progress_callback=progress)}
+
+    def job(self, job_id):
+        job = self.jobs.get(str(job_id))
+        if job is None:
+            raise ServiceError(INVALID_PARAMS, f"Unknown job: {job_id}")
+        return job
+
+    def result(self, job_id, timeout=None):
+        job = self.job(job_id)
+        if not job.finished.wait(timeout):
+            raise ServiceError(JOB_PENDING, f"Job {job.id} is still {job.state}")
+        if job.state == "failed":
+            raise ServiceError(JOB_FAILED, job.error)
+        return job.result
+
+    def watch(self, job_id, notify):
+        """Send progress notifications until the job finishes, then return its status"""
+        job = self.job(job_id)
+        last = None
+        while not job.finished.wait(WATCH_INTERVAL if last is not None else 0):
+            status = job.status()
+            if status != last:
+                notify(status)
+                last = status
+        return job.status()
+
+    def handle(self, line, send):
+        """Answer one request line through send(message)"""
+        try:
+            request = json.loads(line)
+        except ValueError:
+            send({'jsonrpc': "2.0", 'id': None, 'error': {'code': PARSE_ERROR, 'message': "Parse error"}})
+            return
+        request_id = request.get('id') if isinstance(request, dict) else None
+        try:
+            if not isinstance(request, dict) or not isinstance(request.get('method'), str):
+                raise ServiceError(INVALID_REQUEST, "Invalid request")
+            params = request.get('params') or {}
+            if not isinstance(params, dict):
+                raise ServiceError(INVALID_PARAMS, "params must be an object")
+            method = request['method']
+            if method == "ping":
+                result = "pong"
+            elif method == "submit":
+                result = self.submit(param(params, 'kind', str, ""), param(params, 'path', str, ""),
+                                     param(params, 'params', dict))
+            elif method == "status":
+                result = self.job(param(params, 'job', (str, int), "")).status()
+            elif method == "result":
+                timeout = param(params, 'timeout', (int, float))
+                if timeout is not None and not 0 <= timeout < float('inf'):
+                    raise ServiceError(INVALID_PARAMS, f"Invalid timeout: {timeout!r}")
+                result = self.result(param(params, 'job', (str, int), ""), timeout)
+            elif method == "watch":
+                result = self.watch(param(params, 'job', (str, int), ""), lambda status: send(
+                    {'jsonrpc': "2.0", 'method': "progress", 'params': status}
+                ))
+            else:
+                raise ServiceError(METHOD_NOT_FOUND, f"Method not found: {method}")
+        except ServiceError as e:
+            send({'jsonrpc': "2.0", 'id': request_id, 'error': {'code': e.code, 'message': str(e)}})
+        except Exception as e:
+            # Answer instead of ending the connection's handler thread
+            print(f"[DEBUG] AnalysisService: {request.get('method')} failed: {e}")
+            send({'jsonrpc': "2.0", 'id': request_id, 'error': {'code': INTERNAL_ERROR, 'message': str(e)}})
+        else:
+            send({'jsonrpc': "2.0", 'id': request_id, 'result': result})
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        def send(message):
+            self.wfile.write(json.dumps(message).encode() + b"\n")
+            self.wfile.flush()
+
+        for line in self.rfile:
+            if line.strip():
+                self.server.service.handle(line, send)
+
+if hasattr(socketserver, "UnixStreamServer"):
+    class UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+class TCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+def create_server(service, address=None):
+    """Bind a server for service; call serve_forever() on it to run"""
+    family, bind_address = parse_address(address or service_address())
+    if family == socket.AF_INET:
+        server = TCPServer(bind_address, RequestHandler)
+    else:
+        if os.path.exists(bind_address):
+            if connect(bind_address) is not None:
+                raise OSError(f"An analysis service is already listening on {bind_address}")
+            # Left behind by a service that did not shut down cleanly
+            os.remove(bind_address)
+        os.makedirs(os.path.dirname(bind_address) or ".", exist_ok=True)
+        server = UnixServer(bind_address, RequestHandler)
+    server.service = service
+    return server
+
+class AnalysisClient:
+    """A connection to the analysis service"""
+    def __init__(self, address=None, timeout=None):
+        family, connect_address = parse_address(address or service_address())
+        self.sock = socket.socket(family, socket.SOCK_STREAM)
+        try:
+            self.sock.settimeout(CONNECT_TIMEOUT)
+            self.sock.connect(connect_address)
+            self.sock.settimeout(timeout)
+        except OSError:
+            self.sock.close()
+            raise
+        self.file = self.sock.makefile("rwb")
+        self._ids = itertools.count(1)
+
+    def call(self, method, notification_callback=None, **params):
+        request_id = next(self._ids)
+        self.file.write(json.dumps({'jsonrpc': "2.0", 'id': request_id, 'method': method, 'params': params}).encode() + b"\n")
+        self.file.flush()
+        while True:
+            line = self.file.readline()
+            if not line:
+                raise ConnectionError("The analysis service closed the connection")
+            message = json.loads(line)
+            if 'id' not in message:
+                if notification_callback:
+                    notification_callback(message['params'])
+                continue
+            if 'error' in message:
+                raise ServiceError(message['error']['code'], message['error']['message'])
+            return message['result']
+
+    def submit(self, kind, path, params=None):
+        return self.call("submit", kind=kind, path=os.path.abspath(path), params=params)
+
+    def detect(self, video_path, settings=None, progress_callback=None):
+        """(blocks, loudness) for video_path, shared with every other client"""
+        job = self.submit("detect", video_path, detection_params(settings))
+        if progress_callback:
+            self.call("watch", notification_callback=lambda status: progress_callback(status['progress']),
+                      job=job['job'])
+        return detection_from_dict(self.call("result", job=job['job']))
+
+    def close(self):
+        self.file.close()
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def connect(address=None):
+    """A client for the running service, or None if no service is listening"""
+    try:
+        client = AnalysisClient(address)
+    except OSError:
+        return None
+    try:
+        client.call("ping")
+    except (OSError, ValueError, ServiceError):
+        client.close()
+        return None
+    return client
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared analysis service for Video Block Editor")
+    parser.add_argument("--address", default=None, help="Unix socket path or host:port to listen on")
+    parser.add_argument("--workers", type=int, default=SERVICE_WORKERS, help="Jobs run at once")
+    args = parser.parse_args()
+
+    server = create_server(AnalysisService(args.workers), args.address)
+    print(f"Analysis service listening on {args.address or service_address()}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        family, bind_address = parse_address(args.address or service_address())
+        if family != socket.AF_INET and os.path.exists(bind_address):
+            os.remove(bind_address)
+
+if __name__ == "__main__":
+    main()
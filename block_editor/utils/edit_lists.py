@@ -0,0 +1,166 @@
+import json
+import os
+from fractions import Fraction
+from urllib.parse import quote
+from xml.etree import ElementTree
+
+EDIT_LIST_EXTENSIONS = ('.edl', '.fcpxml', '.otio', '.ffconcat')
+
+def frame_rate(props):
+    """Exact frame rate from ffprobe's r_frame_rate, falling back to frame_rate"""
+    if props.get('r_frame_rate'):
+        num, den = map(int, props['r_frame_rate'].split('/'))
+        if num and den:
+            return Fraction(num, den)
+    return Fraction(props.get('frame_rate') or 25).limit_denominator(1001)
+
+def to_frames(seconds, fps):
+    return int(round(Fraction(seconds).limit_denominator(1000000) * fps))
+
+def frames_to_timecode(frames, fps):
+    """Non-drop-frame HH:MM:SS:FF timecode, counting at the nearest whole rate"""
+    base = max(1, round(fps))
+    ff = frames % base
+    seconds = frames // base
+    return f"{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}:{ff:02d}"
+
+def build_edl(ranges, title, clip_name, fps):
+    """CMX3600 EDL with one cut event per range, laid back to back"""
+    lines = [f"TITLE: {title}", "FCM: NON-DROP FRAME", ""]
+    record = 0
+    for idx, (start, end) in enumerate(ranges, 1):
+        src_in = to_frames(start, fps)
+        src_out = to_frames(end, fps)
+        rec_out = record + src_out - src_in
+        lines.append(
+            f"{idx:03d}  AX       AA/V  C        "
+            f"{frames_to_timecode(src_in, fps)} {frames_to_timecode(src_out, fps)} "
+            f"{frames_to_timecode(record, fps)} {frames_to_timecode(rec_out, fps)}"
+        )
+        lines.append(f"* FROM CLIP NAME: {clip_name}")
+        lines.append("")
+        record = rec_out
+    return "\n".join(lines)
+
+def fcpxml_time(frames, fps):
+    """FCPXML rational time for a whole number of frames"""
+    value = Fraction(frames) / fps
+    if value.denominator == 1:
+        return f"{value.numerator}s"
+    return f"{value.numerator}/{value.denominator}s"
+
+def build_fcpxml(ranges, video_path, props, title):
+    """FCPXML 1.8 project with one asset-clip per range on the primary storyline"""
+    fps = frame_rate(props)
+    frame_duration = 1 / fps
+    source_end = to_frames(ranges[-1][1], fps) if ranges else 0
+
+    root = ElementTree.Element("fcpxml", version="1.8")
+    resources = ElementTree.SubElement(root, "resources")
+    ElementTree.SubElement(
+        resources, "format", id="r1",
+        frameDuration=f"{frame_duration.numerator}/{frame_duration.denominator}s",
+        width=str(props.get('width') or 1920), height=str(props.get('height') or 1080)
+    )
+    ElementTree.SubElement(
+        resources, "asset", id="r2", name=os.path.basename(video_path),
+        src="file://" + quote(os.path.abspath(video_path)),
+        start="0s", duration=fcpxml_time(source_end, fps),
+        hasVideo="1", hasAudio="1", format="r1"
+    )
+
+    library = ElementTree.SubElement(root, "library")
+    event = ElementTree.SubElement(library, "event", name=title)
+    project = ElementTree.SubElement(event, "project", name=title)
+    sequence = ElementTree.SubElement(project, "sequence", format="r1", tcStart="0s")
+    spine = ElementTree.SubElement(sequence, "spine")
+
+    offset = 0
+    for idx, (start, end) in enumerate(ranges, 1):
+        src_in = to_frames(start, fps)
+        length = to_frames(end, fps) - src_in
+        ElementTree.SubElement(
+            spine, "asset-clip", ref="r2", name=f"{title} {idx}",
+            offset=fcpxml_time(offset, fps), start=fcpxml_time(src_in, fps),
+            duration=fcpxml_time(length, fps)
+        )
+        offset += length
+    sequence.set("duration", fcpxml_time(offset, fps))
+
+    ElementTree.indent(root)
+    return '<?xml version="1.0" encoding="UTF-8"?>\n<!DOCTYPE fcpxml>\n' + ElementTree.tostring(root, encoding="unicode")
+
+def otio_time(seconds, rate):
+    return {"OTIO_SCHEMA": "RationalTime.1", "rate": rate, "value": round(seconds * rate, 6)}
+
+def build_otio(ranges, video_path, props, title):
+    """OpenTimelineIO timeline with matching video and audio tracks"""
+    rate = float(frame_rate(props))
+    reference = {
+        "OTIO_SCHEMA": "ExternalReference.1",
+        "metadata": {},
+        "name": os.path.basename(video_path),
+        "available_range": None,
+        "target_url": "file://" + quote(os.path.abspath(video_path)),
+    }
+
+    def track(kind):
+        clips = [
+            {
+                "OTIO_SCHEMA": "Clip.1",
+                "metadata": {},
+                "name": f"{title} {idx}",
+                "source_range": {
+                    "OTIO_SCHEMA": "TimeRange.1",
+                    "start_time": otio_time(start, rate),
+                    "duration": otio_time(end - start, rate),
+                },
+                "effects": [],
+                "markers": [],
+                "media_reference": dict(reference),
+            }
+            for idx, (start, end) in enumerate(ranges, 1)
+        ]
+        return {
+            "OTIO_SCHEMA": "Track.1", "metadata": {}, "name": kind, "source_range": None,
+            "effects": [], "markers": [], "kind": kind, "children": clips,
+        }
+
+    return {
+        "OTIO_SCHEMA": "Timeline.1",
+        "metadata": {},
+        "name": title,
+        "global_start_time": None,
+        "tracks": {
+            "OTIO_SCHEMA": "Stack.1", "metadata": {}, "name": "tracks", "source_range": None,
+            "effects": [], "markers": [], "children": [track("Video"), track("Audio")],
+        },
+    }
+
+def build_ffconcat(ranges, video_path):
+    """ffconcat script that plays the ranges straight from the source"""
+    path = os.path.abspath(video_path).replace("'", "'\\''")
+    lines = ["ffconcat version 1.0"]
+    for start, end in ranges:
+        lines += [f"file '{path}'", f"inpoint {round(start, 6)}", f"outpoint {round(end, 6)}"]
+    return "\n".join(lines) + "\n"
+
+def write_edit_lists(label_name, ranges, video_path, props, base_path):
+    """Write the EDL, FCPXML, OTIO and ffconcat files for one label.
+
+    base_path is the output path without extension. Returns the written paths.
+    """
+    fps = frame_rate(props)
+    contents = {
+        '.edl': build_edl(ranges, label_name, os.path.basename(video_path), fps),
+        '.fcpxml': build_fcpxml(ranges, video_path, props, label_name),
+        '.otio': json.dumps(build_otio(ranges, video_path, props, label_name), indent=4),
+        '.ffconcat': build_ffconcat(ranges, video_path),
+    }
+    paths = []
+    for extension in EDIT_LIST_EXTENSIONS:
+        path = base_path + extension
+        with open(path, "w") as f:
+            f.write(contents[extension])
+        paths.append(path)
+    return paths
@@ -0,0 +1,91 @@
+import json
+import os
+from . import ffmpeg_scheduler
+from .ffmpeg_progress import run_with_progress
+from .ffmpeg_scheduler import Priority
+from .analysis_cache import AnalysisCache
+from .media_cache import cache_dir, source_identity
+
+PROXY_HEIGHT = 540
+# Short, closed GOPs keep every seek close to a keyframe
+PROXY_ARGS = [
+    "-vf", f"scale=-2:{PROXY_HEIGHT}",
+    "-c:v", "libx264", "-preset", "veryfast", "-crf", "23",
+    "-g", "12", "-keyint_min", "12", "-sc_threshold", "0",
+    "-pix_fmt", "yuv420p",
+    "-c:a", "aac", "-b:a", "128k",
+    "-movflags", "+faststart"
+]
+# ffmpeg threads per proxy transcode; detection runs alongside it
+PROXY_THREADS = 4
+# Sources decoded by these codecs are too heavy to scrub on a laptop
+HEAVY_CODECS = {"prores", "hevc", "dnxhd", "vp9", "av1"}
+
+class EditingProxy:
+    """A small, intra-heavy transcode of a source used for playback and preview.
+
+    Proxies are cached by source identity, so reopening a file reuses its
+    proxy. Exports always read the original file.
+    """
+    def __init__(self, input_file):
+        self.input_file = input_file
+        self.path = os.path.join(cache_dir("editing_proxy"), f"{source_identity(input_file)}.mp4")
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def probe(self, priority=Priority.INTERACTIVE):
+        """Return the first video stream's codec, size, pixel format and the duration"""
+        cache = AnalysisCache()
+        cached = cache.get(self.input_file, "probe")
+        if cached is not None:
+            return cached
+        result = ffmpeg_scheduler.run([
+            "ffprobe", "-v", "error",
+            "-select_streams", "v:0",
+            "-show_entries", "stream=codec_name,width,height,pix_fmt:format=duration",
+            "-of", "json",
+            self.input_file
+        ], priority, check=True)
+        info = json.loads(result.stdout)
+        stream = info['streams'][0] if info.get('streams') else {}
+        props = {
+            'codec': stream.get('codec_name'),
+            'width': stream.get('width', 0),
+            'height': stream.get('height', 0),
+            'pix_fmt': stream.get('pix_fmt', ''),
+            'duration': float(info.get('format', {}).get('duration', 0) or 0)
+        }
+        cache.put(self.input_file, "probe", props)
+        return props
+
+    def needed(self, props=None):
+        """Whether the source is heavy enough to be worth proxying"""
+        props = props or self.probe()
+        return (
+            props['height'] > 1080
+            or props['codec'] in HEAVY_CODECS
+            or props['pix_fmt'].endswith(("10le", "10be", "12le", "12be"))
+        )
+
+    def render(self, progress_callback=None, job_callback=None, priority=Priority.PLAYBACK):
+        """Transcode the proxy if it isn't cached yet and return its path"""
+        if self.exists():
+            return self.path
+        duration = self.probe(priority if priority == Priority.CACHE_WARMING else Priority.INTERACTIVE)['duration']
+        tmp_path = self.path + ".part.mp4"
+        print(f"[DEBUG] EditingProxy: Transcoding {self.input_file} to {self.path}")
+        try:
+            run_with_progress(
+                ["ffmpeg", "-y", "-v", "error", "-i", self.input_file, *PROXY_ARGS, tmp_path],
+                duration=duration,
+                progress_callback=progress_callback,
+                job_callback=job_callback,
+                priority=priority,
+                threads=PROXY_THREADS
+            )
+            os.replace(tmp_path, self.path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return self.path
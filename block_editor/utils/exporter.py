@@ -0,0 +1,908 @@
+import json
+import os
+import subprocess
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from ..core.loudness import LoudnessStats
+from . import ffmpeg_scheduler
+from .edit_lists import write_edit_lists
+from .ffmpeg_scheduler import JobCancelled, Priority
+from .ffmpeg_progress import parse_progress_time
+from .media_cache import cache_key, source_identity
+from .toolchain import MissingCapability
+
+BUFFER_DURATION = 0.3  # Buffer around each exported block, in seconds
+MIN_SEGMENT_DURATION = 0.1
+# Keyframes closer than this to a cut point count as on the cut
+KEYFRAME_EPSILON = 0.001
+# Larger exports are split into several filtergraphs and joined afterwards
+MAX_SEGMENTS_PER_GRAPH = 64
+MAX_GRAPH_LENGTH = 16000
+# ffmpeg threads per export job when several jobs run in parallel
+THREADS_PER_JOB = 2
+# Loudness normalization targets (EBU R128 streaming levels)
+LOUDNESS_TARGET = -16.0
+LOUDNESS_TRUE_PEAK = -1.5
+LOUDNESS_RANGE = 11.0
+
+EXPORT_MODES = {
+    'reencode': "Re-encode",
+    'smart_cut': "Smart cut (stream copy)",
+    'filtergraph': "Single pass (filtergraph)",
+    'multi_output': "All labels in one pass",
+    'edit_list': "Edit lists only (EDL/FCPXML/OTIO/ffconcat)",
+    'per_block': "One file per block",
+}
+
+# Filters the single-pass modes build their graphs from
+GRAPH_FILTERS = ('split', 'asplit', 'trim', 'atrim', 'concat')
+GRAPH_MODES = ('filtergraph', 'multi_output', 'per_block')
+
+# Encoders used when re-encoding the edges of a smart cut
+SMART_CUT_ENCODERS = {
+    'h264': 'libx264',
+    'hevc': 'libx265',
+    'mpeg4': 'mpeg4',
+    'vp9': 'libvpx-vp9',
+    'prores': 'prores_ks',
+}
+# ffprobe's H.264 profile names as libx264 spells them; others are left to the encoder
+X264_PROFILES = {
+    'Constrained Baseline': 'baseline',
+    'Baseline': 'baseline',
+    'Main': 'main',
+    'High': 'high',
+    'High 10': 'high10',
+    'High 4:2:2': 'high422',
+    'High 4:4:4 Predictive': 'high444',
+}
+
+def get_video_properties(video_path):
+    """Get video properties using ffprobe"""
+    cmd = [
+        "ffprobe",
+        "-v", "error",
+        "-select_streams", "v:0",
+        "-show_entries", "stream=r_frame_rate,codec_name,width,height,pix_fmt,profile,level,time_base",
+        "-of", "json",
+        video_path
+    ]
+    video_info = json.loads(ffmpeg_scheduler.run(cmd, Priority.INTERACTIVE, check=True).stdout)
+
+    cmd = [
+        "ffprobe",
+        "-v", "error",
+        "-select_streams", "a:0",
+        "-show_entries", "stream=codec_name,bit_rate,sample_rate,channels",
+        "-of", "json",
+        video_path
+    ]
+    audio_info = json.loads(ffmpeg_scheduler.run(cmd, Priority.INTERACTIVE, check=True).stdout)
+
+    video_stream = video_info['streams'][0]
+    audio_stream = audio_info['streams'][0]
+
+    # Parse frame rate fraction
+    num, den = map(int, video_stream['r_frame_rate'].split('/'))
+    frame_rate = num/den
+
+    return {
+        'video_codec': video_stream['codec_name'],
+        'audio_codec': audio_stream['codec_name'],
+        'frame_rate': frame_rate,
+        'r_frame_rate': video_stream['r_frame_rate'],
+        'audio_bitrate': audio_stream.get('bit_rate', '192k'),
+        'width': video_stream.get('width'),
+        'height': video_stream.get('height'),
+        'pix_fmt': video_stream.get('pix_fmt'),
+        'profile': video_stream.get('profile'),
+        'level': video_stream.get('level'),
+        'time_base': video_stream.get('time_base'),
+        'sample_rate': audio_stream.get('sample_rate'),
+        'channels': audio_stream.get('channels'),
+    }
+
+def label_blocks(blocks, label_name):
+    """Return the blocks carrying label_name, sorted by start time"""
+    return sorted((block for block in blocks if block.label == label_name), key=lambda b: b.start)
+
+def compute_export_ranges(blocks, buffer_duration=BUFFER_DURATION):
+    """Compute the buffered (start, end) range of each block for export.
+
+    blocks must be sorted by start time. Each block is padded by
+    buffer_duration; where padding would overlap a neighbour, the cut is
+    placed at the midpoint between the two blocks instead.
+    """
+    ranges = []
+    for idx, block in enumerate(blocks):
+        # Calculate buffered start and end times
+        buffered_start = max(0, block.start - buffer_duration)
+        buffered_end = block.end + buffer_duration
+
+        # Adjust for overlaps with previous block
+        if idx > 0:
+            prev_block = blocks[idx-1]
+            prev_end = prev_block.end + buffer_duration
+            if buffered_start < prev_end:
+                # Find midpoint between blocks for clean separation
+                buffered_start = (prev_block.end + block.start) / 2
+
+        # Adjust for overlaps with next block
+        if idx < len(blocks) - 1:
+            next_block = blocks[idx+1]
+            if buffered_end > next_block.start - buffer_duration:
+                # Find midpoint between blocks for clean separation
+                buffered_end = (block.end + next_block.start) / 2
+
+        # Ensure minimum duration
+        if buffered_end - buffered_start < MIN_SEGMENT_DURATION:
+            print(f"[DEBUG] Warning: Block {idx} duration too short ({buffered_end - buffered_start}s), adjusting to {MIN_SEGMENT_DURATION}s")
+            buffered_end = buffered_start + MIN_SEGMENT_DURATION
+
+        ranges.append((buffered_start, buffered_end))
+    return ranges
+
+def plan_smart_cut(start, end, keyframes):
+    """Split a range into pieces that can be stream-copied or must be re-encoded.
+
+    Returns a list of (start, end, copy) pieces. The interior between the
+    first and last keyframe inside the range is copied; the partial GOPs at
+    either edge are re-encoded.
+    """
+    first = bisect_left(keyframes, start - KEYFRAME_EPSILON)
+    last = bisect_right(keyframes, end + KEYFRAME_EPSILON) - 1
+    if first >= len(keyframes) or last < 0 or keyframes[first] >= keyframes[last]:
+        return [(start, end, False)]
+
+    copy_start = keyframes[first]
+    copy_end = keyframes[last]
+    if end - copy_end <= KEYFRAME_EPSILON:
+        # The range ends exactly on a keyframe, so the last GOP can be copied too
+        copy_end = end
+
+    pieces = []
+    if copy_start - start > KEYFRAME_EPSILON:
+        pieces.append((start, copy_start, False))
+    pieces.append((copy_start, copy_end, True))
+    if end - copy_end > KEYFRAME_EPSILON:
+        pieces.append((copy_end, end, False))
+    return pieces
+
+def build_trim_concat_graph(ranges, offset=0.0):
+    """Build a filtergraph that cuts ranges out of input 0 and joins them.
+
+    Times are shifted by offset, for inputs that were already seeked. The
+    graph decodes the input once and produces [outv] and [outa].
+    """
+    count = len(ranges)
+    parts = [f"[0:v]split={count}" + "".join(f"[sv{i}]" for i in range(count)),
+             f"[0:a]asplit={count}" + "".join(f"[sa{i}]" for i in range(count))]
+    concat_inputs = ""
+    for i, (start, end) in enumerate(ranges):
+        start = round(max(0.0, start - offset), 6)
+        end = round(end - offset, 6)
+        parts.append(f"[sv{i}]trim=start={start}:end={end},setpts=PTS-STARTPTS[v{i}]")
+        parts.append(f"[sa{i}]atrim=start={start}:end={end},asetpts=PTS-STARTPTS[a{i}]")
+        concat_inputs += f"[v{i}][a{i}]"
+    parts.append(f"{concat_inputs}concat=n={count}:v=1:a=1[outv][outa]")
+    return ";".join(parts)
+
+def chunk_ranges(ranges, max_segments=MAX_SEGMENTS_PER_GRAPH, max_length=MAX_GRAPH_LENGTH):
+    """Split ranges into groups whose filtergraphs stay a manageable size"""
+    chunks = []
+    current = []
+    for export_range in ranges:
+        candidate = current + [export_range]
+        if current and (len(candidate) > max_segments
+                        or len(build_trim_concat_graph(candidate, candidate[0][0])) > max_length):
+            chunks.append(current)
+            candidate = [export_range]
+        current = candidate
+    if current:
+        chunks.append(current)
+    return chunks
+
+def build_multi_output_graph(label_ranges, offset=0.0):
+    """Build one filtergraph that routes ranges of input 0 to several outputs.
+
+    label_ranges is a list of ranges per output. The input is decoded once and
+    split to every range; output n is available as [outv{n}] and [outa{n}].
+    """
+    count = sum(len(ranges) for ranges in label_ranges)
+    parts = [f"[0:v]split={count}" + "".join(f"[sv{i}]" for i in range(count)),
+             f"[0:a]asplit={count}" + "".join(f"[sa{i}]" for i in range(count))]
+    i = 0
+    for n, ranges in enumerate(label_ranges):
+        concat_inputs = ""
+        for start, end in ranges:
+            start = round(max(0.0, start - offset), 6)
+            end = round(end - offset, 6)
+            parts.append(f"[sv{i}]trim=start={start}:end={end},setpts=PTS-STARTPTS[v{i}]")
+            parts.append(f"[sa{i}]atrim=start={start}:end={end},asetpts=PTS-STARTPTS[a{i}]")
+            concat_inputs += f"[v{i}][a{i}]"
+            i += 1
+        parts.append(f"{concat_inputs}concat=n={len(ranges)}:v=1:a=1[outv{n}][outa{n}]")
+    return ";".join(parts)
+
+def chunk_tagged_ranges(tagged, max_segments=MAX_SEGMENTS_PER_GRAPH):
+    """Split time-sorted (start, end, label) ranges into consecutive windows"""
+    return [tagged[i:i + max_segments] for i in range(0, len(tagged), max_segments)]
+
+def ranges_duration(ranges):
+    return sum(end - start for start, end in ranges)
+
+def window_progress(tagged):
+    """(duration, weight) for a multi-output window: its longest output and its total output"""
+    per_label = {}
+    for start, end, label_name in tagged:
+        per_label[label_name] = per_label.get(label_name, 0.0) + end - start
+    return max(per_label.values()), sum(per_label.values())
+
+def default_worker_count(threads_per_job=THREADS_PER_JOB):
+    """Size the export pool so that workers x threads roughly fills the CPU"""
+    return max(1, (os.cpu_count() or 1) // max(1, threads_per_job))
+
+class ExportCancelled(Exception):
+    pass
+
+class VideoExporter:
+    """Cuts labeled blocks out of a video and joins them into one file per label.
+
+    Independent ffmpeg jobs (segments, per-label encodes, chunks) run on a
+    bounded pool of workers. The first failure kills the other jobs.
+    progress_callback, if given, receives the overall progress as a 0..1
+    fraction parsed from ffmpeg's -progress output; it may be called from
+    worker threads. With a segment_cache, the per-range segments of the
+    reencode and smart_cut modes are reused across exports and joined with a
+    stream copy. With a loudness_target (LUFS), each label's audio is
+    normalized in the same pass using the loudness measured at detection.
+    With a toolchain, the export fails up front when ffmpeg lacks a codec or
+    filter the mode needs, and smart cut picks an encoder that is available.
+    """
+    def __init__(self, video_path, props, temp_dir, mode='reencode', workers=None,
+                 threads_per_job=THREADS_PER_JOB, progress_callback=None, segment_cache=None,
+                 loudness_target=None, toolchain=None):
+        if mode not in EXPORT_MODES:
+            raise ValueError(f"Unknown export mode: {mode}")
+        self.video_path = video_path
+        self.props = props
+        self.temp_dir = temp_dir
+        self.mode = mode
+        self.threads_per_job = threads_per_job
+        self.workers = workers or default_worker_count(threads_per_job)
+        self.progress_callback = progress_callback
+        self.segment_cache = segment_cache
+        self.loudness_target = loudness_target
+        self.toolchain = toolchain
+        self.loudnorm = {}  # label -> loudnorm filter for the current export
+        self._source_id = None
+        self._keyframes = None
+        self._frame_times = None
+        self._jobs = set()
+        self._lock = threading.Lock()
+        self._outputs = set()  # Final output files of the current export
+        self._written = set()  # Those of them an ffmpeg was started on
+        self._aborted = threading.Event()
+        # Progress is counted in seconds of output written
+        self._progress_total = 0.0
+        self._progress_done = 0.0
+        self._progress_running = {}
+        os.makedirs(self.temp_dir, exist_ok=True)
+
+    def run(self, cmd, duration=None, weight=None, threads=None):
+        """Run one ffmpeg command, raising CalledProcessError on failure.
+
+        duration is the output length the command writes, used to turn its
+        -progress time into a fraction; weight is how many seconds of overall
+        progress it stands for (defaults to duration). threads limits the
+        command's ffmpeg threads; without it the command may use every core.
+        """
+        tracked = bool(self.progress_callback and duration)
+        if tracked:
+            cmd = [cmd[0], "-progress", "pipe:1", "-nostats", *cmd[1:]]
+            weight = duration if weight is None else weight
+
+        key = object()
+        stdout_callback = None
+        if tracked:
+            def stdout_callback(line):
+                seconds = parse_progress_time(line)
+                if seconds is not None:
+                    self.update_progress(key, weight * min(1.0, seconds / duration))
+
+        with self._lock:
+            if self._aborted.is_set():
+                raise ExportCancelled("Export was cancelled")
+            self._written.update(arg for arg in cmd if arg in self._outputs)
+            job = ffmpeg_scheduler.submit(cmd, Priority.EXPORT, threads=threads, stdout_callback=stdout_callback)
+            self._jobs.add(job)
+        try:
+            result = job.result()
+        except JobCancelled:
+            raise ExportCancelled("Export was cancelled")
+        finally:
+            with self._lock:
+                self._jobs.discard(job)
+                self._progress_running.pop(key, None)
+        if self._aborted.is_set():
+            raise ExportCancelled("Export was cancelled")
+        if result.returncode != 0:
+            print(f"[DEBUG] ffmpeg failed: {result.stderr.strip()[-500:]}")
+            raise subprocess.CalledProcessError(result.returncode, cmd, stderr=result.stderr)
+        if tracked:
+            with self._lock:
+                self._progress_done += weight
+            self.report_progress()
+
+    def run_all(self, commands, durations=None, weights=None):
+        """Run independent commands on the worker pool, failing fast on the first error.
+
+        durations and weights, if given, line up with commands (see run).
+        """
+        jobs = list(zip(commands, durations or [None] * len(commands), weights or [None] * len(commands)))
+        threads = self.thread_limit(len(jobs))
+        if threads is None:
+            for cmd, duration, weight in jobs:
+                self.run(cmd, duration, weight)
+            return
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = [pool.submit(self.run, cmd, duration, weight, threads) for cmd, duration, weight in jobs]
+            try:
+                for future in as_completed(futures):
+                    future.result()
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                self.abort()
+                raise
+
+    def abort(self):
+        """Kill every running ffmpeg job and refuse to start new ones"""
+        self._aborted.set()
+        with self._lock:
+            for job in list(self._jobs):
+                job.cancel()
+
+    def update_progress(self, key, seconds):
+        with self._lock:
+            self._progress_running[key] = seconds
+        self.report_progress()
+
+    def report_progress(self):
+        if not self.progress_callback or not self._progress_total:
+            return
+        with self._lock:
+            done = self._progress_done + sum(self._progress_running.values())
+        self.progress_callback(min(1.0, done / self._progress_total))
+
+    def thread_limit(self, count):
+        """ffmpeg threads per command when count commands are run, or None when they run one at a time"""
+        if min(self.workers, count) > 1:
+            return self.threads_per_job
+        return None
+
+    def export_labels(self, blocks_by_label, output_paths):
+        """Export several labels; blocks_by_label and output_paths are keyed by label.
+
+        Returns the elapsed wall time in seconds.
+        """
+        started = time.perf_counter()
+        label_ranges = {
+            label_name: compute_export_ranges(sorted(blocks, key=lambda b: b.start))
+            for label_name, blocks in blocks_by_label.items()
+        }
+        if self.loudness_target is not None:
+            self.loudnorm = {
+                label_name: self.loudnorm_filter(blocks)
+                for label_name, blocks in blocks_by_label.items()
+            }
+        exported = sum(ranges_duration(ranges) for ranges in label_ranges.values())
+        # Re-encode mode encodes everything twice: once per segment, once in the concat
+        self._progress_total = exported * (2 if self.mode == 'reencode' and not self.copy_concat() else 1)
+        self._progress_done = 0.0
+
+        if self.mode == 'edit_list':
+            # Nothing is rendered; the cut lists sit next to where the videos would go
+            for label_name, ranges in label_ranges.items():
+                write_edit_lists(label_name, ranges, self.video_path, self.props,
+                                 os.path.splitext(output_paths[label_name])[0])
+            return time.perf_counter() - started
+
+        self.check_capabilities()
+        if self.mode == 'per_block':
+            self._outputs = {path for paths in self.block_paths(output_paths, label_ranges).values()
+                             for path in paths}
+        else:
+            self._outputs = set(output_paths.values())
+        self._written = set()
+        try:
+            if self.mode == 'multi_output':
+                self.multi_output_export(label_ranges, output_paths)
+            elif self.mode == 'per_block':
+                self.per_block_export(label_ranges, output_paths)
+            elif self.mode == 'filtergraph':
+                self.filtergraph_export(label_ranges, output_paths)
+            else:
+                for label_name, ranges in label_ranges.items():
+                    self.segment_export(label_name, ranges, output_paths[label_name])
+        except BaseException:
+            # Outputs this run never wrote may be a previous export's; leave them
+            self.discard_outputs(self._written)
+            raise
+
+        elapsed = time.perf_counter() - started
+        print(f"[DEBUG] Exported {len(label_ranges)} labels (mode={self.mode}) in {elapsed:.2f}s")
+        return elapsed
+
+    def export_label(self, label_name, blocks, output_path):
+        """Export the given blocks (any order) of one label to output_path.
+
+        Returns the elapsed wall time in seconds.
+        """
+        return self.export_labels({label_name: blocks}, {label_name: output_path})
+
+    def check_capabilities(self):
+        """Raise MissingCapability if the toolchain cannot run this export"""
+        toolchain = self.toolchain
+        if toolchain is None:
+            return
+        missing = []
+        for codec in (self.props.get('video_codec'), self.props.get('audio_codec')):
+            if not codec:
+                continue
+            if not toolchain.can_decode(codec):
+                missing.append(f"{codec} decoder")
+            if not toolchain.can_encode(codec):
+                missing.append(f"{codec} encoder")
+        filters = list(GRAPH_FILTERS) if self.mode in GRAPH_MODES else []
+        if any(self.loudnorm.values()):
+            filters += ['loudnorm', 'aresample']
+        missing += [f"{name} filter" for name in filters if not toolchain.has_filter(name)]
+        if missing:
+            raise MissingCapability(
+                f"ffmpeg {toolchain.version or ''} cannot export in {EXPORT_MODES[self.mode]} mode: "
+                f"missing {', '.join(missing)}"
+            )
+
+    def segment_export(self, label_name, ranges, output_path):
+        """Render one file per range, then join them in block order"""
+        if self.mode == 'smart_cut':
+            segment_paths = self.smart_cut_segments(label_name, ranges)
+        else:
+            segment_paths = self.reencode_segments(label_name, ranges)
+        # The list keeps block order no matter which worker finished first
+        segments_file = self.write_segments_file(label_name, segment_paths)
+        copy = self.copy_concat()
+        duration = None if copy else ranges_duration(ranges)
+        self.concat(segments_file, output_path, copy=copy, duration=duration)
+        print(f"[DEBUG] Exported {label_name} ({len(ranges)} segments, mode={self.mode})")
+
+    def loudnorm_filter(self, blocks):
+        """Single-pass loudnorm filter from the blocks' measured loudness, or None.
+
+        The label's statistics are merged from its blocks, so linear
+        loudnorm only has to apply a gain instead of measuring again.
+        """
+        stats = LoudnessStats.merge(getattr(block, 'loudness', None) for block in blocks)
+        integrated = stats.integrated()
+        if integrated is None:
+            print("[DEBUG] No loudness statistics for these blocks, exporting without normalization")
+            return None
+        true_peak = stats.true_peak if stats.true_peak is not None else 0.0
+        sample_rate = self.props.get('sample_rate') or 48000
+        # loudnorm resamples to 192 kHz internally
+        return (
+            f"loudnorm=I={self.loudness_target}:TP={LOUDNESS_TRUE_PEAK}:LRA={LOUDNESS_RANGE}"
+            f":measured_I={integrated:.2f}:measured_LRA={stats.loudness_range():.2f}"
+            f":measured_TP={true_peak:.2f}:measured_thresh={stats.threshold():.2f}"
+            f":linear=true,aresample={sample_rate}"
+        )
+
+    def audio_filter_args(self, label_name):
+        audio_filter = self.loudnorm.get(label_name)
+        return ["-af", audio_filter] if audio_filter else []
+
+    def copy_concat(self):
+        """Whether segments are joined by stream copy rather than re-encoded"""
+        return self.mode == 'smart_cut' or self.segment_cache is not None
+
+    def segment_key(self, cmd):
+        """Cache key for the segment a command renders: its arguments, minus paths and threads"""
+        if self._source_id is None:
+            self._source_id = source_identity(self.video_path)
+        args = []
+        skip = False
+        for arg in cmd[1:-1]:
+            if skip:
+                skip = False
+            elif arg == "-threads":
+                skip = True
+            else:
+                args.append(self._source_id if arg == self.video_path else arg)
+        return cache_key(args)
+
+    def render_segments(self, commands, segment_paths, durations):
+        """Run the segment commands, reusing cached segments when a cache is set.
+
+        Returns the paths to concat, in the order of segment_paths.
+        """
+        if self.segment_cache is None:
+            self.run_all(commands, durations)
+            return segment_paths
+
+        paths = list(segment_paths)
+        keys = [self.segment_key(cmd) for cmd in commands]
+        missing = []
+        for idx, key in enumerate(keys):
+            cached = self.segment_cache.get(key)
+            if cached:
+                paths[idx] = cached
+                self._progress_done += durations[idx]
+            else:
+                missing.append(idx)
+        print(f"[DEBUG] Segment cache: reusing {len(paths) - len(missing)}, rendering {len(missing)}")
+        self.report_progress()
+
+        self.run_all([commands[idx] for idx in missing], [durations[idx] for idx in missing])
+        for idx in missing:
+            paths[idx] = self.segment_cache.put(keys[idx], segment_paths[idx])
+        self.segment_cache.evict(keep=paths)
+        return paths
+
+    def write_segments_file(self, label_name, segment_paths):
+        segments_file = os.path.join(self.temp_dir, f"segments_{label_name}.txt")
+        with open(segments_file, "w") as f:
+            for segment_path in segment_paths:
+                # Write absolute path to segments file
+                f.write(f"file '{os.path.abspath(segment_path)}'\n")
+        return segments_file
+
+    def reencode_segments(self, label_name, ranges):
+        segment_paths = []
+        commands = []
+        for idx, (start, end) in enumerate(ranges):
+            segment_path = os.path.join(self.temp_dir, f"segment_{label_name}_{idx}.mp4")
+            start_time = str(round(start, 3))
+            duration_str = str(round(end - start, 3))
+
+            print(f"[DEBUG] Extracting segment {idx} for {label_name}:")
+            print(f"[DEBUG]   Buffered: {start_time}s to {str(round(end, 3))}s")
+
+            # Cut segment using ffmpeg
+            commands.append([
+                "ffmpeg", "-y",
+                "-ss", start_time,
+                "-t", duration_str,
+                "-i", self.video_path,
+                "-c:v", self.props['video_codec'],
+                "-c:a", self.props['audio_codec'],
+                *self.audio_filter_args(label_name),
+                "-copyts",
+                "-avoid_negative_ts", "make_zero",
+                segment_path
+            ])
+            segment_paths.append(segment_path)
+        return self.render_segments(commands, segment_paths, [end - start for start, end in ranges])
+
+    def concat(self, segments_file, output_path, copy=False, duration=None):
+        if copy:
+            # The concat demuxer already starts at zero; without -copyts the
+            # muxer shifts the video late by the AAC priming packet it puts
+            # before zero, which the mp4 edit list handles instead
+            codec_args = ["-c", "copy", "-copyts"]
+        else:
+            codec_args = ["-c:v", self.props['video_codec'], "-c:a", self.props['audio_codec']]
+        self.run([
+            "ffmpeg", "-y",
+            "-f", "concat",
+            "-safe", "0",
+            "-i", segments_file,
+            *codec_args,
+            output_path
+        ], duration)
+
+    def filtergraph_export(self, label_ranges, output_paths):
+        """Render every label with one ffmpeg per chunk of trim/concat filtergraph.
+
+        All labels' renders share the worker pool; chunked labels are joined
+        once their chunks are done.
+        """
+        commands = []
+        durations = []
+        chunked = {}
+        for label_name, ranges in label_ranges.items():
+            chunks = chunk_ranges(ranges)
+            if len(chunks) == 1:
+                commands.append(self.graph_command(chunks[0], output_paths[label_name], label_name))
+                durations.append(ranges_duration(chunks[0]))
+                continue
+
+            print(f"[DEBUG] Filtergraph for {label_name} split into {len(chunks)} chunks")
+            chunked[label_name] = []
+            for idx, chunk in enumerate(chunks):
+                chunk_path = os.path.join(self.temp_dir, f"chunk_{label_name}_{idx}.mp4")
+                commands.append(self.graph_command(chunk, chunk_path, label_name))
+                durations.append(ranges_duration(chunk))
+                chunked[label_name].append(chunk_path)
+
+        self.run_all(commands, durations)
+        for label_name, chunk_paths in chunked.items():
+            segments_file = self.write_segments_file(label_name, chunk_paths)
+            # Every chunk has identical encoding parameters, so they join without re-encoding
+            self.concat(segments_file, output_paths[label_name], copy=True)
+
+    def graph_command(self, ranges, output_path, label_name=None):
+        # Only decode the window that the ranges cover
+        window_start = ranges[0][0]
+        window_end = ranges[-1][1]
+        graph = build_trim_concat_graph(ranges, offset=window_start)
+        audio_out = "[outa]"
+        audio_filter = self.loudnorm.get(label_name)
+        if audio_filter:
+            graph += f";[outa]{audio_filter}[outan]"
+            audio_out = "[outan]"
+        return [
+            "ffmpeg", "-y",
+            "-ss", str(round(window_start, 6)),
+            "-t", str(round(window_end - window_start, 6)),
+            "-i", self.video_path,
+            "-filter_complex", graph,
+            "-map", "[outv]", "-map", audio_out,
+            "-c:v", self.props['video_codec'],
+            "-c:a", self.props['audio_codec'],
+            output_path
+        ]
+
+    def multi_output_export(self, label_ranges, output_paths):
+        """Decode the source once and write every label's output from it"""
+        tagged = sorted(
+            (start, end, label_name)
+            for label_name, ranges in label_ranges.items()
+            for start, end in ranges
+        )
+        windows = chunk_tagged_ranges(tagged)
+        if len(windows) == 1:
+            self.run(self.multi_graph_command(windows[0], output_paths, self.loudnorm), *window_progress(windows[0]))
+            return
+
+        # Each window covers the next stretch of the source, so the whole
+        # export still decodes the source about once
+        print(f"[DEBUG] Multi-output export split into {len(windows)} windows")
+        chunk_paths = {label_name: [] for label_name in label_ranges}
+        commands = []
+        durations = []
+        weights = []
+        for idx, window in enumerate(windows):
+            window_paths = {}
+            for _, _, label_name in window:
+                if label_name not in window_paths:
+                    window_paths[label_name] = os.path.join(self.temp_dir, f"chunk_{label_name}_{idx}.mp4")
+                    chunk_paths[label_name].append(window_paths[label_name])
+            commands.append(self.multi_graph_command(window, window_paths, self.loudnorm))
+            duration, weight = window_progress(window)
+            durations.append(duration)
+            weights.append(weight)
+        self.run_all(commands, durations, weights)
+
+        for label_name, paths in chunk_paths.items():
+            segments_file = self.write_segments_file(label_name, paths)
+            self.concat(segments_file, output_paths[label_name], copy=True)
+
+    def block_paths(self, output_paths, label_ranges):
+        """Clip paths per label: <label>_blocks_001.mp4 and on, next to the label's output path"""
+        return {
+            label_name: [f"{os.path.splitext(output_paths[label_name])[0]}_{idx:03d}.mp4"
+                         for idx in range(1, len(ranges) + 1)]
+            for label_name, ranges in label_ranges.items()
+        }
+
+    def per_block_export(self, label_ranges, output_paths):
+        """Write every block to its own file, decoding the source once.
+
+        Each block is an output of the same multi-output graph, so ranges
+        between blocks are decoded but never encoded or written.
+        """
+        block_paths = self.block_paths(output_paths, label_ranges)
+        filters = {
+            path: self.loudnorm.get(label_name)
+            for label_name, paths in block_paths.items() for path in paths
+        }
+        # Tag each range with its clip path, which doubles as the output key
+        tagged = sorted(
+            (start, end, path)
+            for label_name, ranges in label_ranges.items()
+            for (start, end), path in zip(ranges, block_paths[label_name])
+        )
+
+        windows = chunk_tagged_ranges(tagged)
+        print(f"[DEBUG] Per-block export: {len(tagged)} clips in {len(windows)} passes")
+        commands = []
+        durations = []
+        weights = []
+        for window in windows:
+            commands.append(self.multi_graph_command(window, {path: path for _, _, path in window}, filters))
+            duration, weight = window_progress(window)
+            durations.append(duration)
+            weights.append(weight)
+        self.run_all(commands, durations, weights)
+
+    def multi_graph_command(self, tagged, output_paths, filters=None):
+        """One ffmpeg writing each key of output_paths; filters maps keys to audio filters"""
+        window_start = min(start for start, _, _ in tagged)
+        window_end = max(end for _, end, _ in tagged)
+        labels = [label_name for label_name in output_paths if any(t[2] == label_name for t in tagged)]
+        label_ranges = [[(start, end) for start, end, name in tagged if name == label_name] for label_name in labels]
+
+        graph = build_multi_output_graph(label_ranges, offset=window_start)
+        audio_outs = []
+        for n, label_name in enumerate(labels):
+            audio_filter = (filters or {}).get(label_name)
+            if audio_filter:
+                graph += f";[outa{n}]{audio_filter}[outan{n}]"
+                audio_outs.append(f"[outan{n}]")
+            else:
+                audio_outs.append(f"[outa{n}]")
+
+        cmd = [
+            "ffmpeg", "-y",
+            "-ss", str(round(window_start, 6)),
+            "-t", str(round(window_end - window_start, 6)),
+            "-i", self.video_path,
+            "-filter_complex", graph,
+        ]
+        for n, label_name in enumerate(labels):
+            cmd += [
+                "-map", f"[outv{n}]", "-map", audio_outs[n],
+                "-c:v", self.props['video_codec'],
+                "-c:a", self.props['audio_codec'],
+                output_paths[label_name]
+            ]
+        return cmd
+
+    def keyframes(self):
+        """Keyframe timestamps of the first video stream, read from packet flags"""
+        if self._keyframes is None:
+            self.read_packets()
+        return self._keyframes
+
+    def frame_times(self):
+        """Sorted presentation timestamps of every frame of the first video stream"""
+        if self._frame_times is None:
+            self.read_packets()
+        return self._frame_times
+
+    def read_packets(self):
+        output = ffmpeg_scheduler.run([
+            "ffprobe", "-v", "error",
+            "-select_streams", "v:0",
+            "-show_entries", "packet=pts_time,flags",
+            "-of", "csv=p=0",
+            self.video_path
+        ], Priority.EXPORT, check=True).stdout
+        frame_times = []
+        keyframes = []
+        for line in output.splitlines():
+            pts_time, _, flags = line.partition(",")
+            try:
+                pts = float(pts_time)
+            except ValueError:
+                continue
+            frame_times.append(pts)
+            if "K" in flags:
+                keyframes.append(pts)
+        self._frame_times = sorted(frame_times)
+        self._keyframes = sorted(keyframes)
+
+    def frame_span(self, start, end):
+        """(first frame time, frame count) of the source frames shown in [start, end),
+        the frames trim=start:end keeps"""
+        frame_times = self.frame_times()
+        first = bisect_left(frame_times, start - KEYFRAME_EPSILON)
+        last = bisect_left(frame_times, end - KEYFRAME_EPSILON)
+        if first >= last:
+            return start, 0
+        return frame_times[first], last - first
+
+    def matching_video_args(self):
+        """Encoder arguments that reproduce the source stream for concat copy"""
+        props = self.props
+        encoder = SMART_CUT_ENCODERS.get(props['video_codec'], props['video_codec'])
+        if self.toolchain is not None:
+            encoder = self.toolchain.encoder_for(props['video_codec'], encoder) or encoder
+        args = ["-c:v", encoder]
+        if props.get('pix_fmt'):
+            args += ["-pix_fmt", props['pix_fmt']]
+        if encoder == 'libx264':
+            args += ["-crf", "16", "-preset", "medium"]
+            if props.get('profile') in X264_PROFILES:
+                args += ["-profile:v", X264_PROFILES[props['profile']]]
+        elif encoder == 'libx265':
+            args += ["-crf", "18", "-preset", "medium"]
+        # Keep the source frames' timestamps; mp4 output otherwise defaults to
+        # constant frame rate and repeats a first frame that starts after the cut
+        args += ["-fps_mode", "passthrough"]
+        if props.get('time_base'):
+            args += ["-video_track_timescale", props['time_base'].split('/')[-1]]
+        return args
+
+    def matching_audio_args(self):
+        props = self.props
+        args = ["-c:a", props['audio_codec']]
+        if props.get('sample_rate'):
+            args += ["-ar", str(props['sample_rate'])]
+        if props.get('channels'):
+            args += ["-ac", str(props['channels'])]
+        if props.get('audio_bitrate'):
+            args += ["-b:a", str(props['audio_bitrate'])]
+        return args
+
+    def smart_cut_segments(self, label_name, ranges):
+        keyframes = self.keyframes()
+        segment_paths = []
+        commands = []
+        durations = []
+        copied = 0.0
+        encoded = 0.0
+        for idx, (start, end) in enumerate(ranges):
+            for part, (piece_start, piece_end, copy) in enumerate(plan_smart_cut(start, end, keyframes)):
+                # -t alone is not frame-accurate: a stream copy stops on decode
+                # timestamps, which lag behind with B-frames, and so runs into
+                # the next piece. Each piece starts on its first frame, as the
+                # trim filter's output does, and is limited to the exact number
+                # of frames it covers; a copied piece's frames are the packets
+                # up to the keyframe where the next piece starts.
+                first_frame, frames = self.frame_span(piece_start, piece_end)
+                if not frames:
+                    continue
+                length = frames / self.props['frame_rate']
+                segment_path = os.path.join(self.temp_dir, f"segment_{label_name}_{idx}_{part}.mp4")
+                if copy:
+                    # Video packets are copied from keyframe to keyframe; audio is
+                    # re-encoded so it is trimmed to the same sample-accurate range
+                    video_args = ["-c:v", "copy"]
+                    copied += length
+                else:
+                    video_args = self.matching_video_args()
+                    encoded += length
+                commands.append([
+                    "ffmpeg", "-y", "-v", "error",
+                    "-ss", str(round(first_frame, 6)),
+                    "-i", self.video_path,
+                    "-t", str(round(length, 6)),
+                    "-frames:v", str(frames),
+                    "-map", "0:v:0", "-map", "0:a:0?",
+                    *video_args,
+                    *self.matching_audio_args(),
+                    *self.audio_filter_args(label_name),
+                        segment_path
+                ])
+                durations.append(length)
+                segment_paths.append(segment_path)
+        print(f"[DEBUG] Smart cut {label_name}: copied {copied:.2f}s, re-encoded {encoded:.2f}s")
+        return self.render_segments(commands, segment_paths, durations)
+
+    def discard_outputs(self, paths):
+        """Remove half-written outputs after a failed export"""
+        for path in paths:
+            if os.path.exists(path):
+                try:
+                    os.remove(path)
+                except OSError as e:
+                    print(f"[DEBUG] Error removing partial output {path}: {e}")
+
+    def cleanup(self):
+        """Remove the temporary segments directory"""
+        if os.path.exists(self.temp_dir):
+            for file in os.listdir(self.temp_dir):
+                try:
+                    os.remove(os.path.join(self.temp_dir, file))
+                except Exception as e:
+                    print(f"[DEBUG] Error removing temp file {file}: {e}")
+            try:
+                os.rmdir(self.temp_dir)
+            except Exception as e:
+                print(f"[DEBUG] Error removing temp directory: {e}")
@@ -0,0 +1,58 @@
+import os
+import tempfile
+from contextlib import contextmanager
+import numpy as np
+from ..core.features import FeatureTable
+from ..core.retakes import fingerprints
+from . import ffmpeg_scheduler
+from .ffmpeg_scheduler import Priority
+
+# Features are computed on mono audio at this rate; enough for the speech band
+FEATURE_SAMPLE_RATE = 16000
+
+class FeatureExtractor:
+    """Computes a FeatureTable, or retake fingerprints, for a source's blocks.
+
+    The audio is decoded once to a temporary file of raw 32-bit floats and
+    memory-mapped, so an hour-long source is processed chunk by chunk
+    without holding its samples in memory.
+    """
+    def __init__(self, input_file, sample_rate=FEATURE_SAMPLE_RATE, priority=Priority.DETECTION):
+        self.input_file = input_file
+        self.sample_rate = sample_rate
+        self.priority = priority
+
+    def decode(self, path):
+        ffmpeg_scheduler.run([
+            "ffmpeg", "-y", "-v", "error",
+            "-i", self.input_file,
+            "-vn", "-ac", "1", "-ar", str(self.sample_rate),
+            "-f", "f32le", path
+        ], self.priority, check=True)
+
+    @contextmanager
+    def samples(self):
+        """The decoded samples as a read-only array, valid inside the with block"""
+        with tempfile.TemporaryDirectory(prefix="features") as tmp_dir:
+            path = os.path.join(tmp_dir, "audio.f32")
+            self.decode(path)
+            if os.path.getsize(path) == 0:
+                yield np.zeros(0, dtype=np.float32)
+                return
+            samples = np.memmap(path, dtype='<f4', mode='r')
+            try:
+                yield samples
+            finally:
+                # Drop this reference to the mapping before the directory is removed
+                del samples
+
+    def extract(self, blocks):
+        with self.samples() as samples:
+            table = FeatureTable.compute(samples, self.sample_rate, blocks)
+        print(f"[DEBUG] FeatureExtractor: computed features for {len(table)} blocks")
+        return table
+
+    def fingerprints(self, blocks):
+        """Retake fingerprints (see core.retakes) of blocks"""
+        with self.samples() as samples:
+            return fingerprints(samples, self.sample_rate, blocks)
@@ -0,0 +1,43 @@
+import subprocess
+from . import ffmpeg_scheduler
+from .ffmpeg_scheduler import Priority
+
+def parse_progress_time(line):
+    """Return the output time in seconds from an ffmpeg -progress line, or None"""
+    key, _, value = line.strip().partition("=")
+    try:
+        if key in ("out_time_us", "out_time_ms"):
+            # ffmpeg reports both keys in microseconds
+            return int(value) / 1_000_000
+        if key == "out_time":
+            hours, minutes, seconds = value.split(":")
+            return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    except ValueError:
+        return None
+    return None
+
+def run_with_progress(cmd, duration=None, progress_callback=None, job_callback=None, priority=Priority.EXPORT,
+                      threads=None):
+    """Run an ffmpeg command, reporting progress as a 0..1 fraction of duration.
+
+    cmd must not already contain -progress. job_callback receives the
+    scheduler Job so callers can cancel it. threads, if given, limits the
+    job to that share of the CPU (see ffmpeg_scheduler). Raises
+    CalledProcessError on failure.
+    """
+    cmd = [cmd[0], "-progress", "pipe:1", "-nostats", *cmd[1:]]
+
+    def stdout_callback(line):
+        seconds = parse_progress_time(line)
+        if seconds is not None and duration and progress_callback:
+            progress_callback(min(1.0, seconds / duration))
+
+    job = ffmpeg_scheduler.submit(cmd, priority, threads=threads, stdout_callback=stdout_callback)
+    if job_callback:
+        job_callback(job)
+    result = job.result()
+    if result.returncode != 0:
+        raise subprocess.CalledProcessError(result.returncode, cmd, stderr=result.stderr)
+    if progress_callback:
+        progress_callback(1.0)
+    return result.returncode
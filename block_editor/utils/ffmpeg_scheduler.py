@@ -0,0 +1,338 @@
+import asyncio
+import errno
+import heapq
+import itertools
+import os
+import re
+import shutil
+import signal
+import subprocess
+import threading
+from concurrent.futures import Future
+from enum import IntEnum
+
+class Priority(IntEnum):
+    """Job classes, most urgent first"""
+    INTERACTIVE = 0   # probes the user is waiting on
+    PLAYBACK = 1      # proxies that playback depends on
+    DETECTION = 2     # silence and loudness analysis
+    EXPORT = 3
+    CACHE_WARMING = 4
+
+# Background classes run niced so the GUI and the media stack stay responsive
+NICE_LEVELS = {
+    Priority.INTERACTIVE: 0,
+    Priority.PLAYBACK: 0,
+    Priority.DETECTION: 5,
+    Priority.EXPORT: 10,
+    Priority.CACHE_WARMING: 15,
+}
+# CPU slots kept free of background work for interactive and playback jobs
+RESERVED_SLOTS = 1
+# Cache warming gives way while any of these classes has work
+YIELDS_TO = (Priority.PLAYBACK, Priority.DETECTION, Priority.EXPORT)
+CAN_SUSPEND = hasattr(signal, "SIGSTOP")
+# Lowers a job's priority before it execs; a preexec_fn is unsafe in this threaded process
+NICE_COMMAND = shutil.which("nice") if os.name == "posix" else None
+LINE_BREAK = re.compile(rb"\r\n|\r|\n")
+# ffmpeg options that take no value, for telling output files from option values
+FLAG_OPTIONS = {
+    "-y", "-n", "-an", "-vn", "-sn", "-dn", "-nostats", "-stats", "-nostdin", "-hide_banner",
+    "-shortest", "-copyts", "-start_at_zero", "-accurate_seek", "-noaccurate_seek",
+}
+
+class JobCancelled(Exception):
+    pass
+
+def is_ffmpeg(cmd):
+    return os.path.basename(cmd[0]).startswith("ffmpeg") and "-i" in cmd
+
+def with_thread_limit(cmd, threads):
+    """An ffmpeg command with -threads for every input and output that sets none.
+
+    Other commands (ffprobe, ffmpeg without inputs) are returned unchanged.
+    """
+    if not is_ffmpeg(cmd):
+        return cmd
+    limited = [cmd[0]]
+    options = []  # Options of the input or output file that comes next
+    i = 1
+    while i < len(cmd):
+        arg = cmd[i]
+        if arg == "-i" or not arg.startswith("-") or arg == "-":
+            if "-threads" not in options:
+                options += ["-threads", str(threads)]
+            file_args = cmd[i:i + 2] if arg == "-i" else [arg]
+            limited += options + file_args
+            options = []
+            i += len(file_args)
+        elif arg in FLAG_OPTIONS:
+            options.append(arg)
+            i += 1
+        else:
+            options += cmd[i:i + 2]
+            i += 2
+    return limited + options
+
+def niced(cmd, nice):
+    """cmd run through nice(1) at the given niceness"""
+    if not nice or NICE_COMMAND is None:
+        return cmd
+    executable = shutil.which(cmd[0])
+    if executable is None:
+        # What exec would raise, rather than nice's exit status 127
+        raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), cmd[0])
+    return [NICE_COMMAND, "-n", str(nice), executable, *cmd[1:]]
+
+class Job:
+    """A queued or running ffmpeg/ffprobe process. Thread-safe to wait on and cancel."""
+    def __init__(self, scheduler, cmd, priority, timeout, threads, stdout_callback, stderr_callback):
+        self.scheduler = scheduler
+        self.cmd = list(cmd)
+        self.priority = Priority(priority)
+        self.timeout = timeout
+        self.threads = None if threads is None else max(1, threads)
+        self.slots = scheduler.slots_for(self.cmd, self.priority, self.threads)
+        self.stdout_callback = stdout_callback
+        self.stderr_callback = stderr_callback
+        self.future = Future()
+        self.process = None
+        self.cancelled = False
+        self.suspended = False
+
+    def result(self, timeout=None):
+        """Wait for the job and return a CompletedProcess with decoded output"""
+        return self.future.result(timeout)
+
+    def cancel(self):
+        self.scheduler.cancel(self)
+
+    def done(self):
+        return self.future.done()
+
+class FFmpegScheduler:
+    """Runs every ffmpeg/ffprobe process of the editor on one asyncio loop.
+
+    Jobs start in priority order while their slots fit in max_slots
+    (defaults to the CPU count). A job submitted with a thread count takes
+    that many slots and ffmpeg is given -threads to match; an ffmpeg job
+    without one runs unrestricted and takes every slot its class may use.
+    Background classes may not take the last RESERVED_SLOTS,
+    so a probe or a proxy never waits behind an export, and they run niced.
+    Output is streamed line by line to optional
+    callbacks, which run on the scheduler thread.
+
+    Cache-warming jobs only run while nothing more important needs the CPU:
+    while playback, detection or export jobs are queued or running, or while
+    a caller holds the scheduler (e.g. during media playback), no new ones
+    start and running ones are stopped with SIGSTOP until the CPU is free.
+    """
+    def __init__(self, max_slots=None):
+        self.max_slots = max_slots or os.cpu_count() or 1
+        self.used_slots = 0
+        self._queue = []
+        self._order = itertools.count()
+        self._running = set()
+        self._holds = 0
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="ffmpeg-scheduler", daemon=True)
+        self._thread.start()
+
+    def submit(self, cmd, priority=Priority.EXPORT, timeout=None, threads=None,
+               stdout_callback=None, stderr_callback=None):
+        """Queue a command and return its Job without waiting.
+
+        threads limits an ffmpeg command to that many threads per input and
+        output; without it ffmpeg picks its own count.
+        """
+        job = Job(self, cmd, priority, timeout, threads, stdout_callback, stderr_callback)
+        self.loop.call_soon_threadsafe(self._enqueue, job)
+        return job
+
+    def run(self, cmd, priority=Priority.EXPORT, timeout=None, check=False, job_callback=None, **kwargs):
+        """Run a command to completion, like subprocess.run(capture_output=True, text=True).
+
+        job_callback receives the Job before waiting, so another thread can cancel it.
+        """
+        job = self.submit(cmd, priority, timeout, **kwargs)
+        if job_callback:
+            job_callback(job)
+        result = job.result()
+        if check and result.returncode != 0:
+            raise subprocess.CalledProcessError(result.returncode, cmd, result.stdout, result.stderr)
+        return result
+
+    def cancel(self, job):
+        self.loop.call_soon_threadsafe(self._cancel, job)
+
+    def hold(self):
+        """Pause cache warming until a matching release()"""
+        self.loop.call_soon_threadsafe(self._set_holds, 1)
+
+    def release(self):
+        self.loop.call_soon_threadsafe(self._set_holds, -1)
+
+    def _set_holds(self, change):
+        self._holds = max(0, self._holds + change)
+        self._dispatch()
+
+    def _warming_blocked(self):
+        if self._holds:
+            return True
+        jobs = itertools.chain(self._running, (job for _, _, job in self._queue))
+        return any(job.priority in YIELDS_TO and not job.cancelled for job in jobs)
+
+    def _update_suspended(self, blocked):
+        """Stop or continue running cache-warming processes; stopped ones give back their slots"""
+        if not CAN_SUSPEND:
+            return
+        for job in self._running:
+            if job.priority != Priority.CACHE_WARMING or job.process is None or job.process.returncode is not None:
+                continue
+            if blocked and not job.suspended:
+                job.process.send_signal(signal.SIGSTOP)
+                job.suspended = True
+                self.used_slots -= job.slots
+            elif not blocked and job.suspended:
+                job.process.send_signal(signal.SIGCONT)
+                job.suspended = False
+                self.used_slots += job.slots
+
+    def _enqueue(self, job):
+        heapq.heappush(self._queue, (job.priority, next(self._order), job))
+        self._dispatch()
+
+    def slots_for(self, cmd, priority, threads):
+        """Slots a job takes: its thread limit, one for ffprobe, else its class's whole budget"""
+        if threads is not None:
+            return threads
+        return self._limit(priority) if is_ffmpeg(cmd) else 1
+
+    def _limit(self, priority):
+        if priority <= Priority.PLAYBACK:
+            return self.max_slots
+        return max(1, self.max_slots - RESERVED_SLOTS)
+
+    def _dispatch(self):
+        blocked = self._warming_blocked()
+        self._update_suspended(blocked)
+        while self._queue:
+            priority, _, job = self._queue[0]
+            if job.cancelled:
+                heapq.heappop(self._queue)
+                continue
+            if priority == Priority.CACHE_WARMING and blocked:
+                break
+            # A job wider than the budget still runs, just on its own
+            if self._running and self.used_slots + job.slots > self._limit(priority):
+                break
+            heapq.heappop(self._queue)
+            self.used_slots += job.slots
+            self._running.add(job)
+            self.loop.create_task(self._execute(job))
+
+    def _cancel(self, job):
+        if job.done() or job.cancelled:
+            return
+        job.cancelled = True
+        if job not in self._running:
+            # Still queued; _dispatch drops it
+            job.future.set_exception(JobCancelled("Job was cancelled"))
+        elif job.process is not None and job.process.returncode is None:
+            job.process.kill()
+            if job.suspended:
+                job.process.send_signal(signal.SIGCONT)
+
+    async def _execute(self, job):
+        try:
+            result = await self._spawn(job)
+        except BaseException as e:
+            job.future.set_exception(JobCancelled("Job was cancelled") if job.cancelled else e)
+        else:
+            if job.cancelled:
+                job.future.set_exception(JobCancelled("Job was cancelled"))
+            else:
+                job.future.set_result(result)
+        finally:
+            self._running.discard(job)
+            if not job.suspended:
+                self.used_slots -= job.slots
+            job.suspended = False
+            self._dispatch()
+
+    async def _spawn(self, job):
+        cmd = job.cmd if job.threads is None else with_thread_limit(job.cmd, job.threads)
+        cmd = niced(cmd, NICE_LEVELS[job.priority])
+        job.process = await asyncio.create_subprocess_exec(
+            *cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+        if job.cancelled:
+            job.process.kill()
+        elif job.priority == Priority.CACHE_WARMING and self._warming_blocked():
+            # More important work arrived while the process was starting
+            self._update_suspended(True)
+        stdout = []
+        stderr = []
+        pumps = asyncio.gather(
+            self._pump(job.process.stdout, stdout, job.stdout_callback),
+            self._pump(job.process.stderr, stderr, job.stderr_callback),
+            job.process.wait()
+        )
+        try:
+            await asyncio.wait_for(pumps, job.timeout)
+        except asyncio.TimeoutError:
+            await self._kill(job)
+            raise subprocess.TimeoutExpired(job.cmd, job.timeout)
+        except BaseException:
+            # A failing output callback must not leave the process behind
+            await self._kill(job)
+            raise
+        return subprocess.CompletedProcess(
+            job.cmd, job.process.returncode,
+            b"".join(stdout).decode(errors="replace"), b"".join(stderr).decode(errors="replace")
+        )
+
+    async def _kill(self, job):
+        if job.process.returncode is None:
+            job.process.kill()
+            await job.process.wait()
+
+    async def _pump(self, stream, sink, callback):
+        """Collect a stream, passing each complete line to callback"""
+        pending = b""
+        while True:
+            chunk = await stream.read(65536)
+            if not chunk:
+                break
+            sink.append(chunk)
+            if callback is None:
+                continue
+            lines = LINE_BREAK.split(pending + chunk)
+            pending = lines.pop()
+            for line in lines:
+                callback(line.decode(errors="replace"))
+        if callback is not None and pending:
+            callback(pending.decode(errors="replace"))
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def get_scheduler():
+    """The process-wide scheduler, started on first use"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = FFmpegScheduler()
+        return _scheduler
+
+def submit(cmd, priority=Priority.EXPORT, **kwargs):
+    return get_scheduler().submit(cmd, priority, **kwargs)
+
+def run(cmd, priority=Priority.EXPORT, **kwargs):
+    return get_scheduler().run(cmd, priority, **kwargs)
+
+def hold():
+    get_scheduler().hold()
+
+def release():
+    get_scheduler().release()
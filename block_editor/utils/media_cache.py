@@ -0,0 +1,27 @@
+import hashlib
+import json
+import os
+
+CACHE_ROOT = os.path.expanduser("~/.cache/video_editor")
+
+def cache_dir(*parts):
+    """Return (and create) a directory under the editor's cache root"""
+    path = os.path.join(CACHE_ROOT, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def source_identity(path):
+    """Identify a media file by its absolute path, size and modification time.
+
+    Cheap enough to compute on every load; changes whenever the file is replaced
+    or rewritten.
+    """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    key = f"{path}|{stat.st_size}|{int(stat.st_mtime_ns)}"
+    return hashlib.sha1(key.encode()).hexdigest()
+
+def cache_key(*parts):
+    """Hash arbitrary JSON-serializable parts into a stable cache key"""
+    data = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha1(data.encode()).hexdigest()
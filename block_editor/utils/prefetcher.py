@@ -0,0 +1,116 @@
+import os
+import threading
+from collections import deque
+
+from .analysis_cache import AnalysisCache, detection_params
+from .editing_proxy import EditingProxy
+from .ffmpeg_scheduler import Priority
+from .silence_detector import SilenceDetector
+from . import toolchain
+
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov')
+# Files after the open one analyzed ahead of time
+PREFETCH_COUNT = 3
+
+def next_videos(video_path, count=PREFETCH_COUNT):
+    """The count video files that follow video_path in its folder, in name order"""
+    folder = os.path.dirname(os.path.abspath(video_path))
+    try:
+        names = sorted(name for name in os.listdir(folder) if name.lower().endswith(VIDEO_EXTENSIONS))
+    except OSError:
+        return []
+    name = os.path.basename(video_path)
+    following = [candidate for candidate in names if candidate > name]
+    return [os.path.join(folder, candidate) for candidate in following[:count]]
+
+class Prefetcher:
+    """Analyzes the next videos in a folder in the background.
+
+    For each file it probes, runs detection (which also measures the
+    loudness envelope) and renders the editing proxy if the file needs one,
+    storing everything in the caches the editor reads when the file is
+    opened. All work is submitted as cache warming, so the scheduler holds
+    it back, and stops processes already running, while playback, detection
+    or export need the CPU.
+    """
+    def __init__(self, count=PREFETCH_COUNT, settings=None, proxies=True):
+        self.count = count
+        self.settings = settings
+        self.proxies = proxies
+        self._pending = deque()
+        self._condition = threading.Condition()
+        self._jobs = set()  # Scheduler jobs of the file being analyzed
+        self._stopped = False
+        self._thread = None
+
+    def schedule(self, video_path, settings=None, following=None):
+        """Queue the files after video_path, replacing whatever was queued before.
+
+        following overrides the folder listing, e.g. with a project's sources.
+        """
+        if settings is not None:
+            self.settings = settings
+        if following is None:
+            following = next_videos(video_path, self.count)
+        with self._condition:
+            self._pending = deque(following[:self.count])
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="prefetcher", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def pending(self):
+        with self._condition:
+            return list(self._pending)
+
+    def stop(self):
+        with self._condition:
+            self._stopped = True
+            self._pending.clear()
+            jobs = list(self._jobs)
+            self._condition.notify()
+        for job in jobs:
+            job.cancel()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._pending and not self._stopped:
+                    self._condition.wait()
+                if self._stopped:
+                    return
+                video_path = self._pending.popleft()
+            try:
+                self.prefetch(video_path)
+            except Exception as e:
+                print(f"[DEBUG] Prefetcher: {os.path.basename(video_path)} failed: {e}")
+
+    def _track(self, job):
+        """Remember a job so stop() can cancel it"""
+        with self._condition:
+            self._jobs.add(job)
+            stopped = self._stopped
+        if stopped:
+            job.cancel()
+
+    def prefetch(self, video_path):
+        """Fill the analysis and proxy caches for one file"""
+        cache = AnalysisCache()
+        proxy = EditingProxy(video_path)
+        props = proxy.probe(Priority.CACHE_WARMING)
+        try:
+            if cache.get_detection(video_path, self.settings) is None:
+                params = detection_params(self.settings)
+                detector = SilenceDetector.from_params(
+                    video_path, params, toolchain=toolchain.current(), priority=Priority.CACHE_WARMING,
+                    job_callback=self._track
+                )
+                blocks = detector.detect_blocks()
+                if detector.complete:
+                    cache.put_detection(video_path, self.settings, blocks, detector.loudness)
+                print(f"[DEBUG] Prefetcher: detected {len(blocks)} blocks in {os.path.basename(video_path)}")
+            if self.proxies and not proxy.exists() and proxy.needed(props):
+                proxy.render(job_callback=self._track, priority=Priority.CACHE_WARMING)
+        finally:
+            with self._condition:
+                self._jobs.clear()
@@ -0,0 +1,82 @@
+import os
+import shutil
+import tempfile
+from .media_cache import cache_dir
+
+# Rendered export segments kept for re-exports, in bytes
+SEGMENT_CACHE_MAX_BYTES = 10 * 1024 ** 3
+
+class SegmentCache:
+    """Content-addressed store of rendered export segments.
+
+    Segments are keyed by everything that determines their content (source
+    identity, range and encode settings), so a re-export after a small
+    relabel only renders the ranges that changed. A file's modification time
+    is bumped on every hit, and the least recently used files are evicted
+    once the cache grows past max_bytes.
+    """
+    def __init__(self, root=None, max_bytes=SEGMENT_CACHE_MAX_BYTES):
+        self.root = root or cache_dir("segments")
+        self.max_bytes = max_bytes
+        os.makedirs(self.root, exist_ok=True)
+
+    def path(self, key):
+        return os.path.join(self.root, f"{key}.mp4")
+
+    def get(self, key):
+        """Return the cached segment's path, or None"""
+        path = self.path(key)
+        if not os.path.exists(path):
+            return None
+        os.utime(path)
+        return path
+
+    def put(self, key, rendered_path):
+        """Move a freshly rendered segment into the cache and return its new path.
+
+        The segment is usually rendered under the system temp directory, which
+        may be on another filesystem, so it is moved (copied if need be) to a
+        partial file next to the cache entry first and then renamed into place;
+        get() never sees a half-copied segment.
+        """
+        path = self.path(key)
+        fd, partial_path = tempfile.mkstemp(prefix=key, suffix=".part", dir=self.root)
+        os.close(fd)
+        try:
+            shutil.move(rendered_path, partial_path)
+            os.replace(partial_path, path)
+        except BaseException:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            raise
+        return path
+
+    def size(self):
+        return sum(os.path.getsize(path) for _, path in self.entries())
+
+    def entries(self):
+        """(mtime, path) for every cached segment, oldest first"""
+        entries = []
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if name.endswith(".mp4") and os.path.isfile(path):
+                entries.append((os.path.getmtime(path), path))
+        return sorted(entries)
+
+    def evict(self, keep=()):
+        """Delete least recently used segments until the cache fits, sparing keep"""
+        keep = {os.path.abspath(path) for path in keep}
+        entries = self.entries()
+        total = sum(os.path.getsize(path) for _, path in entries)
+        for _, path in entries:
+            if total <= self.max_bytes:
+                break
+            if os.path.abspath(path) in keep:
+                continue
+            size = os.path.getsize(path)
+            try:
+                os.remove(path)
+            except OSError as e:
+                print(f"[DEBUG] Error evicting cached segment {path}: {e}")
+                continue
+            total -= size
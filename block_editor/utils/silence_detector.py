@@ -1,8 +1,43 @@
-import subprocess
+import re
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
 from ..core.audio_block import AudioBlock
+from ..core.loudness import LoudnessStats
+from ..core.video_segments import merge_video_segments
+from . import ffmpeg_scheduler
+from .ffmpeg_scheduler import Priority
+
+# Per-frame ebur128 log line, e.g. "t: 1.1  TARGET:-23 LUFS  M: -22.3 S:-25.0 ... FTPK: -5.2 -5.3 dBFS"
+EBUR128_FRAME = re.compile(r"\bt:\s*([\d.]+)\s+TARGET:.*?\bM:\s*(\S+)\s+S:\s*(\S+)")
+EBUR128_PEAK = re.compile(r"FTPK:\s*(.*?)\s*dBFS")
+# The momentary window is 400 ms long and ends at the logged time
+MOMENTARY_CENTER_OFFSET = 0.2
+# The audio filters run on one thread, leaving the rest to the video pass
+AUDIO_PASS_THREADS = 1
+
+def parse_level(value):
+    try:
+        level = float(value)
+    except ValueError:
+        return None
+    return None if level != level or level == float("-inf") else level
+
+def parse_ebur128_frame(line):
+    """Return (time, momentary, short_term, true_peak) from an ebur128 frame log line, or None"""
+    match = EBUR128_FRAME.search(line)
+    if not match:
+        return None
+    peak = None
+    peak_match = EBUR128_PEAK.search(line)
+    if peak_match:
+        peaks = [parse_level(value) for value in peak_match.group(1).split()]
+        peaks = [value for value in peaks if value is not None]
+        peak = max(peaks) if peaks else None
+    return float(match.group(1)), parse_level(match.group(2)), parse_level(match.group(3)), peak
 
 class SilenceDetector:
-    def __init__(self, input_file, silence_threshold=-40, min_silence_duration=0.1, non_silence_buffer=0.3):
+    def __init__(self, input_file, silence_threshold=-40, min_silence_duration=0.1, non_silence_buffer=0.3,
+                 toolchain=None, priority=Priority.DETECTION, video_segmenter=None, job_callback=None):
         self.input_file = input_file
         self.silence_threshold = silence_threshold
         self.min_silence_duration = min_silence_duration
@@ -10,25 +45,80 @@ class SilenceDetector:
         self.min_non_silence_duration = 0.5  # Minimum duration for non-silence blocks
         self.min_silence_gap = 0.5  # Minimum duration for silence gaps between non-silence blocks
         self.max_gap_to_bridge = 2.0  # Maximum gap to bridge between blocks
+        self.loudness = None  # Whole-file EBU R128 statistics from the last detection
+        self.complete = True  # False if the last detection's video pass failed; don't cache its blocks
+        self.toolchain = toolchain  # Capabilities of the resolved ffmpeg; None if unknown
+        self.priority = priority  # Scheduler class; prefetching detects as cache warming
+        self.video_segmenter = video_segmenter  # Splits speech blocks at scene cuts and freezes if set
+        self.job_callback = job_callback  # Receives the audio pass's scheduler Job, e.g. to cancel it
+
+    @classmethod
+    def from_params(cls, input_file, params, toolchain=None, priority=Priority.DETECTION, job_callback=None):
+        """A detector for analysis_cache.detection_params() settings.
+
+        job_callback receives the Job of every ffmpeg run the detection starts.
+        """
+        video_segmenter = None
+        if params.get('video_cuts'):
+            # Imported here so audio-only detection doesn't load the video analysis
+            from .video_segmenter import VideoSegmenter
+            video_segmenter = VideoSegmenter(input_file, priority=priority, job_callback=job_callback)
+        return cls(
+            input_file,
+            silence_threshold=params['threshold'],
+            min_silence_duration=params['duration'],
+            non_silence_buffer=params['buffer'],
+            toolchain=toolchain,
+            priority=priority,
+            video_segmenter=video_segmenter,
+            job_callback=job_callback
+        )
+
+    def audio_filter(self):
+        """silencedetect, plus ebur128 when this ffmpeg has it"""
+        audio_filter = f"silencedetect=noise={self.silence_threshold}dB:d={self.min_silence_duration}"
+        if self.toolchain is None or self.toolchain.has_filter("ebur128"):
+            # ebur128 measures loudness from the same decode, for normalized export
+            audio_filter += ",ebur128=peak=true:framelog=info"
+        else:
+            print("[DEBUG] ffmpeg has no ebur128 filter, skipping loudness measurement")
+        return audio_filter
 
     def detect_blocks(self):
+        self.complete = True
         print(f"[DEBUG] detect_blocks: Starting detection with threshold={self.silence_threshold}dB, duration={self.min_silence_duration}s")
         
         ffmpeg_cmd = [
             "ffmpeg",
             "-i", self.input_file,
-            "-af", f"silencedetect=noise={self.silence_threshold}dB:d={self.min_silence_duration}",
+            "-vn",
+            "-af", self.audio_filter(),
             "-f", "null",
             "-"
         ]
         
+        video = None
+        if self.video_segmenter is not None:
+            # The video pass runs alongside the audio pass; both share the scheduler
+            executor = ThreadPoolExecutor(max_workers=1)
+            video = executor.submit(self.video_segmenter.segment)
+            executor.shutdown(wait=False)
+
         print(f"[DEBUG] detect_blocks: Running command: {' '.join(ffmpeg_cmd)}")
-        result = subprocess.run(ffmpeg_cmd, capture_output=True, text=True)
-        output = result.stderr
-        
-        if result.returncode != 0:
-            print(f"[DEBUG] detect_blocks: FFmpeg error - {output}")
-            raise Exception("FFmpeg failed to process the video")
+        try:
+            result = ffmpeg_scheduler.run(ffmpeg_cmd, self.priority, threads=AUDIO_PASS_THREADS,
+                                          job_callback=self.job_callback)
+            output = result.stderr
+
+            if result.returncode != 0:
+                print(f"[DEBUG] detect_blocks: FFmpeg error - {output}")
+                raise Exception("FFmpeg failed to process the video")
+        except BaseException:
+            if video is not None:
+                # Nobody will merge the video boundaries; stop decoding for them
+                video.cancel()
+                self.video_segmenter.cancel()
+            raise
 
         # Get video duration first
         duration_cmd = [
@@ -38,12 +128,16 @@ class SilenceDetector:
             "-of", "default=noprint_wrappers=1:nokey=1",
             self.input_file
         ]
-        duration_result = subprocess.run(duration_cmd, capture_output=True, text=True)
+        # Prefetching must not jump the queue with its probe either
+        probe_priority = Priority.CACHE_WARMING if self.priority == Priority.CACHE_WARMING else Priority.INTERACTIVE
+        duration_result = ffmpeg_scheduler.run(duration_cmd, probe_priority)
         try:
             duration = float(duration_result.stdout.strip())
             print(f"[DEBUG] Video duration: {duration:.3f}s")
         except ValueError as e:
             print(f"[DEBUG] detect_blocks: Error parsing duration - {e}")
+            if video is not None:
+                self.video_segmenter.cancel()
             return []
 
         # Parse and sort silence points
@@ -189,4 +283,34 @@ class SilenceDetector:
             validated_blocks.append(AudioBlock(0, duration, False))
             print(f"[DEBUG] Created fallback block: 0.000s - {duration:.3f}s")
 
+        if video is not None:
+            try:
+                cuts, freezes = video.result()
+            except Exception as e:
+                # The audio blocks stand on their own; the video only refines them
+                print(f"[DEBUG] detect_blocks: Video analysis failed, keeping the audio blocks - {e}")
+                self.complete = False
+            else:
+                validated_blocks = merge_video_segments(validated_blocks, cuts, freezes)
+                print(f"[DEBUG] detect_blocks: {len(validated_blocks)} blocks after splitting at video boundaries")
+
+        self.assign_loudness(output, validated_blocks)
         return validated_blocks
+
+    def assign_loudness(self, output, blocks):
+        """Collect the ebur128 frame log into whole-file and per-block statistics"""
+        frames = [frame for frame in map(parse_ebur128_frame, output.split('\n')) if frame]
+        if not frames:
+            self.loudness = None
+            return
+
+        self.loudness = LoudnessStats()
+        for block in blocks:
+            block.loudness = LoudnessStats()
+        starts = [block.start for block in blocks]
+        for time, momentary, short_term, peak in frames:
+            self.loudness.add(momentary, short_term, peak)
+            index = bisect_right(starts, time - MOMENTARY_CENTER_OFFSET) - 1
+            if 0 <= index < len(blocks):
+                blocks[index].loudness.add(momentary, short_term, peak)
+        print(f"[DEBUG] Integrated loudness: {self.loudness.integrated()} LUFS over {len(frames)} frames")
@@ -0,0 +1,120 @@
+import os
+import subprocess
+from ..core.time_map import TimeMap
+from . import ffmpeg_scheduler
+from .ffmpeg_scheduler import Priority
+from .media_cache import cache_dir, cache_key, source_identity
+
+# Small, fast-seeking encode; the proxy is for reviewing only
+PROXY_VIDEO_ARGS = ["-vf", "scale=-2:360", "-c:v", "libx264", "-preset", "veryfast", "-crf", "30", "-g", "15"]
+PROXY_AUDIO_ARGS = ["-c:a", "aac", "-b:a", "96k", "-ar", "48000", "-ac", "2"]
+# ffmpeg threads per chunk render; chunks are short and small, so several render at once
+CHUNK_THREADS = 2
+
+class SpeechProxyRenderer:
+    """Renders a proxy that contains only the playable (non-silence) ranges.
+
+    Every range is rendered to its own chunk, keyed by the source and the range,
+    so re-rendering after the blocks change only encodes the new ranges. The
+    missing chunks render side by side through the scheduler, then all are
+    joined with a stream-copy concat.
+    """
+    def __init__(self, input_file, output_dir=None):
+        self.input_file = input_file
+        self.source_id = source_identity(input_file)
+        self.output_dir = output_dir or cache_dir("speech_proxy", self.source_id)
+        self.chunk_dir = os.path.join(self.output_dir, "chunks")
+        os.makedirs(self.chunk_dir, exist_ok=True)
+
+    def chunk_path(self, start, end):
+        key = cache_key(self.source_id, round(start, 3), round(end, 3), PROXY_VIDEO_ARGS, PROXY_AUDIO_ARGS)
+        return os.path.join(self.chunk_dir, f"{key}.mp4")
+
+    def submit_chunk(self, start, end, path):
+        """Start rendering a chunk to path + ".part.mp4"; returns the scheduler Job"""
+        return ffmpeg_scheduler.submit([
+            "ffmpeg", "-y", "-v", "error",
+            "-ss", str(round(start, 3)),
+            "-t", str(round(end - start, 3)),
+            "-i", self.input_file,
+            *PROXY_VIDEO_ARGS,
+            *PROXY_AUDIO_ARGS,
+            "-avoid_negative_ts", "make_zero",
+            path + ".part.mp4"
+        ], Priority.PLAYBACK, threads=CHUNK_THREADS)
+
+    def finish_chunk(self, job, path):
+        result = job.result()
+        if result.returncode != 0:
+            raise subprocess.CalledProcessError(result.returncode, job.cmd, result.stdout, result.stderr)
+        os.replace(path + ".part.mp4", path)
+
+    def probe_duration(self, path):
+        result = ffmpeg_scheduler.run([
+            "ffprobe", "-v", "error",
+            "-show_entries", "format=duration",
+            "-of", "default=noprint_wrappers=1:nokey=1",
+            path
+        ], Priority.INTERACTIVE)
+        try:
+            return float(result.stdout.strip())
+        except ValueError:
+            return None
+
+    def render(self, ranges, progress_callback=None):
+        """Render the proxy for the given (start, end) ranges.
+
+        Returns (proxy_path, time_map). The map uses the measured chunk
+        durations so proxy positions stay aligned with the original.
+        """
+        if not ranges:
+            raise ValueError("No playable ranges to render")
+
+        chunk_paths = [self.chunk_path(start, end) for start, end in ranges]
+        # Every missing chunk is queued at once; the scheduler runs as many as fit
+        jobs = {
+            path: self.submit_chunk(start, end, path)
+            for (start, end), path in zip(ranges, chunk_paths) if not os.path.exists(path)
+        }
+        rendered = len(jobs)
+        print(f"[DEBUG] SpeechProxyRenderer: Rendering {rendered} chunks")
+
+        durations = []
+        try:
+            for i, ((start, end), path) in enumerate(zip(ranges, chunk_paths)):
+                if path in jobs:
+                    self.finish_chunk(jobs.pop(path), path)
+                duration = self.probe_duration(path)
+                durations.append(duration if duration else end - start)
+                if progress_callback:
+                    progress_callback(i + 1, len(ranges))
+        except BaseException:
+            for job in jobs.values():
+                job.cancel()
+            raise
+        print(f"[DEBUG] SpeechProxyRenderer: Rendered {rendered} of {len(ranges)} chunks, reused the rest")
+
+        # Drop chunks for ranges that no longer exist
+        keep = set(os.path.basename(p) for p in chunk_paths)
+        for name in os.listdir(self.chunk_dir):
+            if name not in keep:
+                try:
+                    os.remove(os.path.join(self.chunk_dir, name))
+                except OSError as e:
+                    print(f"[DEBUG] SpeechProxyRenderer: Error removing stale chunk {name}: {e}")
+
+        list_path = os.path.join(self.output_dir, "chunks.txt")
+        with open(list_path, "w") as f:
+            for path in chunk_paths:
+                f.write(f"file '{os.path.abspath(path)}'\n")
+
+        proxy_path = os.path.join(self.output_dir, "speech_proxy.mp4")
+        ffmpeg_scheduler.run([
+            "ffmpeg", "-y", "-v", "error",
+            "-f", "concat", "-safe", "0",
+            "-i", list_path,
+            "-c", "copy",
+            proxy_path
+        ], Priority.PLAYBACK, check=True)
+
+        return proxy_path, TimeMap.from_ranges(ranges, durations)
@@ -0,0 +1,199 @@
+import json
+import os
+import re
+import shutil
+import threading
+
+from . import ffmpeg_scheduler
+from .ffmpeg_scheduler import Priority
+from .media_cache import cache_dir
+
+CAPABILITIES_FILE = "capabilities.json"
+# Flag columns of `ffmpeg -codecs`: decode, encode, type, intra-only, lossy, lossless
+CODEC_LINE = re.compile(r"^\s*([D.])([E.])[VASDT.][I.][L.][S.]\s+(\S+)\s+(.*)$")
+FILTER_LINE = re.compile(r"^\s*[T.][S.][C.]\s+(\S+)\s+\S+->\S+")
+CODER_LIST = re.compile(r"\((decoders|encoders): ([^)]*)\)")
+
+class MissingCapability(Exception):
+    """The resolved ffmpeg lacks a codec or filter an operation needs"""
+    pass
+
+class Toolchain:
+    """What the resolved ffmpeg/ffprobe can do.
+
+    encoders and decoders map each codec name to the ffmpeg encoders or
+    decoders for it, in ffmpeg's order; filters and hwaccels are sets of
+    names. Subsystems query these to pick a strategy that will work instead
+    of finding out from a failed ffmpeg run.
+    """
+    def __init__(self, ffmpeg, ffprobe, version=None, encoders=None, decoders=None, filters=(), hwaccels=()):
+        self.ffmpeg = ffmpeg
+        self.ffprobe = ffprobe
+        self.version = version
+        self.encoders = dict(encoders or {})
+        self.decoders = dict(decoders or {})
+        self.filters = set(filters)
+        self.hwaccels = set(hwaccels)
+
+    def can_encode(self, codec):
+        return bool(self.encoders.get(codec))
+
+    def can_decode(self, codec):
+        return bool(self.decoders.get(codec))
+
+    def has_filter(self, name):
+        return name in self.filters
+
+    def has_encoder(self, name):
+        return any(name in encoders for encoders in self.encoders.values())
+
+    def encoder_for(self, codec, preferred=None):
+        """The preferred encoder if it is available, else the first one for codec, or None"""
+        if preferred and self.has_encoder(preferred):
+            return preferred
+        encoders = self.encoders.get(codec)
+        return encoders[0] if encoders else None
+
+    def to_dict(self):
+        return {
+            'ffmpeg': self.ffmpeg,
+            'ffprobe': self.ffprobe,
+            'version': self.version,
+            'encoders': self.encoders,
+            'decoders': self.decoders,
+            'filters': sorted(self.filters),
+            'hwaccels': sorted(self.hwaccels)
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            data['ffmpeg'], data['ffprobe'], data.get('version'),
+            data.get('encoders'), data.get('decoders'),
+            data.get('filters', ()), data.get('hwaccels', ())
+        )
+
+def parse_version(output):
+    """Version token from the first line of `ffmpeg -version`"""
+    match = re.match(r"\s*ffmpeg version (\S+)", output)
+    return match.group(1) if match else None
+
+def parse_codecs(output):
+    """(encoders, decoders) by codec name from `ffmpeg -codecs`"""
+    encoders = {}
+    decoders = {}
+    for line in output.splitlines():
+        match = CODEC_LINE.match(line)
+        if not match or match.group(3) == "=":
+            continue
+        decode, encode, codec, rest = match.groups()
+        listed = {kind: names.split() for kind, names in CODER_LIST.findall(rest)}
+        if decode == "D":
+            decoders[codec] = listed.get("decoders", [codec])
+        if encode == "E":
+            encoders[codec] = listed.get("encoders", [codec])
+    return encoders, decoders
+
+def parse_filters(output):
+    names = set()
+    for line in output.splitlines():
+        match = FILTER_LINE.match(line)
+        if match and match.group(1) != "=":
+            names.add(match.group(1))
+    return names
+
+def parse_hwaccels(output):
+    lines = [line.strip() for line in output.splitlines()]
+    return {line for line in lines if line and not line.endswith(":")}
+
+def find_binaries():
+    """Absolute paths of ffmpeg and ffprobe on PATH; FileNotFoundError if either is missing"""
+    ffmpeg = shutil.which("ffmpeg")
+    ffprobe = shutil.which("ffprobe")
+    if ffmpeg is None or ffprobe is None:
+        raise FileNotFoundError("ffmpeg and ffprobe must both be on PATH")
+    return os.path.realpath(ffmpeg), os.path.realpath(ffprobe)
+
+def binaries_key(ffmpeg, ffprobe):
+    """Changes whenever either binary is replaced or upgraded"""
+    parts = []
+    for path in (ffmpeg, ffprobe):
+        stat = os.stat(path)
+        parts.append(f"{path}|{stat.st_size}|{stat.st_mtime_ns}")
+    return "|".join(parts)
+
+def probe(ffmpeg, ffprobe):
+    """Ask ffmpeg for its version, codecs, filters and hwaccels (runs once per binary)"""
+    queries = {
+        'version': ["-version"],
+        'codecs': ["-hide_banner", "-codecs"],
+        'filters': ["-hide_banner", "-filters"],
+        'hwaccels': ["-hide_banner", "-hwaccels"],
+    }
+    jobs = {name: ffmpeg_scheduler.submit([ffmpeg, *args], Priority.INTERACTIVE) for name, args in queries.items()}
+    output = {}
+    for name, job in jobs.items():
+        result = job.result()
+        if result.returncode != 0:
+            raise RuntimeError(f"ffmpeg {' '.join(queries[name])} failed: {result.stderr.strip()}")
+        output[name] = result.stdout
+    encoders, decoders = parse_codecs(output['codecs'])
+    return Toolchain(
+        ffmpeg, ffprobe, parse_version(output['version']), encoders, decoders,
+        parse_filters(output['filters']), parse_hwaccels(output['hwaccels'])
+    )
+
+def load_capabilities(path):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_capabilities(path, entries):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(entries, f, indent=2)
+    os.replace(tmp_path, path)
+
+def resolve(cache_path=None, refresh=False):
+    """Find ffmpeg/ffprobe and return their Toolchain.
+
+    Capabilities are cached by binary path, size and modification time, so
+    after the first launch this costs two stat calls and no process spawn.
+    Raises FileNotFoundError when the binaries are not installed.
+    """
+    ffmpeg, ffprobe = find_binaries()
+    key = binaries_key(ffmpeg, ffprobe)
+    cache_path = cache_path or os.path.join(cache_dir("toolchain"), CAPABILITIES_FILE)
+    entries = load_capabilities(cache_path)
+    if not refresh and key in entries:
+        return Toolchain.from_dict(entries[key])
+
+    toolchain = probe(ffmpeg, ffprobe)
+    print(f"[DEBUG] Probed ffmpeg {toolchain.version}: {len(toolchain.encoders)} encodable codecs, "
+          f"{len(toolchain.filters)} filters, hwaccels {sorted(toolchain.hwaccels)}")
+    entries[key] = toolchain.to_dict()
+    try:
+        save_capabilities(cache_path, entries)
+    except OSError as e:
+        print(f"[DEBUG] Could not cache ffmpeg capabilities: {e}")
+    return toolchain
+
+_toolchain = None
+_toolchain_lock = threading.Lock()
+
+def get_toolchain(refresh=False):
+    """The process-wide Toolchain, resolved on first use"""
+    global _toolchain
+    with _toolchain_lock:
+        if _toolchain is None or refresh:
+            _toolchain = resolve(refresh=refresh)
+        return _toolchain
+
+def current():
+    """The process-wide Toolchain, or None when ffmpeg is not installed"""
+    try:
+        return get_toolchain()
+    except FileNotFoundError:
+        return None
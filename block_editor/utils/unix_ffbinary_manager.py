@@ -1,15 +1,42 @@
+import hashlib
 import os
+import re
 import requests
 import shutil
+import stat
 import tempfile
 import py7zr
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import unquote, urlparse
 
-# Example usage
-mac_binary_urls = [
-    "https://evermeet.cx/ffmpeg/ffmpeg-118273-g251de1791e.7z",
-    "https://evermeet.cx/ffmpeg/ffprobe-118273-g251de1791e.7z"
-]
+from .media_cache import cache_dir
+
+# Pinned build; downloads and extracted binaries are cached per build
+FFMPEG_BUILD = "118273-g251de1791e"
+# Archive name -> SHA-256. Set the digests when bumping FFMPEG_BUILD; an
+# archive without one is checked against the <name>.sha256 its mirror
+# publishes, and refused if the mirror has none.
+ARTIFACTS = {
+    f"ffmpeg-{FFMPEG_BUILD}.7z": None,
+    f"ffprobe-{FFMPEG_BUILD}.7z": None,
+}
+# Tried in order. Entries may be http(s) URLs, file:// URLs or local directories.
+DEFAULT_MIRRORS = ["https://evermeet.cx/ffmpeg/"]
+# Whitespace-separated mirror list that takes precedence over DEFAULT_MIRRORS
+MIRRORS_ENV = "VIDEO_EDITOR_FFMPEG_MIRRORS"
+# Small enough that an interrupted download keeps most of what arrived
+CHUNK_SIZE = 64 * 1024
+DOWNLOAD_RETRIES = 3
+DOWNLOAD_TIMEOUT = 30
+CHECKSUM_SUFFIX = ".sha256"
+SHA256_HEX = re.compile(r"[0-9a-f]{64}")
+
+class ChecksumMismatch(Exception):
+    pass
+
+class MissingChecksum(Exception):
+    pass
 
 def sanitize_filename(url):
     """
@@ -17,6 +44,179 @@ def sanitize_filename(url):
     """
     return os.path.basename(url.split("?")[0])
 
+def configured_mirrors():
+    mirrors = os.environ.get(MIRRORS_ENV, "").split()
+    return mirrors or list(DEFAULT_MIRRORS)
+
+def local_mirror_path(mirror):
+    """Directory for a file:// URL or a plain path, or None for a remote mirror"""
+    parsed = urlparse(mirror)
+    if parsed.scheme == "file":
+        return unquote(parsed.path)
+    if parsed.scheme in ("http", "https"):
+        return None
+    return mirror
+
+def sha256_of(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def parse_checksum(text):
+    """The digest from a sha256sum-style line ("<hex>  <name>"), or None"""
+    fields = text.split()
+    digest = fields[0].lower() if fields else ""
+    return digest if SHA256_HEX.fullmatch(digest) else None
+
+def fetch_checksum(mirror, name):
+    """The SHA-256 a mirror publishes for name, raising MissingChecksum if it has none"""
+    local_dir = local_mirror_path(mirror)
+    try:
+        if local_dir is not None:
+            with open(os.path.join(local_dir, name + CHECKSUM_SUFFIX)) as f:
+                text = f.read()
+        else:
+            response = requests.get(mirror.rstrip("/") + "/" + name + CHECKSUM_SUFFIX, timeout=DOWNLOAD_TIMEOUT)
+            response.raise_for_status()
+            text = response.text
+    except (OSError, requests.RequestException) as e:
+        raise MissingChecksum(f"No checksum for {name} on {mirror}: {e}")
+    digest = parse_checksum(text)
+    if digest is None:
+        raise MissingChecksum(f"Unreadable checksum for {name} on {mirror}")
+    return digest
+
+def recorded_checksum(path):
+    """The digest saved next to a download that was verified against its mirror"""
+    try:
+        with open(path + CHECKSUM_SUFFIX) as f:
+            return parse_checksum(f.read())
+    except OSError:
+        return None
+
+def fetch_http(url, part_path):
+    """Download url into part_path, resuming from the bytes already there"""
+    for attempt in range(1, DOWNLOAD_RETRIES + 1):
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        try:
+            with requests.get(url, stream=True, headers=headers, timeout=DOWNLOAD_TIMEOUT) as response:
+                if response.status_code == 416:
+                    # Nothing left to fetch: the partial file is already complete
+                    return
+                response.raise_for_status()
+                # A server that ignores Range sends the whole file again
+                resumed = response.status_code == 206
+                if offset:
+                    print(f"{'Resuming' if resumed else 'Restarting'} {url} at byte {offset if resumed else 0}")
+                with open(part_path, "ab" if resumed else "wb") as f:
+                    for chunk in response.iter_content(CHUNK_SIZE):
+                        f.write(chunk)
+            return
+        except requests.RequestException as e:
+            print(f"Download of {url} interrupted (attempt {attempt}/{DOWNLOAD_RETRIES}): {e}")
+            if attempt == DOWNLOAD_RETRIES:
+                raise
+
+def download_artifact(name, sha256, download_dir, mirrors):
+    """Fetch one archive into download_dir from the first mirror that has a valid copy.
+
+    The archive is always verified: against sha256 if given, otherwise
+    against the checksum the mirror publishes. Binaries from it are
+    installed with sudo, so an archive that cannot be verified is refused.
+    """
+    path = os.path.join(download_dir, name)
+    if os.path.exists(path):
+        expected = sha256 or recorded_checksum(path)
+        if expected is not None and sha256_of(path) == expected:
+            print(f"Using cached {path}")
+            return path
+
+    part_path = path + ".part"
+    errors = []
+    for mirror in mirrors:
+        local_dir = local_mirror_path(mirror)
+        try:
+            expected = sha256 or fetch_checksum(mirror, name)
+            if local_dir is not None:
+                shutil.copyfile(os.path.join(local_dir, name), part_path)
+            else:
+                fetch_http(mirror.rstrip("/") + "/" + name, part_path)
+            actual = sha256_of(part_path)
+            if actual != expected:
+                # A corrupt partial file must not be resumed from the next mirror
+                os.remove(part_path)
+                raise ChecksumMismatch(f"{name} from {mirror} has SHA-256 {actual}, expected {expected}")
+            if sha256 is None:
+                with open(path + CHECKSUM_SUFFIX, "w") as f:
+                    f.write(f"{actual}  {name}\n")
+            os.replace(part_path, path)
+            print(f"Downloaded {name} from {mirror}")
+            return path
+        except (OSError, requests.RequestException, ChecksumMismatch, MissingChecksum) as e:
+            print(f"Mirror {mirror} failed for {name}: {e}")
+            errors.append(str(e))
+    if sha256 is None:
+        errors.append(f"pin its SHA-256 in ARTIFACTS or list a mirror that publishes {name}{CHECKSUM_SUFFIX} "
+                      f"in {MIRRORS_ENV}")
+    raise RuntimeError(f"Could not download {name}: {'; '.join(errors)}")
+
+def download_artifacts(artifacts, download_dir, mirrors):
+    """Download all archives concurrently; returns their paths in artifacts order"""
+    os.makedirs(download_dir, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=max(1, len(artifacts))) as pool:
+        futures = [pool.submit(download_artifact, name, sha256, download_dir, mirrors)
+                   for name, sha256 in artifacts.items()]
+        return [future.result() for future in futures]
+
+def extract_archive(archive_path, bin_dir):
+    """Extract an archive's files into bin_dir, returning the extracted paths"""
+    os.makedirs(bin_dir, exist_ok=True)
+    # Extract next to bin_dir so the final moves stay on one filesystem
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(bin_dir)) as extract_dir:
+        try:
+            with py7zr.SevenZipFile(archive_path, mode='r') as archive:
+                archive.extractall(path=extract_dir)
+        except Exception as e:
+            print(f"py7zr extraction failed: {e}. Falling back to system '7z'.")
+            install_7z()
+            subprocess.run(["7z", "x", archive_path, f"-o{extract_dir}"], check=True)
+
+        extracted = []
+        for root, _, files in os.walk(extract_dir):
+            for file in files:
+                dest_path = os.path.join(bin_dir, file)
+                os.replace(os.path.join(root, file), dest_path)
+                os.chmod(dest_path, os.stat(dest_path).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+                extracted.append(dest_path)
+    return extracted
+
+def fetch_binaries(mirrors=None, artifacts=None, build=FFMPEG_BUILD):
+    """Download and extract the pinned build into its versioned cache.
+
+    Returns the extracted binaries. A build that was already extracted is
+    reused without touching the network.
+    """
+    artifacts = ARTIFACTS if artifacts is None else artifacts
+    build_dir = cache_dir("ffmpeg", build)
+    bin_dir = os.path.join(build_dir, "bin")
+    if os.path.isdir(bin_dir) and os.listdir(bin_dir):
+        return [os.path.join(bin_dir, name) for name in sorted(os.listdir(bin_dir))]
+
+    archives = download_artifacts(artifacts, os.path.join(build_dir, "downloads"), mirrors or configured_mirrors())
+    binaries = []
+    try:
+        for archive_path in archives:
+            print(f"Extracting {archive_path}...")
+            binaries += extract_archive(archive_path, bin_dir)
+    except BaseException:
+        # A half-extracted build must not be mistaken for a complete one
+        shutil.rmtree(bin_dir, ignore_errors=True)
+        raise
+    return binaries
+
 def install_7z():
     """
     Installs 7z using Homebrew if not already installed.
@@ -32,59 +232,27 @@ def install_7z():
 
 def install_unix_binaries():
     dest_dir = "/usr/local/bin"
-    success = True
 
     # Ensure destination directory exists
     if not os.path.exists(dest_dir):
         print(f"Destination directory '{dest_dir}' does not exist.")
         return False
 
-    # Ensure 7z is installed
-    install_7z()
+    try:
+        binaries = fetch_binaries()
+    except Exception as e:
+        print(f"Failed to fetch ffmpeg binaries: {e}")
+        return False
 
-    for url in mac_binary_urls:
+    success = True
+    for source_path in binaries:
+        dest_path = os.path.join(dest_dir, os.path.basename(source_path))
         try:
-            print(f"Processing {url}...")
-            # Create a temporary file for downloading
-            with tempfile.TemporaryDirectory() as tmp_dir:
-                file_name = os.path.join(tmp_dir, sanitize_filename(url))
-
-                # Download the file
-                print(f"Downloading {url}...")
-                response = requests.get(url, stream=True)
-                response.raise_for_status()
-
-                with open(file_name, 'wb') as f:
-                    shutil.copyfileobj(response.raw, f)
-                print(f"Downloaded to {file_name}")
-
-                # Extract the file
-                print(f"Extracting {file_name}...")
-                extract_dir = os.path.join(tmp_dir, "extracted")
-                os.makedirs(extract_dir, exist_ok=True)
-
-                # Try py7zr first
-                try:
-                    with py7zr.SevenZipFile(file_name, mode='r') as archive:
-                        archive.extractall(path=extract_dir)
-                except Exception as e:
-                    print(f"py7zr extraction failed: {e}. Falling back to system '7z'.")
-                    # Fallback to system 7z command
-                    subprocess.run(["7z", "x", file_name, f"-o{extract_dir}"], check=True)
-
-                # Move the binaries to the destination directory using sudo cp
-                for root, _, files in os.walk(extract_dir):
-                    for file in files:
-                        source_path = os.path.join(root, file)
-                        dest_path = os.path.join(dest_dir, file)
-                        print(f"Copying {source_path} to {dest_path} using sudo cp...")
-                        # for sudo approach.
-                        subprocess.run(["sudo", "cp", source_path, dest_path], check=True)
-
-                print(f"Installed binaries from {url}.")
-
+            # Move the binaries to the destination directory using sudo cp
+            print(f"Copying {source_path} to {dest_path} using sudo cp...")
+            subprocess.run(["sudo", "cp", source_path, dest_path], check=True)
         except Exception as e:
-            print(f"Failed to process {url}: {e}")
+            print(f"Failed to install {source_path}: {e}")
             success = False
 
     return success
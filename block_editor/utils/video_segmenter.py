@@ -0,0 +1,163 @@
+import math
+import re
+import threading
+from ..core.video_segments import merge_intervals
+from . import ffmpeg_scheduler
+from .editing_proxy import EditingProxy
+from .ffmpeg_scheduler import JobCancelled, Priority
+
+# Frames are analyzed at this rate and height; cuts and freezes need neither
+# full resolution nor every frame
+ANALYSIS_FPS = 5
+ANALYSIS_HEIGHT = 144
+# The decoder drops every B-frame; since fps and scale only filter decoded
+# frames, this is what saves decode time. With common encoder settings (at
+# most 3 B-frames in a row) the I- and P-frames left still come faster than
+# ANALYSIS_FPS.
+SKIP_FRAMES = "bidir"
+# Scene change score (0-1) above which a frame starts a new shot
+SCENE_THRESHOLD = 0.3
+# freezedetect: frames within FREEZE_NOISE of each other for FREEZE_DURATION seconds are frozen
+FREEZE_NOISE = "-60dB"
+FREEZE_DURATION = 2.0
+# The source is analyzed in chunks of this length, in parallel
+CHUNK_SECONDS = 120.0
+# Each chunk starts this much early so a cut on the boundary still has a previous
+# frame, and decodes this much past freeze_duration beyond its end so that a
+# freeze starting just before the end is long enough to be detected there
+CHUNK_OVERLAP = 1.0
+CHUNK_THREADS = 2
+
+SHOWINFO_TIME = re.compile(r"\bpts_time:\s*(-?[\d.]+)")
+FREEZE_EVENT = re.compile(r"lavfi\.freezedetect\.freeze_(start|end):\s*(-?[\d.]+)")
+
+def parse_chunk_output(output, offset, start, end, stop):
+    """(cuts, freezes) in source time from one chunk's showinfo and freezedetect log.
+
+    offset is the source time of the chunk's first frame and stop that of its
+    last. Cuts within [start, end) are kept, as are freezes that start before
+    end: a freeze starting in [start, end) belongs to this chunk and keeps its
+    full length, up to stop if it is still open there; one that started in an
+    earlier chunk is kept from start on, to be joined with the earlier chunk's.
+    """
+    cuts = []
+    freezes = []
+    freeze_start = None
+    for line in output.split('\n'):
+        event = FREEZE_EVENT.search(line)
+        if event:
+            time = offset + float(event.group(2))
+            if event.group(1) == "start":
+                freeze_start = time
+            elif freeze_start is not None:
+                freezes.append((freeze_start, time))
+                freeze_start = None
+            continue
+        if "Parsed_showinfo" in line:
+            match = SHOWINFO_TIME.search(line)
+            if match:
+                cuts.append(offset + float(match.group(1)))
+    if freeze_start is not None:
+        freezes.append((freeze_start, stop))
+    cuts = [time for time in cuts if start <= time < end]
+    freezes = [(max(a, start), b) for a, b in freezes if b > start and a < end]
+    return cuts, freezes
+
+class VideoSegmenter:
+    """Finds scene cuts and frozen stretches in a source's video.
+
+    The source is split into chunks that are decoded in parallel through the
+    scheduler. Neither cut nor freeze detection needs full-quality frames, so
+    the decoder skips B-frames and the loop filter, and the frames left are
+    thinned to a low rate and height before the detection filters. Results are (cuts, freezes) in source seconds, to be merged with
+    the audio blocks by core.video_segments.merge_video_segments(); a source
+    without a video stream has neither.
+    """
+    def __init__(self, input_file, scene_threshold=SCENE_THRESHOLD, freeze_duration=FREEZE_DURATION,
+                 chunk_seconds=CHUNK_SECONDS, priority=Priority.DETECTION, job_callback=None):
+        self.input_file = input_file
+        self.scene_threshold = scene_threshold
+        self.freeze_duration = freeze_duration
+        self.chunk_seconds = chunk_seconds
+        self.priority = priority
+        self.job_callback = job_callback  # Receives every chunk's scheduler Job
+        self._jobs = []
+        self._cancelled = False
+        self._lock = threading.Lock()
+
+    def cancel(self):
+        """Stop a segment() running on another thread; it raises JobCancelled"""
+        with self._lock:
+            self._cancelled = True
+            jobs = list(self._jobs)
+        for job in jobs:
+            job.cancel()
+
+    def video_filter(self):
+        return (
+            f"fps={ANALYSIS_FPS},scale=-2:{ANALYSIS_HEIGHT},"
+            f"freezedetect=n={FREEZE_NOISE}:d={self.freeze_duration},"
+            f"select='gt(scene,{self.scene_threshold})',showinfo"
+        )
+
+    def chunk_command(self, offset, length):
+        return [
+            "ffmpeg", "-v", "info", "-nostats",
+            "-skip_frame", SKIP_FRAMES, "-skip_loop_filter", "all", "-threads", str(CHUNK_THREADS),
+            "-ss", f"{offset:.3f}", "-t", f"{length:.3f}",
+            "-i", self.input_file,
+            "-an", "-vf", self.video_filter(),
+            "-f", "null", "-"
+        ]
+
+    def chunks(self, duration):
+        """(offset, start, end, stop) per chunk: decode [offset, stop), report events in [start, end)"""
+        count = max(1, math.ceil(duration / self.chunk_seconds))
+        chunks = []
+        for i in range(count):
+            start = i * self.chunk_seconds
+            end = duration if i == count - 1 else (i + 1) * self.chunk_seconds
+            stop = min(duration, end + self.freeze_duration + CHUNK_OVERLAP)
+            chunks.append((max(0.0, start - CHUNK_OVERLAP), start, end, stop))
+        return chunks
+
+    def segment(self, duration=None):
+        """Return (cuts, freezes) for the whole source"""
+        if duration is None:
+            probe_priority = Priority.CACHE_WARMING if self.priority == Priority.CACHE_WARMING else Priority.INTERACTIVE
+            props = EditingProxy(self.input_file).probe(probe_priority)
+            if props['codec'] is None:
+                print(f"[DEBUG] VideoSegmenter: {self.input_file} has no video stream")
+                return [], []
+            duration = props['duration']
+        chunks = self.chunks(duration)
+        with self._lock:
+            if self._cancelled:
+                raise JobCancelled("Video analysis was cancelled")
+            jobs = [
+                ffmpeg_scheduler.submit(self.chunk_command(offset, stop - offset), self.priority, threads=CHUNK_THREADS)
+                for offset, start, end, stop in chunks
+            ]
+            self._jobs = jobs
+        if self.job_callback:
+            for job in jobs:
+                self.job_callback(job)
+        cuts = []
+        freezes = []
+        try:
+            for job, (offset, start, end, stop) in zip(jobs, chunks):
+                result = job.result()
+                if result.returncode != 0:
+                    raise RuntimeError(f"Video analysis failed at {start:.1f}s: {result.stderr[-500:]}")
+                chunk_cuts, chunk_freezes = parse_chunk_output(result.stderr, offset, start, end, stop)
+                cuts += chunk_cuts
+                freezes += chunk_freezes
+        except BaseException:
+            for job in jobs:
+                job.cancel()
+            raise
+        # A freeze that spans chunks was reported as overlapping pieces
+        freezes = merge_intervals(freezes, gap=1.0 / ANALYSIS_FPS)
+        print(f"[DEBUG] VideoSegmenter: {len(cuts)} scene cuts, {len(freezes)} frozen stretches "
+              f"in {len(chunks)} chunks")
+        return sorted(cuts), freezes
@@ -85,4 +85,53 @@ def test_load_state_invalid_file(block_manager, temp_state_file):
     assert block_manager.load_state("nonexistent_file.json") == False
 
 def test_process_blocks_no_video_path(block_manager):
-    assert block_manager.process_blocks() == False
\ No newline at end of file
+    assert block_manager.process_blocks() == False
+
+def test_find_block_index(block_manager, sample_blocks):
+    block_manager.blocks = sample_blocks
+    assert block_manager.find_block_index(0.0) == 0
+    assert block_manager.find_block_index(0.5) == 0
+    assert block_manager.find_block_index(1.0) == 1
+    assert block_manager.find_block_index(2.5) == 2
+    assert block_manager.find_block_index(5.0) == 2
+
+def test_find_block_index_no_blocks(block_manager):
+    assert block_manager.find_block_index(1.0) is None
+
+def test_find_block_index_after_reassigning_blocks(block_manager, sample_blocks):
+    block_manager.blocks = sample_blocks
+    assert block_manager.find_block_index(2.5) == 2
+    block_manager.blocks = [AudioBlock(0.0, 5.0, False)]
+    assert block_manager.find_block_index(2.5) == 0
+
+def test_find_playable_block(block_manager, sample_blocks):
+    block_manager.blocks = sample_blocks
+    assert block_manager.find_playable_block(0, forward=True) == 2
+    assert block_manager.find_playable_block(2, forward=False) == 0
+    assert block_manager.find_playable_block(2, forward=True) is None
+
+def test_find_playable_block_skips_short_blocks(block_manager):
+    block_manager.blocks = [
+        AudioBlock(0.0, 1.0, False),
+        AudioBlock(1.0, 1.1, False),
+        AudioBlock(1.1, 2.0, True),
+        AudioBlock(2.0, 3.0, False)
+    ]
+    assert block_manager.find_playable_block(0, min_duration=0.3) == 3
+    assert block_manager.find_playable_block(0) == 1
+
+def test_features_persist_with_state(block_manager, sample_blocks, temp_state_file):
+    pytest.importorskip("numpy")
+    from block_editor.core import features
+    block_manager.blocks = sample_blocks
+    table = features.FeatureTable({name: [0.0, 1.0, 2.0] for name in features.FEATURES})
+    assert block_manager.set_features(sample_blocks, table)
+    block_manager.save_state(temp_state_file)
+
+    loaded = BlockManager()
+    assert loaded.load_state(temp_state_file)
+    assert list(loaded.features['rms']) == [0.0, 1.0, 2.0]
+    # Replacing the blocks drops the table that described the old ones
+    loaded.blocks = sample_blocks[:2]
+    assert loaded.features is None
+    assert not loaded.set_features(sample_blocks, table)
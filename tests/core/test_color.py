@@ -0,0 +1,33 @@
+import pytest
+from block_editor.core.color import Color
+
+def test_parse_hex_forms():
+    assert Color.parse("#FF8000").rgba() == (255, 128, 0, 255)
+    assert Color.parse("#f80").rgba() == (255, 136, 0, 255)
+    assert Color.parse("#80ff0000").rgba() == (255, 0, 0, 128)
+
+def test_parse_tuples_and_colors():
+    assert Color.parse((1, 2, 3)) == Color(1, 2, 3)
+    assert Color.parse([1, 2, 3, 4]).alpha == 4
+    color = Color(10, 20, 30)
+    assert Color.parse(color) == color and Color.parse(color) is not color
+
+def test_parse_qcolor_like():
+    class FakeQColor:
+        def red(self): return 1
+        def green(self): return 2
+        def blue(self): return 3
+        def alpha(self): return 4
+    assert Color.parse(FakeQColor()).rgba() == (1, 2, 3, 4)
+
+@pytest.mark.parametrize("value", ["#12345", "#gg0000", "red", (1, 2), None, (300, 0, 0)])
+def test_parse_rejects_invalid(value):
+    with pytest.raises(ValueError):
+        Color.parse(value)
+
+def test_name_and_with_alpha():
+    color = Color.parse("#00FF00")
+    assert color.name() == "#00ff00"
+    faded = color.with_alpha(100)
+    assert faded.rgba() == (0, 255, 0, 100)
+    assert color.alpha == 255
@@ -0,0 +1,78 @@
+import time
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from block_editor.core.audio_block import AudioBlock
+from block_editor.core.features import FEATURES, FeatureTable, REVIEW_ORDERS, SILENCE_FLOOR
+
+RATE = 16000
+
+def tone(seconds, frequency=1000.0, amplitude=0.5):
+    t = np.arange(int(seconds * RATE)) / RATE
+    return (amplitude * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+
+@pytest.fixture
+def table():
+    samples = np.concatenate([
+        tone(1.0),                                    # moderate speech-band tone
+        np.zeros(RATE, dtype=np.float32),             # digital silence
+        np.clip(tone(1.0, amplitude=2.0), -1, 1),     # hard-clipped tone
+        tone(2.0, frequency=6000.0, amplitude=0.1),   # quiet tone above the speech band
+    ])
+    blocks = [AudioBlock(0.0, 1.0, False), AudioBlock(1.0, 2.0, True),
+              AudioBlock(2.0, 3.0, False), AudioBlock(3.0, 5.0, False)]
+    return FeatureTable.compute(samples, RATE, blocks)
+
+def test_levels(table):
+    assert table['rms'][0] == pytest.approx(20 * np.log10(0.5 / np.sqrt(2)), abs=0.05)
+    assert table['peak'][0] == pytest.approx(20 * np.log10(0.5), abs=0.05)
+    assert table['crest'][0] == pytest.approx(3.01, abs=0.05)
+    assert table['rms'][1] == SILENCE_FLOOR
+    assert table['peak'][1] == SILENCE_FLOOR
+    assert list(table['duration']) == [1.0, 1.0, 1.0, 2.0]
+
+def test_clipping_and_spectrum(table):
+    assert table['clipping'][0] == 0
+    assert table['clipping'][2] > 0.5
+    assert table['centroid'][0] == pytest.approx(1000, rel=0.05)
+    assert table['centroid'][3] == pytest.approx(6000, rel=0.05)
+    assert table['zcr'][3] == pytest.approx(2 * 6000 / RATE, rel=0.05)
+
+def test_speech_likelihood(table):
+    assert table['speech'][0] == pytest.approx(1.0)
+    assert table['speech'][1] == 0
+    assert table['speech'][3] == 0
+
+def test_review_queue(table):
+    assert table.review_queue([0, 2, 3], "Timeline") == [0, 2, 3]
+    assert table.review_queue([0, 2, 3], "Loudest first") == [2, 0, 3]
+    assert table.review_queue([0, 3], "Longest first") == [3, 0]
+    assert table.review_queue([0, 2], "Most clipping first") == [2, 0]
+    assert set(REVIEW_ORDERS) >= {"Timeline", "Loudest first"}
+
+def test_where(table):
+    assert table.where('rms', minimum=-20).tolist() == [0, 2]
+    assert table.where('duration', maximum=1.0).tolist() == [0, 1, 2]
+
+def test_round_trip(table):
+    restored = FeatureTable.from_dict(table.to_dict())
+    assert len(restored) == 4
+    assert restored['centroid'][3] == pytest.approx(table['centroid'][3])
+
+def test_blocks_beyond_the_audio_are_empty():
+    table = FeatureTable.compute(tone(1.0), RATE, [AudioBlock(0.0, 1.0, False), AudioBlock(5.0, 6.0, False)])
+    assert table['rms'][1] == SILENCE_FLOOR
+    assert table['speech'][1] == 0
+
+def test_sorting_large_tables_is_fast():
+    rng = np.random.default_rng(0)
+    count = 100_000
+    table = FeatureTable({name: rng.random(count) for name in FEATURES})
+    indices = range(0, count, 2)
+    started = time.perf_counter()
+    queue = table.review_queue(indices, "Loudest first")
+    elapsed = time.perf_counter() - started
+    assert len(queue) == count // 2
+    assert table['rms'][queue[0]] >= table['rms'][queue[-1]]
+    assert elapsed < 0.5
@@ -2,7 +2,7 @@ import pytest
 import os
 import json
 from pathlib import Path
-from PySide6.QtGui import QColor
+from block_editor.core.color import Color
 from block_editor.core.label_manager import LabelManager, Label
 
 @pytest.fixture
@@ -19,13 +19,13 @@ def label_manager(temp_config_dir, monkeypatch):
     return LabelManager()
 
 def test_label_creation():
-    label = Label("test", QColor("#FF0000"), "t")
+    label = Label("test", Color.parse("#FF0000"), "t")
     assert label.name == "test"
     assert label.color.name() == "#ff0000"
     assert label.hotkey == "t"
 
 def test_label_to_dict():
-    label = Label("test", QColor("#FF0000"), "t")
+    label = Label("test", Color.parse("#FF0000"), "t")
     label_dict = label.to_dict()
     assert label_dict == {
         'name': "test",
@@ -60,7 +60,7 @@ def test_label_manager_default_labels(label_manager):
     assert remove_label.hotkey == "r"
 
 def test_label_manager_add_remove_label(label_manager):
-    new_label = Label("test", QColor("#0000FF"), "t")
+    new_label = Label("test", Color.parse("#0000FF"), "t")
     label_manager.add_label(new_label)
     assert "test" in label_manager.labels
     
@@ -69,7 +69,7 @@ def test_label_manager_add_remove_label(label_manager):
 
 def test_label_manager_save_load(label_manager, temp_config_dir):
     # Add a custom label
-    new_label = Label("test", QColor("#0000FF"), "t")
+    new_label = Label("test", Color.parse("#0000FF"), "t")
     label_manager.add_label(new_label)
     
     # Save labels
@@ -0,0 +1,36 @@
+import pytest
+from block_editor.core.loudness import LoudnessStats
+
+def make_stats(values, peak=None):
+    stats = LoudnessStats()
+    for value in values:
+        stats.add(value, value, peak)
+    return stats
+
+def test_integrated_constant_level():
+    assert make_stats([-20.0] * 50).integrated() == pytest.approx(-20.0)
+
+def test_gates_drop_quiet_measurements():
+    # -80 is below the absolute gate, -35 below the relative gate
+    stats = make_stats([-20.0] * 50 + [-80.0] * 50 + [-35.0] * 5)
+    assert stats.integrated() == pytest.approx(-20.0)
+
+def test_silence_has_no_integrated_loudness():
+    assert make_stats([-90.0] * 10).integrated() is None
+
+def test_merge_matches_measuring_together():
+    loud = make_stats([-18.0] * 30, peak=-3.0)
+    quiet = make_stats([-26.0] * 30, peak=-9.0)
+    merged = LoudnessStats.merge([loud, None, quiet])
+    assert merged.integrated() == pytest.approx(make_stats([-18.0] * 30 + [-26.0] * 30).integrated())
+    assert merged.true_peak == -3.0
+
+def test_loudness_range():
+    stats = make_stats([-30.0 + i * 0.1 for i in range(101)])
+    assert stats.loudness_range() == pytest.approx(8.5, abs=0.2)
+
+def test_round_trip_through_dict():
+    stats = make_stats([-20.0, -21.5], peak=-1.0)
+    restored = LoudnessStats.from_dict(stats.to_dict())
+    assert restored.momentary == stats.momentary
+    assert restored.true_peak == -1.0
@@ -0,0 +1,98 @@
+import os
+import time
+import pytest
+from block_editor.core.audio_block import AudioBlock
+from block_editor.core.project import Project, summarize_blocks
+
+def labeled_blocks(labels):
+    blocks = []
+    for idx, label in enumerate(labels):
+        block = AudioBlock(float(idx), idx + 1.0, label is None)
+        block.label = label
+        blocks.append(block)
+    return blocks
+
+@pytest.fixture
+def project(tmp_path):
+    return Project(str(tmp_path / "episode.json"), max_resident=2)
+
+def analyze(project, video_path, labels):
+    session = project.session(video_path)
+    session.blocks = labeled_blocks(labels)
+    return session
+
+def test_summarize_blocks():
+    summary = summarize_blocks(labeled_blocks(["keep", None, "keep", "remove"]))
+    assert summary['blocks'] == 4
+    assert summary['duration'] == 4.0
+    assert summary['speech_blocks'] == 3
+    assert summary['labels'] == {'keep': {'count': 2, 'duration': 2.0}, 'remove': {'count': 1, 'duration': 1.0}}
+
+def test_new_session_has_video_path(project):
+    session = project.session("a.mp4")
+    assert session.video_path == os.path.abspath("a.mp4")
+    assert session.blocks == []
+    assert project.sources == [os.path.abspath("a.mp4")]
+
+def test_sessions_are_evicted_lru(project):
+    analyze(project, "a.mp4", ["keep"])
+    analyze(project, "b.mp4", ["keep"])
+    project.session("a.mp4")
+    analyze(project, "c.mp4", ["remove"])
+    assert project.is_resident("a.mp4") and project.is_resident("c.mp4")
+    assert not project.is_resident("b.mp4")
+    # The evicted session was written back and reloads with its blocks
+    assert os.path.exists(project.session_path("b.mp4"))
+    assert project.is_analyzed("b.mp4")
+    assert [block.label for block in project.session("b.mp4").blocks] == ["keep"]
+
+def test_active_session_is_never_evicted(project):
+    active = project.session("a.mp4", activate=True)
+    project.session("b.mp4")
+    project.session("c.mp4")
+    assert project.is_resident("a.mp4")
+    assert project.session("a.mp4") is active
+
+def test_label_totals_without_loading_sessions(project, tmp_path):
+    analyze(project, "a.mp4", ["keep", "remove"])
+    analyze(project, "b.mp4", ["keep", "keep"])
+    analyze(project, "c.mp4", [None, "keep"])
+    project.save()
+
+    reopened = Project.load(project.path, max_resident=2)
+    totals = reopened.label_totals()
+    assert totals['keep'] == {'count': 4, 'duration': 4.0, 'sources': 3}
+    assert totals['remove'] == {'count': 1, 'duration': 1.0, 'sources': 1}
+    assert not any(reopened.is_resident(path) for path in ("a.mp4", "b.mp4", "c.mp4"))
+
+def test_save_and_load_round_trip(project):
+    analyze(project, "a.mp4", ["keep"])
+    project.session("b.mp4", activate=True)
+    project.save()
+    reopened = Project.load(project.path)
+    assert reopened.sources == project.sources
+    assert reopened.active == os.path.abspath("b.mp4")
+    assert reopened.is_analyzed("a.mp4") and not reopened.is_analyzed("b.mp4")
+
+def test_remove_source_deletes_session(project):
+    analyze(project, "a.mp4", ["keep"])
+    project.save()
+    project.remove_source("a.mp4")
+    assert project.sources == []
+    assert not os.path.exists(project.session_path("a.mp4"))
+
+def test_switching_to_analyzed_source_is_fast(tmp_path):
+    project = Project(str(tmp_path / "long.json"), max_resident=1)
+    for name in ("a.mp4", "b.mp4"):
+        analyze(project, name, ["keep" if idx % 3 else None for idx in range(5000)])
+    project.save()
+    started = time.perf_counter()
+    session = project.session("a.mp4")
+    assert len(session.blocks) == 5000
+    assert time.perf_counter() - started < 1.0
+
+def test_load_rejects_newer_version(tmp_path):
+    path = tmp_path / "future.json"
+    path.write_text('{"version": 99, "sources": []}')
+    with pytest.raises(ValueError):
+        Project.load(str(path))
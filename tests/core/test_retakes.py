@@ -0,0 +1,87 @@
+import time
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from block_editor.core.audio_block import AudioBlock
+from block_editor.core.retakes import LSHIndex, find_retakes, fingerprints, label_retakes
+
+RATE = 16000
+
+def line(rng, words=8):
+    """A 'spoken line': a sequence of tones with random pitches and lengths"""
+    return [(rng.uniform(250, 3000), rng.uniform(0.15, 0.35)) for _ in range(words)]
+
+def render(words, rng, stretch=1.0, gain=0.3, noise=0.01):
+    parts = []
+    for frequency, seconds in words:
+        t = np.arange(int(seconds * stretch * RATE)) / RATE
+        parts.append(gain * np.sin(2 * np.pi * frequency * t))
+    audio = np.concatenate(parts)
+    return (audio + noise * rng.standard_normal(len(audio))).astype(np.float32)
+
+@pytest.fixture
+def session():
+    """Three lines: A twice, B once, A again slower and quieter, C, then B again"""
+    rng = np.random.default_rng(1)
+    a, b, c = line(rng), line(rng), line(rng)
+    takes = [
+        render(a, rng), render(b, rng), render(a, rng, stretch=1.08, gain=0.15),
+        render(c, rng), render(b, rng, stretch=0.95, gain=0.5), render(a, rng, gain=0.4)
+    ]
+    gap = np.zeros(RATE // 2, dtype=np.float32)
+    samples = []
+    blocks = []
+    position = 0.0
+    for take in takes:
+        blocks.append(AudioBlock(position, position + 0.5, True))
+        blocks.append(AudioBlock(position + 0.5, position + 0.5 + len(take) / RATE, False))
+        position += 0.5 + len(take) / RATE
+        samples += [gap, take]
+    return np.concatenate(samples), blocks
+
+def test_groups_takes_of_the_same_line(session):
+    samples, blocks = session
+    vectors = fingerprints(samples, RATE, blocks)
+    groups = find_retakes(vectors, blocks)
+    # Speech blocks are at odd indices: A=1, 5, 11; B=3, 9; C=7
+    assert groups == [[1, 5, 11], [3, 9]]
+
+def test_label_all_but_last_take(session):
+    samples, blocks = session
+    groups = find_retakes(fingerprints(samples, RATE, blocks), blocks)
+    assert label_retakes(blocks, groups, "remove") == 3
+    assert [i for i, block in enumerate(blocks) if block.label == "remove"] == [1, 3, 5]
+    assert blocks[11].label is None and blocks[9].label is None
+
+def test_short_and_silent_blocks_are_ignored():
+    blocks = [AudioBlock(0.0, 0.5, False), AudioBlock(0.5, 1.0, False), AudioBlock(1.0, 3.0, True)]
+    vectors = np.ones((3, 4), dtype=np.float32) / 2
+    assert find_retakes(vectors, blocks) == []
+
+def test_lsh_finds_near_duplicates_among_ten_thousand_blocks():
+    rng = np.random.default_rng(0)
+    count, dimensions = 10_000, 256
+    vectors = rng.standard_normal((count, dimensions)).astype(np.float32)
+    # Every 100th block is a noisy copy of the one before it
+    copies = np.arange(100, count, 100)
+    vectors[copies] = vectors[copies - 1] + 0.3 * rng.standard_normal((len(copies), dimensions))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    blocks = [AudioBlock(i * 3.0, i * 3.0 + 2.0, False) for i in range(count)]
+
+    started = time.perf_counter()
+    groups = find_retakes(vectors, blocks)
+    elapsed = time.perf_counter() - started
+    found = {tuple(group) for group in groups}
+    assert sum((i - 1, i) in found for i in copies) >= 0.9 * len(copies)
+    assert len(groups) <= len(copies) + 5
+    assert elapsed < 5
+
+def test_candidate_pairs_are_unique_and_ordered():
+    rng = np.random.default_rng(2)
+    vectors = rng.standard_normal((50, 16))
+    vectors[1] = vectors[0]
+    pairs = LSHIndex(16).candidate_pairs(vectors)
+    assert [0, 1] in pairs.tolist()
+    assert np.all(pairs[:, 0] < pairs[:, 1])
+    assert len({tuple(pair) for pair in pairs.tolist()}) == len(pairs)
@@ -0,0 +1,56 @@
+import pytest
+from block_editor.core.time_map import TimeMap
+from block_editor.core.audio_block import AudioBlock
+
+@pytest.fixture
+def time_map():
+    # Two speech ranges separated by a second of silence
+    return TimeMap.from_ranges([(1.0, 3.0), (4.0, 5.0)])
+
+def test_time_map_from_ranges(time_map):
+    assert time_map.segments == [(1.0, 3.0, 0.0), (4.0, 5.0, 2.0)]
+    assert time_map.proxy_duration == 3.0
+
+def test_time_map_to_proxy(time_map):
+    assert time_map.to_proxy(1.0) == 0.0
+    assert time_map.to_proxy(2.5) == 1.5
+    assert time_map.to_proxy(4.5) == 2.5
+
+def test_time_map_to_proxy_snaps_gaps_forward(time_map):
+    assert time_map.to_proxy(0.5) == 0.0
+    assert time_map.to_proxy(3.5) == 2.0
+    assert time_map.to_proxy(6.0) == 3.0
+
+def test_time_map_to_original(time_map):
+    assert time_map.to_original(0.0) == 1.0
+    assert time_map.to_original(1.5) == 2.5
+    assert time_map.to_original(2.0) == 4.0
+    assert time_map.to_original(2.5) == 4.5
+
+def test_time_map_round_trip(time_map):
+    for position in (1.0, 1.25, 2.9, 4.0, 4.75):
+        assert time_map.to_original(time_map.to_proxy(position)) == pytest.approx(position)
+
+def test_time_map_measured_durations():
+    time_map = TimeMap.from_ranges([(1.0, 3.0), (4.0, 5.0)], durations=[2.05, 1.0])
+    assert time_map.segments[1][2] == 2.05
+    assert time_map.proxy_duration == pytest.approx(3.05)
+
+def test_time_map_from_blocks():
+    blocks = [
+        AudioBlock(0.0, 1.0, False),
+        AudioBlock(1.0, 2.0, True),
+        AudioBlock(2.0, 2.1, False),
+        AudioBlock(2.1, 3.0, False)
+    ]
+    time_map = TimeMap.from_blocks(blocks, min_duration=0.3)
+    assert time_map.ranges == [(0.0, 1.0), (2.1, 3.0)]
+
+def test_time_map_to_from_dict(time_map):
+    restored = TimeMap.from_dict(time_map.to_dict())
+    assert restored.segments == time_map.segments
+
+def test_empty_time_map_is_identity():
+    time_map = TimeMap()
+    assert time_map.to_proxy(2.0) == 2.0
+    assert time_map.to_original(2.0) == 2.0
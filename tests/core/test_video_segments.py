@@ -0,0 +1,22 @@
+from block_editor.core.audio_block import AudioBlock
+from block_editor.core.video_segments import merge_intervals, merge_video_segments
+
+def test_merge_intervals():
+    assert merge_intervals([(5, 6), (0, 2), (1.9, 3), (6.1, 7)], gap=0.2) == [(0, 3), (5, 7)]
+
+def test_speech_blocks_split_at_cuts_and_freezes():
+    speech = AudioBlock(2.0, 40.0, False)
+    speech.label = "keep"
+    blocks = [AudioBlock(0.0, 2.0, True), speech]
+    merged = merge_video_segments(blocks, cuts=[1.0, 10.0, 30.5], freezes=[(20.0, 30.0)])
+    assert [(block.start, block.end, block.is_silence) for block in merged] == [
+        (0.0, 2.0, True), (2.0, 10.0, False), (10.0, 20.0, False), (20.0, 30.0, False), (30.0, 40.0, False)
+    ]
+    assert all(block.label == "keep" for block in merged[1:])
+
+def test_boundaries_near_existing_ones_are_dropped():
+    blocks = [AudioBlock(0.0, 10.0, False)]
+    merged = merge_video_segments(blocks, cuts=[0.5, 5.0, 5.4, 9.8], freezes=[])
+    assert [(block.start, block.end) for block in merged] == [(0.0, 5.0), (5.0, 10.0)]
+    unsplit = merge_video_segments(blocks, cuts=[0.2], freezes=[])
+    assert unsplit[0] is blocks[0]
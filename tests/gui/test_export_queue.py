@@ -0,0 +1,33 @@
+from block_editor.core.audio_block import AudioBlock
+from block_editor.gui.export_queue import ExportJob, ExportQueue
+
+def make_job(label="keep"):
+    block = AudioBlock(1.0, 2.0, False)
+    block.label = label
+    return ExportJob("video.mp4", {label: [block]}, {label: f"{label}_blocks.mp4"}, "reencode")
+
+def test_export_job_snapshots_blocks():
+    block = AudioBlock(1.0, 2.0, False)
+    block.label = "keep"
+    job = ExportJob("video.mp4", {"keep": [block]}, {"keep": "keep_blocks.mp4"}, "reencode")
+    block.label = "remove"
+    assert job.blocks_by_label["keep"][0].label == "keep"
+    assert job.description == "keep"
+
+def test_queued_jobs_wait_and_cancel(qapp):
+    queue = ExportQueue()
+    running = make_job("keep")
+    running.status = ExportJob.RUNNING
+    queue.current = running
+    queue.jobs.append(running)
+
+    finished = []
+    queue.job_finished.connect(finished.append)
+    queued = queue.submit(make_job("remove"))
+    assert queued.status == ExportJob.QUEUED
+    assert queue.pending() == [running, queued]
+
+    queue.cancel(queued)
+    assert queued.status == ExportJob.CANCELLED
+    assert finished == [queued]
+    assert queue.pending() == [running]
@@ -0,0 +1,22 @@
+import subprocess
+import sys
+
+# Imports every core and utils module in a fresh interpreter and reports
+# whether Qt was loaded. Modules whose optional third-party dependencies are
+# missing are skipped.
+CHECK = """
+import importlib, pkgutil, sys
+import block_editor.core, block_editor.utils
+for package in (block_editor.core, block_editor.utils):
+    for module in pkgutil.iter_modules(package.__path__, package.__name__ + "."):
+        try:
+            importlib.import_module(module.name)
+        except ModuleNotFoundError as e:
+            if e.name.startswith("block_editor"):
+                raise
+print(sorted(name for name in sys.modules if name.split(".")[0] == "PySide6"))
+"""
+
+def test_core_and_utils_never_import_qt():
+    result = subprocess.run([sys.executable, "-c", CHECK], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
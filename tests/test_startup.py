@@ -0,0 +1,49 @@
+import os
+import re
+import shutil
+import subprocess
+import sys
+import pytest
+
+pytest.importorskip("PySide6.QtWidgets")
+
+# Budgets in seconds, generous enough for a loaded CI machine
+IMPORT_BUDGET = 1.5
+WINDOW_BUDGET = 5.0
+# Modules that must only load once they are actually used
+DEFERRED_MODULES = ("requests", "py7zr", "PySide6.QtMultimedia", "numpy", "cv2")
+
+def run_python(*args):
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    return subprocess.run(
+        [sys.executable, *args], capture_output=True, text=True, env=env, timeout=60, check=True
+    )
+
+def import_times(statement):
+    """Cumulative microseconds per module from python -X importtime"""
+    result = run_python("-X", "importtime", "-c", statement)
+    times = {}
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \|\s+(\S.*)$", line)
+        if match:
+            times[match.group(2).strip()] = int(match.group(1))
+    return times
+
+def test_main_window_import_defers_heavy_modules():
+    times = import_times("from block_editor.gui.video_player import VideoPlayer")
+    assert "block_editor.gui.video_player" in times
+    for module in DEFERRED_MODULES:
+        assert module not in times
+    assert times["block_editor.gui.video_player"] / 1e6 < IMPORT_BUDGET
+
+def test_entry_point_import_defers_heavy_modules():
+    times = import_times("import block_editor.__main__")
+    for module in DEFERRED_MODULES + ("block_editor.gui.video_player",):
+        assert module not in times
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg is not installed")
+def test_cold_start_to_window():
+    result = run_python("-m", "block_editor", "--startup-time")
+    match = re.search(r"startup: ([\d.]+)s", result.stdout)
+    assert match, result.stdout
+    assert float(match.group(1)) < WINDOW_BUDGET
@@ -0,0 +1,38 @@
+import pytest
+from block_editor.core.audio_block import AudioBlock
+from block_editor.core.loudness import LoudnessStats
+from block_editor.utils import media_cache
+from block_editor.utils.analysis_cache import AnalysisCache, detection_params
+
+@pytest.fixture
+def source_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(media_cache, 'CACHE_ROOT', str(tmp_path / "cache"))
+    path = tmp_path / "source.mp4"
+    path.write_bytes(b"recording")
+    return path
+
+def test_detection_params_fill_defaults():
+    assert detection_params() == {'threshold': -40, 'duration': 0.1, 'buffer': 0.3, 'video_cuts': False}
+    assert detection_params({'threshold': -30, 'editing_proxy': True})['threshold'] == -30
+
+def test_detection_round_trip(source_file):
+    cache = AnalysisCache()
+    blocks = [AudioBlock(0.0, 1.0, True), AudioBlock(1.0, 2.5, False)]
+    loudness = LoudnessStats()
+    loudness.add(-20.0, -21.0, -3.0)
+    assert cache.get_detection(str(source_file)) is None
+
+    cache.put_detection(str(source_file), None, blocks, loudness)
+    cached_blocks, cached_loudness = cache.get_detection(str(source_file), {'threshold': -40})
+    assert [(block.start, block.end, block.is_silence) for block in cached_blocks] == [(0.0, 1.0, True), (1.0, 2.5, False)]
+    assert cached_loudness.true_peak == -3.0
+
+def test_detection_misses_on_other_settings_or_changed_file(source_file):
+    cache = AnalysisCache()
+    cache.put_detection(str(source_file), None, [AudioBlock(0.0, 1.0, False)], None)
+    assert cache.get_detection(str(source_file), {'threshold': -30}) is None
+    source_file.write_bytes(b"a different recording")
+    assert cache.get_detection(str(source_file)) is None
+
+def test_missing_source_is_a_miss(tmp_path, source_file):
+    assert AnalysisCache().get(str(tmp_path / "gone.mp4"), "probe") is None
@@ -0,0 +1,141 @@
+import os
+import tempfile
+import threading
+import time
+import pytest
+from block_editor.core.audio_block import AudioBlock
+from block_editor.utils import analysis_service, media_cache
+from block_editor.utils.analysis_service import (
+    AnalysisClient, AnalysisService, ServiceError, connect, create_server, INVALID_PARAMS, METHOD_NOT_FOUND
+)
+from block_editor.utils.analysis_cache import AnalysisCache
+from block_editor.utils.editing_proxy import EditingProxy
+from block_editor.utils.silence_detector import SilenceDetector
+
+pytestmark = pytest.mark.skipif(not hasattr(analysis_service.socket, "AF_UNIX"), reason="needs Unix sockets")
+
+@pytest.fixture
+def source_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(media_cache, 'CACHE_ROOT', str(tmp_path / "cache"))
+    monkeypatch.setattr(analysis_service.toolchain, 'current', lambda: None)
+    path = tmp_path / "source.mp4"
+    path.write_bytes(b"recording")
+    return str(path)
+
+@pytest.fixture
+def address():
+    # Unix socket paths are limited to about 100 characters
+    directory = tempfile.mkdtemp(prefix="svc", dir="/tmp")
+    yield os.path.join(directory, "analysis.sock")
+    if os.path.exists(os.path.join(directory, "analysis.sock")):
+        os.remove(os.path.join(directory, "analysis.sock"))
+    os.rmdir(directory)
+
+@pytest.fixture
+def server(address):
+    server = create_server(AnalysisService(), address)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def detections(monkeypatch):
+    calls = []
+
+    def detect_blocks(self):
+        calls.append(self.input_file)
+        time.sleep(0.3)
+        self.loudness = None
+        return [AudioBlock(0.0, 1.0, True), AudioBlock(1.0, 3.0, False)]
+
+    monkeypatch.setattr(SilenceDetector, 'detect_blocks', detect_blocks)
+    return calls
+
+def test_connect_without_service_returns_none(address):
+    assert connect(address) is None
+
+def test_detect_round_trip(server, address, source_file, detections):
+    with AnalysisClient(address) as client:
+        blocks, loudness = client.detect(source_file, {'threshold': -35})
+    assert [(block.start, block.end, block.is_silence) for block in blocks] == [(0.0, 1.0, True), (1.0, 3.0, False)]
+    assert loudness is None
+
+def test_identical_requests_share_one_job(server, address, source_file, detections):
+    results = []
+
+    def client_detect():
+        with AnalysisClient(address) as client:
+            results.append(client.detect(source_file))
+
+    threads = [threading.Thread(target=client_detect) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(results) == 3
+    assert detections == [os.path.abspath(source_file)]
+
+def test_partial_detection_is_neither_cached_nor_shared(server, address, source_file, monkeypatch):
+    calls = []
+
+    def detect_blocks(self):
+        calls.append(self.input_file)
+        self.complete = False
+        self.loudness = None
+        return [AudioBlock(0.0, 3.0, False)]
+
+    monkeypatch.setattr(SilenceDetector, 'detect_blocks', detect_blocks)
+    settings = {'video_cuts': True}
+    with AnalysisClient(address) as client:
+        client.detect(source_file, settings)
+        client.detect(source_file, settings)
+    assert len(calls) == 2
+    assert AnalysisCache().get_detection(source_file, settings) is None
+
+def test_watch_streams_progress(server, address, source_file, monkeypatch):
+    def render(self, progress_callback=None, job_callback=None, priority=None):
+        for fraction in (0.25, 0.5, 0.75):
+            progress_callback(fraction)
+            time.sleep(0.25)
+        return self.path
+
+    monkeypatch.setattr(EditingProxy, 'render', render)
+    updates = []
+    with AnalysisClient(address) as client:
+        job = client.submit("proxy", source_file)
+        final = client.call("watch", notification_callback=updates.append, job=job['job'])
+        assert final['state'] == "done"
+        assert client.call("result", job=job['job'])['path'] == EditingProxy(source_file).path
+    assert any(0 < update['progress'] < 1 for update in updates)
+
+def test_errors_are_reported(server, address, source_file):
+    with AnalysisClient(address) as client:
+        with pytest.raises(ServiceError) as error:
+            client.call("explode")
+        assert error.value.code == METHOD_NOT_FOUND
+        with pytest.raises(ServiceError):
+            client.submit("detect", source_file + ".missing")
+        with pytest.raises(ServiceError):
+            client.submit("transcode", source_file)
+
+def test_malformed_params_keep_the_connection(server, address, source_file):
+    with AnalysisClient(address) as client:
+        client.file.write(b'{"jsonrpc": "2.0", "id": 1, "method": "submit", "params": [1, 2]}\n')
+        client.file.flush()
+        assert b"-32602" in client.file.readline()
+        for method, params in (("submit", {'kind': "detect", 'path': 42}),
+                               ("submit", {'kind': "detect", 'path': source_file, 'params': "loud"}),
+                               ("result", {'job': "1", 'timeout': "soon"}),
+                               ("result", {'job': "1", 'timeout': True}),
+                               ("status", {'job': [1]})):
+            with pytest.raises(ServiceError) as error:
+                client.call(method, **params)
+            assert error.value.code == INVALID_PARAMS
+        assert client.call("ping") == "pong"
+
+def test_stale_socket_is_replaced(address):
+    open(address, "w").close()
+    server = create_server(AnalysisService(), address)
+    server.server_close()
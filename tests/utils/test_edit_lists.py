@@ -0,0 +1,47 @@
+import json
+from fractions import Fraction
+from xml.etree import ElementTree
+from block_editor.utils.edit_lists import (
+    build_edl, build_fcpxml, build_ffconcat, build_otio, frames_to_timecode, write_edit_lists
+)
+
+PROPS = {'r_frame_rate': '25/1', 'frame_rate': 25.0, 'width': 1280, 'height': 720}
+RANGES = [(0.72, 2.32), (4.72, 6.32)]
+
+def test_frames_to_timecode():
+    assert frames_to_timecode(0, Fraction(25)) == "00:00:00:00"
+    assert frames_to_timecode(25 * 3661 + 7, Fraction(25)) == "01:01:01:07"
+    assert frames_to_timecode(30, Fraction(30000, 1001)) == "00:00:01:00"
+
+def test_build_edl_lays_events_back_to_back():
+    edl = build_edl(RANGES, "keep", "source.mp4", Fraction(25))
+    events = [line for line in edl.splitlines() if line[:3].isdigit()]
+    assert events[0].split()[-4:] == ["00:00:00:18", "00:00:02:08", "00:00:00:00", "00:00:01:15"]
+    assert events[1].split()[-4:] == ["00:00:04:18", "00:00:06:08", "00:00:01:15", "00:00:03:05"]
+    assert "* FROM CLIP NAME: source.mp4" in edl
+
+def test_build_fcpxml_clips():
+    root = ElementTree.fromstring(build_fcpxml(RANGES, "/media/source.mp4", PROPS, "keep").split("\n", 2)[2])
+    clips = root.findall(".//spine/asset-clip")
+    assert [clip.get("start") for clip in clips] == ["18/25s", "118/25s"]
+    assert [clip.get("offset") for clip in clips] == ["0s", "8/5s"]
+    assert root.find(".//sequence").get("duration") == "16/5s"
+
+def test_build_otio_tracks():
+    timeline = build_otio(RANGES, "/media/source.mp4", PROPS, "keep")
+    video, audio = timeline["tracks"]["children"]
+    assert video["kind"] == "Video" and audio["kind"] == "Audio"
+    source_range = video["children"][1]["source_range"]
+    assert source_range["start_time"]["value"] == 118.0
+    assert source_range["duration"]["value"] == 40.0
+
+def test_build_ffconcat_uses_in_and_out_points():
+    lines = build_ffconcat(RANGES, "/media/it's.mp4").splitlines()
+    assert lines[0] == "ffconcat version 1.0"
+    assert lines[1] == "file '/media/it'\\''s.mp4'"
+    assert lines[2:4] == ["inpoint 0.72", "outpoint 2.32"]
+
+def test_write_edit_lists(tmp_path):
+    paths = write_edit_lists("keep", RANGES, "/media/source.mp4", PROPS, str(tmp_path / "keep_blocks"))
+    assert [p.rsplit(".", 1)[1] for p in paths] == ["edl", "fcpxml", "otio", "ffconcat"]
+    assert json.loads((tmp_path / "keep_blocks.otio").read_text())["name"] == "keep"
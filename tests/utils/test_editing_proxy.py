@@ -0,0 +1,48 @@
+import pytest
+from unittest.mock import patch
+from block_editor.utils import media_cache
+from block_editor.utils.editing_proxy import EditingProxy
+from block_editor.utils.ffmpeg_progress import parse_progress_time
+
+@pytest.fixture
+def source_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(media_cache, 'CACHE_ROOT', str(tmp_path / "cache"))
+    path = tmp_path / "source.mov"
+    path.write_bytes(b"not really a video")
+    return path
+
+def make_props(**overrides):
+    props = {'codec': 'h264', 'width': 1920, 'height': 1080, 'pix_fmt': 'yuv420p', 'duration': 10.0}
+    props.update(overrides)
+    return props
+
+def test_editing_proxy_cached_by_source_identity(source_file):
+    first = EditingProxy(str(source_file))
+    second = EditingProxy(str(source_file))
+    assert first.path == second.path
+    assert not first.exists()
+
+    source_file.write_bytes(b"a different recording")
+    assert EditingProxy(str(source_file)).path != first.path
+
+def test_editing_proxy_needed(source_file):
+    proxy = EditingProxy(str(source_file))
+    assert not proxy.needed(make_props())
+    assert proxy.needed(make_props(height=2160))
+    assert proxy.needed(make_props(codec='prores'))
+    assert proxy.needed(make_props(pix_fmt='yuv422p10le'))
+
+def test_editing_proxy_render_skips_cached(source_file):
+    proxy = EditingProxy(str(source_file))
+    with open(proxy.path, 'wb') as f:
+        f.write(b"proxy")
+    with patch('block_editor.utils.editing_proxy.run_with_progress') as mock_run:
+        assert proxy.render() == proxy.path
+        mock_run.assert_not_called()
+
+def test_parse_progress_time():
+    assert parse_progress_time("out_time_us=1500000\n") == 1.5
+    assert parse_progress_time("out_time_ms=2500000") == 2.5
+    assert parse_progress_time("out_time=00:01:02.500000") == pytest.approx(62.5)
+    assert parse_progress_time("progress=continue") is None
+    assert parse_progress_time("out_time_us=N/A") is None
@@ -0,0 +1,452 @@
+import os
+import shutil
+import subprocess
+import threading
+import pytest
+from block_editor.core.audio_block import AudioBlock
+from block_editor.utils.exporter import (
+    get_video_properties, compute_export_ranges, label_blocks, plan_smart_cut, VideoExporter,
+    build_trim_concat_graph, chunk_ranges, build_multi_output_graph, window_progress,
+    ExportCancelled
+)
+from block_editor.utils.segment_cache import SegmentCache
+from block_editor.core.loudness import LoudnessStats
+from block_editor.utils.toolchain import Toolchain, MissingCapability
+
+def labeled(start, end, label):
+    block = AudioBlock(start, end, False)
+    block.label = label
+    return block
+
+@pytest.fixture
+def props():
+    return {
+        'video_codec': 'h264', 'audio_codec': 'aac', 'frame_rate': 25.0, 'r_frame_rate': '25/1',
+        'audio_bitrate': '128000', 'width': 1920, 'height': 1080, 'pix_fmt': 'yuv420p',
+        'profile': 'High', 'level': 40, 'time_base': '1/12800', 'sample_rate': '48000', 'channels': 2
+    }
+
+def test_label_blocks_sorted():
+    blocks = [labeled(5.0, 6.0, "keep"), labeled(1.0, 2.0, "keep"), labeled(3.0, 4.0, "remove")]
+    result = label_blocks(blocks, "keep")
+    assert [block.start for block in result] == [1.0, 5.0]
+
+def test_compute_export_ranges_applies_buffer():
+    ranges = compute_export_ranges([labeled(1.0, 2.0, "keep"), labeled(5.0, 6.0, "keep")])
+    assert ranges[0] == pytest.approx((0.7, 2.3))
+    assert ranges[1] == pytest.approx((4.7, 6.3))
+
+def test_compute_export_ranges_clamps_at_zero():
+    ranges = compute_export_ranges([labeled(0.1, 1.0, "keep")])
+    assert ranges[0] == pytest.approx((0.0, 1.3))
+
+def test_compute_export_ranges_uses_midpoint_for_overlaps():
+    ranges = compute_export_ranges([labeled(1.0, 2.0, "keep"), labeled(2.4, 3.0, "keep")])
+    assert ranges[0][1] == pytest.approx(2.2)
+    assert ranges[1][0] == pytest.approx(2.2)
+
+def test_plan_smart_cut_copies_interior():
+    keyframes = [0.0, 2.0, 4.0, 6.0, 8.0]
+    assert plan_smart_cut(1.0, 7.0, keyframes) == [(1.0, 2.0, False), (2.0, 6.0, True), (6.0, 7.0, False)]
+
+def test_plan_smart_cut_on_keyframes():
+    keyframes = [0.0, 2.0, 4.0, 6.0]
+    assert plan_smart_cut(2.0, 6.0, keyframes) == [(2.0, 6.0, True)]
+
+def test_plan_smart_cut_within_one_gop_reencodes():
+    keyframes = [0.0, 2.0, 4.0]
+    assert plan_smart_cut(2.5, 3.5, keyframes) == [(2.5, 3.5, False)]
+    assert plan_smart_cut(1.5, 2.5, keyframes) == [(1.5, 2.5, False)]
+
+def test_plan_smart_cut_without_keyframes():
+    assert plan_smart_cut(1.0, 2.0, []) == [(1.0, 2.0, False)]
+
+def test_exporter_rejects_unknown_mode(tmp_path, props):
+    with pytest.raises(ValueError):
+        VideoExporter("video.mp4", props, str(tmp_path / "temp"), mode="magic")
+
+def test_matching_video_args(tmp_path, props):
+    exporter = VideoExporter("video.mp4", props, str(tmp_path / "temp"), mode="smart_cut")
+    args = exporter.matching_video_args()
+    assert args[:2] == ["-c:v", "libx264"]
+    assert "-pix_fmt" in args and "yuv420p" in args
+    assert args[args.index("-profile:v") + 1] == "high"
+    assert args[args.index("-video_track_timescale") + 1] == "12800"
+
+@pytest.mark.parametrize("profile, x264_profile", [
+    ("Constrained Baseline", "baseline"),
+    ("Main", "main"),
+    ("High", "high"),
+    ("High 10", "high10"),
+    ("High 4:2:2", "high422"),
+    ("High 4:4:4 Predictive", "high444"),
+    ("High 4:4:4 Intra", None),
+    (None, None),
+])
+def test_matching_video_args_x264_profile(tmp_path, props, profile, x264_profile):
+    exporter = VideoExporter("video.mp4", dict(props, profile=profile), str(tmp_path / "temp"), mode="smart_cut")
+    args = exporter.matching_video_args()
+    if x264_profile is None:
+        assert "-profile:v" not in args
+    else:
+        assert args[args.index("-profile:v") + 1] == x264_profile
+
+def test_smart_cut_segments_commands(tmp_path, props):
+    exporter = VideoExporter("video.mp4", props, str(tmp_path / "temp"), mode="smart_cut")
+    exporter._keyframes = [0.0, 2.0, 4.0, 6.0]
+    exporter._frame_times = [i * 0.04 for i in range(200)]
+    commands = []
+    exporter.run = lambda cmd, *args: commands.append(cmd)
+
+    paths = exporter.smart_cut_segments("keep", [(1.0, 5.0)])
+
+    assert len(paths) == 3
+    copy_flags = [cmd[cmd.index("-c:v") + 1] == "copy" for cmd in commands]
+    assert copy_flags == [False, True, False]
+    # The copy stops at the packet before the keyframe at 4.0
+    assert [cmd[cmd.index("-frames:v") + 1] for cmd in commands] == ["25", "50", "25"]
+    assert all("-r" not in cmd for cmd in commands)
+
+def frame_levels(path):
+    """(pts_time, mean luma) of every video frame of path"""
+    output = subprocess.run([
+        "ffprobe", "-v", "error", "-f", "lavfi", "-i", f"movie={path},signalstats",
+        "-show_entries", "frame=pts_time:frame_tags=lavfi.signalstats.YAVG", "-of", "csv=p=0"
+    ], capture_output=True, text=True, check=True).stdout
+    frames = []
+    for line in output.splitlines():
+        pts_time, level = line.strip(",").split(",")
+        frames.append((round(float(pts_time), 3), float(level)))
+    return frames
+
+@pytest.mark.skipif(not (shutil.which("ffmpeg") and shutil.which("ffprobe")), reason="needs ffmpeg")
+def test_smart_cut_matches_filtergraph_frames(tmp_path):
+    # Every frame has its own brightness, so a repeated or dropped frame shows
+    source = str(tmp_path / "source.mp4")
+    subprocess.run([
+        "ffmpeg", "-v", "error", "-y",
+        "-f", "lavfi", "-i", "color=black:size=64x64:rate=25:duration=12,geq=lum='mod(N*4,240)':cb=128:cr=128",
+        "-f", "lavfi", "-i", "sine=duration=12",
+        "-c:v", "libx264", "-g", "25", "-bf", "2", "-pix_fmt", "yuv420p", "-c:a", "aac", "-shortest",
+        source
+    ], check=True)
+    props = get_video_properties(source)
+    blocks = [labeled(0.5, 3.3, "keep"), labeled(4.1, 9.95, "keep"), labeled(10.6, 11.5, "keep")]
+
+    outputs = {}
+    for mode in ("filtergraph", "smart_cut"):
+        outputs[mode] = str(tmp_path / f"{mode}.mp4")
+        exporter = VideoExporter(source, props, str(tmp_path / mode), mode=mode, workers=1)
+        exporter.export_label("keep", blocks, outputs[mode])
+        exporter.cleanup()
+
+    expected = frame_levels(outputs["filtergraph"])
+    frames = frame_levels(outputs["smart_cut"])
+    assert len(frames) == len(expected)
+    assert [pts for pts, _ in frames] == [pts for pts, _ in expected]
+    assert [level for _, level in frames] == pytest.approx([level for _, level in expected], abs=2)
+
+def first_pts(path, stream):
+    """Presentation time of the first decoded frame of stream"""
+    output = subprocess.run([
+        "ffprobe", "-v", "error", "-select_streams", stream, "-read_intervals", "%+#1",
+        "-show_entries", "frame=pts_time", "-of", "csv=p=0", path
+    ], capture_output=True, text=True, check=True).stdout
+    return float(output.split()[0].strip(","))
+
+@pytest.mark.skipif(not (shutil.which("ffmpeg") and shutil.which("ffprobe")), reason="needs ffmpeg")
+def test_reencoded_segments_start_at_zero(tmp_path):
+    source = str(tmp_path / "source.mp4")
+    subprocess.run([
+        "ffmpeg", "-v", "error", "-y",
+        "-f", "lavfi", "-i", "testsrc=size=64x64:rate=25:duration=8",
+        "-f", "lavfi", "-i", "sine=duration=8",
+        "-c:v", "libx264", "-pix_fmt", "yuv420p", "-c:a", "aac", "-shortest", source
+    ], check=True)
+    props = get_video_properties(source)
+    blocks = [labeled(2.5, 4.0, "keep"), labeled(5.2, 7.0, "keep")]
+    exporter = VideoExporter(source, props, str(tmp_path / "temp"), workers=1,
+                             segment_cache=SegmentCache(str(tmp_path / "cache")))
+    segments = exporter.reencode_segments("keep", compute_export_ranges(blocks))
+    # At zero rather than at the source time, give or take the encoder's B-frame delay
+    for segment in segments:
+        assert first_pts(segment, "v:0") == pytest.approx(0.0, abs=0.1)
+    output = str(tmp_path / "keep.mp4")
+    exporter.export_label("keep", blocks, output)
+    assert first_pts(output, "v:0") == pytest.approx(0.0, abs=0.1)
+    assert first_pts(output, "a:0") == pytest.approx(0.0, abs=0.1)
+    duration = float(subprocess.run([
+        "ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", output
+    ], capture_output=True, text=True, check=True).stdout)
+    assert duration == pytest.approx(sum(end - start for start, end in compute_export_ranges(blocks)), abs=0.2)
+
+def test_build_trim_concat_graph():
+    graph = build_trim_concat_graph([(1.0, 2.0), (3.0, 4.5)], offset=1.0)
+    assert graph.startswith("[0:v]split=2[sv0][sv1];[0:a]asplit=2[sa0][sa1]")
+    assert "[sv0]trim=start=0.0:end=1.0,setpts=PTS-STARTPTS[v0]" in graph
+    assert "[sa1]atrim=start=2.0:end=3.5,asetpts=PTS-STARTPTS[a1]" in graph
+    assert graph.endswith("[v0][a0][v1][a1]concat=n=2:v=1:a=1[outv][outa]")
+
+def test_chunk_ranges_by_count():
+    ranges = [(float(i), i + 0.5) for i in range(10)]
+    chunks = chunk_ranges(ranges, max_segments=4)
+    assert [len(chunk) for chunk in chunks] == [4, 4, 2]
+    assert [r for chunk in chunks for r in chunk] == ranges
+
+def test_chunk_ranges_by_length():
+    ranges = [(float(i), i + 0.5) for i in range(10)]
+    chunks = chunk_ranges(ranges, max_segments=100, max_length=600)
+    assert len(chunks) > 1
+    assert all(len(build_trim_concat_graph(chunk, chunk[0][0])) <= 600 for chunk in chunks)
+
+def test_filtergraph_export_single_process(tmp_path, props):
+    exporter = VideoExporter("video.mp4", props, str(tmp_path / "temp"), mode="filtergraph")
+    commands = []
+    exporter.run = lambda cmd, *args: commands.append(cmd)
+
+    blocks = [labeled(1.0, 2.0, "keep"), labeled(5.0, 6.0, "keep")]
+    exporter.export_label("keep", blocks, str(tmp_path / "keep_blocks.mp4"))
+
+    assert len(commands) == 1
+    cmd = commands[0]
+    assert cmd[cmd.index("-ss") + 1] == "0.7"
+    assert "concat=n=2" in cmd[cmd.index("-filter_complex") + 1]
+
+def test_build_multi_output_graph():
+    graph = build_multi_output_graph([[(1.0, 2.0), (5.0, 6.0)], [(3.0, 4.0)]], offset=1.0)
+    assert graph.startswith("[0:v]split=3[sv0][sv1][sv2];[0:a]asplit=3[sa0][sa1][sa2]")
+    assert "[v0][a0][v1][a1]concat=n=2:v=1:a=1[outv0][outa0]" in graph
+    assert "[sv2]trim=start=2.0:end=3.0" in graph
+    assert graph.endswith("[v2][a2]concat=n=1:v=1:a=1[outv1][outa1]")
+
+def test_multi_output_export_single_decode(tmp_path, props):
+    exporter = VideoExporter("video.mp4", props, str(tmp_path / "temp"), mode="multi_output")
+    commands = []
+    exporter.run = lambda cmd, *args: commands.append(cmd)
+
+    blocks_by_label = {
+        "keep": [labeled(1.0, 2.0, "keep"), labeled(8.0, 9.0, "keep")],
+        "remove": [labeled(4.0, 5.0, "remove")]
+    }
+    output_paths = {"keep": "keep_blocks.mp4", "remove": "remove_blocks.mp4"}
+    exporter.export_labels(blocks_by_label, output_paths)
+
+    assert len(commands) == 1
+    cmd = commands[0]
+    assert "keep_blocks.mp4" in cmd and "remove_blocks.mp4" in cmd
+    assert cmd.count("-i") == 1
+
+def test_export_labels_per_label_modes(tmp_path, props):
+    exporter = VideoExporter("video.mp4", props, str(tmp_path / "temp"), mode="filtergraph")
+    commands = []
+    exporter.run = lambda cmd, *args: commands.append(cmd)
+
+    blocks_by_label = {"keep": [labeled(1.0, 2.0, "keep")], "remove": [labeled(4.0, 5.0, "remove")]}
+    exporter.export_labels(blocks_by_label, {"keep": "k.mp4", "remove": "r.mp4"})
+    assert len(commands) == 2
+
+def test_parallel_segments_keep_block_order(tmp_path, props):
+    exporter = VideoExporter("video.mp4", props, str(tmp_path / "temp"), workers=4)
+    finished = []
+    lock = threading.Lock()
+
+    def run(cmd, *args):
+        with lock:
+            finished.append(cmd[-1])
+
+    exporter.run = run
+    blocks = [labeled(float(i * 3), float(i * 3 + 1), "keep") for i in range(8)]
+    paths = exporter.reencode_segments("keep", compute_export_ranges(blocks))
+    assert sorted(finished) == sorted(paths)
+    assert paths == [str(tmp_path / "temp" / f"segment_keep_{i}.mp4") for i in range(8)]
+
+def test_run_all_fails_fast(tmp_path, props):
+    exporter = VideoExporter("video.mp4", props, str(tmp_path / "temp"), workers=2)
+    started = []
+
+    def run(cmd, *args):
+        started.append(cmd)
+        if cmd == ["bad"]:
+            raise subprocess.CalledProcessError(1, cmd)
+        exporter._aborted.wait(1.0)
+
+    exporter.run = run
+    with pytest.raises(subprocess.CalledProcessError):
+        exporter.run_all([["bad"]] + [["ok"]] * 10)
+    assert exporter._aborted.is_set()
+    assert len(started) < 11
+
+def test_threads_limited_only_when_commands_run_side_by_side(tmp_path, props):
+    exporter = VideoExporter("video.mp4", props, str(tmp_path / "temp"), workers=4, threads_per_job=2)
+    limits = []
+    lock = threading.Lock()
+
+    def run(cmd, duration=None, weight=None, threads=None):
+        with lock:
+            limits.append(threads)
+
+    exporter.run = run
+    exporter.run_all([["one"]])
+    assert limits == [None]
+    limits.clear()
+    exporter.run_all([["one"], ["two"], ["three"]])
+    assert limits == [2, 2, 2]
+    assert "-threads" not in exporter.graph_command([(0.0, 1.0)], "out.mp4")
+
+    single = VideoExporter("video.mp4", props, str(tmp_path / "temp"), workers=1)
+    assert single.thread_limit(3) is None
+
+def test_window_progress():
+    tagged = [(0.0, 2.0, "keep"), (3.0, 4.0, "remove"), (5.0, 6.0, "keep")]
+    assert window_progress(tagged) == pytest.approx((3.0, 4.0))
+
+def test_run_reports_ffmpeg_progress(tmp_path, props):
+    fake_ffmpeg = tmp_path / "ffmpeg"
+    fake_ffmpeg.write_text(
+        "#!/bin/sh\n"
+        "echo out_time_us=1000000\n"
+        "echo progress=continue\n"
+        "echo out_time_us=2000000\n"
+        "echo progress=end\n"
+    )
+    fake_ffmpeg.chmod(0o755)
+    reported = []
+    exporter = VideoExporter("video.mp4", props, str(tmp_path / "temp"), progress_callback=reported.append)
+    exporter._progress_total = 4.0
+
+    exporter.run([str(fake_ffmpeg), "-i", "video.mp4", "out.mp4"], duration=2.0)
+    assert reported == pytest.approx([0.25, 0.5, 0.5])
+
+def test_run_refuses_after_abort(tmp_path, props):
+    exporter = VideoExporter("video.mp4", props, str(tmp_path / "temp"))
+    exporter.abort()
+    with pytest.raises(ExportCancelled):
+        exporter.run(["ffmpeg", "-version"])
+
+def test_segment_cache_renders_only_changed_ranges(tmp_path, props):
+    video = tmp_path / "video.mp4"
+    video.write_bytes(b"source")
+    cache = SegmentCache(str(tmp_path / "segments"))
+    rendered = []
+
+    def run(cmd, *args):
+        rendered.append(cmd)
+        if cmd[-1].endswith(".mp4") and "-f" not in cmd:
+            open(cmd[-1], "w").close()
+
+    def export(blocks):
+        exporter = VideoExporter(str(video), props, str(tmp_path / "temp"), segment_cache=cache)
+        exporter.run = run
+        rendered.clear()
+        exporter.export_label("keep", blocks, str(tmp_path / "keep.mp4"))
+        return [cmd for cmd in rendered if "-f" not in cmd], rendered[-1]
+
+    blocks = [labeled(1.0, 2.0, "keep"), labeled(4.0, 5.0, "keep")]
+    segments, concat = export(blocks)
+    assert len(segments) == 2
+    assert concat[concat.index("-c") + 1] == "copy"
+
+    segments, _ = export(blocks + [labeled(8.0, 9.0, "keep")])
+    assert len(segments) == 1
+    assert segments[0][segments[0].index("-ss") + 1] == "7.7"
+
+def test_edit_list_mode_renders_nothing(tmp_path, props):
+    exporter = VideoExporter("video.mp4", props, str(tmp_path / "temp"), mode="edit_list")
+    commands = []
+    exporter.run = lambda cmd, *args: commands.append(cmd)
+    exporter.export_label("keep", [labeled(1.0, 2.0, "keep")], str(tmp_path / "keep_blocks.mp4"))
+    assert commands == []
+    assert (tmp_path / "keep_blocks.edl").exists()
+    assert "inpoint 0.7" in (tmp_path / "keep_blocks.ffconcat").read_text()
+
+def test_per_block_export_one_output_per_block(tmp_path, props):
+    exporter = VideoExporter("video.mp4", props, str(tmp_path / "temp"), mode="per_block")
+    commands = []
+    exporter.run = lambda cmd, *args: commands.append(cmd)
+
+    blocks_by_label = {
+        "keep": [labeled(1.0, 2.0, "keep"), labeled(10.0, 11.0, "keep")],
+        "remove": [labeled(5.0, 6.0, "remove")],
+    }
+    exporter.export_labels(blocks_by_label, {"keep": "out/keep_blocks.mp4", "remove": "out/remove_blocks.mp4"})
+    assert len(commands) == 1
+    cmd = commands[0]
+    outputs = [arg for arg in cmd if arg.endswith(".mp4") and arg != "video.mp4"]
+    assert outputs == ["out/keep_blocks_001.mp4", "out/remove_blocks_001.mp4", "out/keep_blocks_002.mp4"]
+    assert cmd[cmd.index("-ss") + 1] == "0.7"
+
+def test_failed_export_removes_only_its_own_outputs(tmp_path, props, monkeypatch):
+    # This ffmpeg starts writing the block clips, then fails
+    fake_ffmpeg = tmp_path / "bin" / "ffmpeg"
+    fake_ffmpeg.parent.mkdir()
+    fake_ffmpeg.write_text(
+        "#!/bin/sh\n"
+        "for arg; do case $arg in *_00?.mp4) : > \"$arg\";; esac; done\n"
+        "exit 1\n"
+    )
+    fake_ffmpeg.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{fake_ffmpeg.parent}:{os.environ['PATH']}")
+    previous = tmp_path / "keep_blocks.mp4"
+    previous.write_bytes(b"earlier export")
+
+    exporter = VideoExporter("video.mp4", props, str(tmp_path / "temp"), mode="per_block")
+    blocks = [labeled(1.0, 2.0, "keep"), labeled(10.0, 11.0, "keep")]
+    with pytest.raises(subprocess.CalledProcessError):
+        exporter.export_label("keep", blocks, str(previous))
+
+    assert previous.read_bytes() == b"earlier export"
+    assert not (tmp_path / "keep_blocks_001.mp4").exists()
+    assert not (tmp_path / "keep_blocks_002.mp4").exists()
+
+def test_loudness_normalization_uses_block_stats(tmp_path, props):
+    exporter = VideoExporter("video.mp4", props, str(tmp_path / "temp"), mode="filtergraph",
+                             loudness_target=-16.0)
+    commands = []
+    exporter.run = lambda cmd, *args: commands.append(cmd)
+
+    block = labeled(1.0, 2.0, "keep")
+    block.loudness = LoudnessStats()
+    for _ in range(10):
+        block.loudness.add(-24.0, -24.0, -6.0)
+    exporter.export_label("keep", [block], "keep.mp4")
+
+    cmd = commands[0]
+    graph = cmd[cmd.index("-filter_complex") + 1]
+    assert "[outa]loudnorm=I=-16.0" in graph
+    assert "measured_I=-24.00" in graph and "measured_TP=-6.00" in graph
+    assert cmd[cmd.index("[outv]") + 2] == "[outan]"
+
+def full_toolchain():
+    return Toolchain(
+        "ffmpeg", "ffprobe", "6.1",
+        encoders={'h264': ['libx264'], 'aac': ['aac']}, decoders={'h264': ['h264'], 'aac': ['aac']},
+        filters={'split', 'asplit', 'trim', 'atrim', 'concat', 'loudnorm', 'aresample'}
+    )
+
+def test_missing_encoder_fails_before_rendering(tmp_path, props):
+    tools = full_toolchain()
+    tools.encoders.pop('h264')
+    exporter = VideoExporter("video.mp4", props, str(tmp_path / "temp"), mode="reencode", toolchain=tools)
+    commands = []
+    exporter.run = lambda cmd, *args: commands.append(cmd)
+    with pytest.raises(MissingCapability, match="h264 encoder"):
+        exporter.export_label("keep", [labeled(1.0, 2.0, "keep")], str(tmp_path / "out.mp4"))
+    assert commands == []
+
+def test_graph_modes_require_filters(tmp_path, props):
+    tools = full_toolchain()
+    exporter = VideoExporter("video.mp4", props, str(tmp_path / "temp"), mode="filtergraph", toolchain=tools)
+    exporter.check_capabilities()
+    tools.filters.discard('concat')
+    with pytest.raises(MissingCapability, match="concat filter"):
+        exporter.check_capabilities()
+    # Segment re-encoding does not build a graph
+    VideoExporter("video.mp4", props, str(tmp_path / "temp"), toolchain=tools).check_capabilities()
+
+def test_smart_cut_falls_back_to_available_encoder(tmp_path, props):
+    tools = full_toolchain()
+    tools.encoders['h264'] = ['h264_videotoolbox']
+    exporter = VideoExporter("video.mp4", props, str(tmp_path / "temp"), mode="smart_cut", toolchain=tools)
+    args = exporter.matching_video_args()
+    assert args[:2] == ["-c:v", "h264_videotoolbox"]
+    assert "-crf" not in args
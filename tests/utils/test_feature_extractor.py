@@ -0,0 +1,54 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from block_editor.core.audio_block import AudioBlock
+from block_editor.core.block_manager import BlockManager
+from block_editor.utils import media_cache
+from block_editor.utils.feature_extractor import FeatureExtractor, FEATURE_SAMPLE_RATE
+
+@pytest.fixture
+def decoded(tmp_path, monkeypatch):
+    """Replaces the ffmpeg decode with a 1 kHz tone followed by silence"""
+    monkeypatch.setattr(media_cache, 'CACHE_ROOT', str(tmp_path / "cache"))
+    t = np.arange(FEATURE_SAMPLE_RATE) / FEATURE_SAMPLE_RATE
+    samples = np.concatenate([0.5 * np.sin(2 * np.pi * 1000 * t), np.zeros(FEATURE_SAMPLE_RATE)]).astype('<f4')
+    calls = []
+
+    def decode(self, path):
+        calls.append(path)
+        samples.tofile(path)
+
+    monkeypatch.setattr(FeatureExtractor, 'decode', decode)
+    source = tmp_path / "source.mp4"
+    source.write_bytes(b"recording")
+    return str(source), calls
+
+def test_extract(decoded):
+    source, _ = decoded
+    table = FeatureExtractor(source).extract([AudioBlock(0.0, 1.0, False), AudioBlock(1.0, 2.0, True)])
+    assert len(table) == 2
+    assert table['rms'][0] > table['rms'][1]
+    assert table['centroid'][0] == pytest.approx(1000, rel=0.05)
+
+def test_block_manager_caches_features(decoded):
+    source, calls = decoded
+    manager = BlockManager()
+    manager.set_video_path(source)
+    manager.blocks = [AudioBlock(0.0, 1.0, False), AudioBlock(1.0, 2.0, True)]
+    first = manager.compute_features()
+    second = manager.compute_features()
+    assert len(calls) == 1
+    assert list(second['rms']) == pytest.approx(list(first['rms']))
+    assert manager.set_features(manager.blocks, second)
+
+def test_block_manager_finds_retakes(decoded, monkeypatch):
+    source, _ = decoded
+    t = np.arange(FEATURE_SAMPLE_RATE) / FEATURE_SAMPLE_RATE
+    take = 0.3 * np.sin(2 * np.pi * np.where(t < 0.5, 500, 2000) * t)
+    samples = np.concatenate([take, np.zeros(FEATURE_SAMPLE_RATE), take]).astype('<f4')
+    monkeypatch.setattr(FeatureExtractor, 'decode', lambda self, path: samples.tofile(path))
+    manager = BlockManager()
+    manager.set_video_path(source)
+    manager.blocks = [AudioBlock(0.0, 1.0, False), AudioBlock(1.0, 2.0, True), AudioBlock(2.0, 3.0, False)]
+    assert manager.find_retakes() == [[0, 2]]
@@ -0,0 +1,134 @@
+import subprocess
+import sys
+import time
+import pytest
+from block_editor.utils.ffmpeg_scheduler import (
+    CAN_SUSPEND, NICE_COMMAND, FFmpegScheduler, JobCancelled, Priority, with_thread_limit
+)
+
+def python(code):
+    return [sys.executable, "-c", code]
+
+@pytest.fixture
+def scheduler():
+    return FFmpegScheduler(max_slots=2)
+
+def test_run_captures_output(scheduler):
+    result = scheduler.run(python("import sys; print('out'); print('err', file=sys.stderr)"))
+    assert result.returncode == 0
+    assert result.stdout.strip() == "out"
+    assert result.stderr.strip() == "err"
+
+def test_run_check_raises(scheduler):
+    with pytest.raises(subprocess.CalledProcessError):
+        scheduler.run(python("raise SystemExit(3)"), check=True)
+
+def test_stderr_streamed_line_by_line(scheduler):
+    lines = []
+    code = "import sys; sys.stderr.write('a\\rb\\nc\\n')"
+    scheduler.run(python(code), stderr_callback=lines.append)
+    assert lines == ["a", "b", "c"]
+
+def test_thread_limit_matches_job_threads():
+    cmd = ["ffmpeg", "-y", "-i", "in.mp4", "-c:v", "libx264", "out.mp4"]
+    assert with_thread_limit(cmd, 2) == [
+        "ffmpeg", "-y", "-threads", "2", "-i", "in.mp4", "-c:v", "libx264", "-threads", "2", "out.mp4"
+    ]
+    # Limits the command already sets are kept
+    cmd = ["ffmpeg", "-threads", "4", "-i", "in.mp4", "-threads", "3", "out.mp4"]
+    assert with_thread_limit(cmd, 2) == cmd
+    probe = ["ffprobe", "-i", "in.mp4"]
+    assert with_thread_limit(probe, 2) == probe
+
+def test_thread_limit_covers_every_output():
+    cmd = [
+        "ffmpeg", "-y", "-i", "in.mp4", "-filter_complex", "split[a][b]",
+        "-map", "[a]", "-an", "a.mp4", "-map", "[b]", "-f", "null", "-"
+    ]
+    assert with_thread_limit(cmd, 2) == [
+        "ffmpeg", "-y", "-threads", "2", "-i", "in.mp4", "-filter_complex", "split[a][b]",
+        "-map", "[a]", "-an", "-threads", "2", "a.mp4", "-map", "[b]", "-f", "null", "-threads", "2", "-"
+    ]
+
+def test_jobs_without_a_limit_take_their_class_budget(scheduler):
+    encode = ["ffmpeg", "-i", "in.mp4", "out.mp4"]
+    # An unrestricted ffmpeg may use every slot its class can take; ffprobe uses one
+    assert scheduler.slots_for(encode, Priority.EXPORT, None) == scheduler.max_slots - 1
+    assert scheduler.slots_for(encode, Priority.PLAYBACK, None) == scheduler.max_slots
+    assert scheduler.slots_for(encode, Priority.EXPORT, 1) == 1
+    assert scheduler.slots_for(["ffprobe", "-i", "in.mp4"], Priority.INTERACTIVE, None) == 1
+
+@pytest.mark.skipif(NICE_COMMAND is None, reason="no nice(1) on this platform")
+def test_background_jobs_run_niced(scheduler):
+    code = "import os; print(os.nice(0))"
+    base = scheduler.run(python(code), Priority.INTERACTIVE)
+    export = scheduler.run(python(code), Priority.EXPORT)
+    assert int(export.stdout) == min(19, int(base.stdout) + 10)
+
+def test_missing_binary_raises(scheduler):
+    with pytest.raises(FileNotFoundError):
+        scheduler.run(["no-such-ffmpeg-binary", "-version"], Priority.EXPORT)
+
+def test_priority_order_when_busy(scheduler):
+    started = []
+    blocker = scheduler.submit(python("import time; time.sleep(0.5)"), Priority.INTERACTIVE, threads=2)
+    jobs = [
+        scheduler.submit(python(f"print({priority.value})"), priority,
+                         stdout_callback=lambda line: started.append(int(line)))
+        for priority in (Priority.CACHE_WARMING, Priority.EXPORT, Priority.INTERACTIVE)
+    ]
+    blocker.result()
+    for job in jobs:
+        job.result()
+    assert started[0] == Priority.INTERACTIVE
+
+def test_background_jobs_leave_a_reserved_slot(scheduler):
+    exports = [scheduler.submit(python("import time; time.sleep(2)"), Priority.EXPORT) for _ in range(2)]
+    probe = scheduler.submit(python("print('probe')"), Priority.INTERACTIVE)
+    assert probe.result(timeout=1.5).stdout.strip() == "probe"
+    # The second export waits for the first rather than taking the reserved slot
+    assert not exports[1].done()
+    for job in exports:
+        job.cancel()
+
+def test_timeout_kills_process(scheduler):
+    with pytest.raises(subprocess.TimeoutExpired):
+        scheduler.run(python("import time; time.sleep(10)"), timeout=0.2)
+
+def test_cancel_running_and_queued(scheduler):
+    running = scheduler.submit(python("import time; time.sleep(10)"), Priority.EXPORT, threads=2)
+    queued = scheduler.submit(python("print('never')"), Priority.EXPORT)
+    queued.cancel()
+    running.cancel()
+    with pytest.raises(JobCancelled):
+        queued.result(timeout=5)
+    with pytest.raises(JobCancelled):
+        running.result(timeout=5)
+
+def test_hold_keeps_cache_warming_queued(scheduler):
+    scheduler.hold()
+    job = scheduler.submit(python("print('warm')"), Priority.CACHE_WARMING)
+    with pytest.raises(TimeoutError):
+        job.result(timeout=0.5)
+    scheduler.release()
+    assert job.result(timeout=5).stdout.strip() == "warm"
+
+@pytest.mark.skipif(not CAN_SUSPEND, reason="processes cannot be stopped on this platform")
+def test_export_suspends_running_cache_warming(scheduler):
+    ticks = []
+    code = "import time\nfor i in range(30):\n    print(i, flush=True)\n    time.sleep(0.05)"
+    warming = scheduler.submit(python(code), Priority.CACHE_WARMING, stdout_callback=ticks.append)
+    deadline = time.monotonic() + 5
+    while not ticks and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    export = scheduler.submit(python("import time; time.sleep(0.8)"), Priority.EXPORT)
+    time.sleep(0.2)
+    paused_at = len(ticks)
+    time.sleep(0.4)
+    assert len(ticks) == paused_at
+    assert not warming.done()
+
+    export.result()
+    assert warming.result(timeout=10).returncode == 0
+    assert len(ticks) == 30
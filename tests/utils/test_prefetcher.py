@@ -0,0 +1,109 @@
+import threading
+import time
+import pytest
+from block_editor.core.audio_block import AudioBlock
+from block_editor.utils import media_cache, prefetcher
+from block_editor.utils.analysis_cache import AnalysisCache
+from block_editor.utils.editing_proxy import EditingProxy
+from block_editor.utils.ffmpeg_scheduler import JobCancelled
+from block_editor.utils.prefetcher import Prefetcher, next_videos
+from block_editor.utils.silence_detector import SilenceDetector
+
+@pytest.fixture
+def folder(tmp_path, monkeypatch):
+    monkeypatch.setattr(media_cache, 'CACHE_ROOT', str(tmp_path / "cache"))
+    videos = tmp_path / "videos"
+    videos.mkdir()
+    for name in ("ep1_a.mp4", "ep1_b.mov", "ep1_c.mp4", "ep1_d.avi", "notes.txt"):
+        (videos / name).write_bytes(name.encode())
+    return videos
+
+@pytest.fixture
+def fake_analysis(monkeypatch):
+    """Stand in for ffprobe, detection and proxy rendering, recording priorities"""
+    calls = []
+
+    def probe(self, priority=None):
+        calls.append(("probe", self.input_file, priority))
+        return {'codec': 'prores', 'width': 3840, 'height': 2160, 'pix_fmt': 'yuv422p10le', 'duration': 4.0}
+
+    def detect_blocks(self):
+        calls.append(("detect", self.input_file, self.priority))
+        return [AudioBlock(0.0, 4.0, False)]
+
+    def render(self, progress_callback=None, job_callback=None, priority=None):
+        calls.append(("proxy", self.input_file, priority))
+        with open(self.path, "wb") as f:
+            f.write(b"proxy")
+        return self.path
+
+    monkeypatch.setattr(EditingProxy, 'probe', probe)
+    monkeypatch.setattr(EditingProxy, 'render', render)
+    monkeypatch.setattr(SilenceDetector, 'detect_blocks', detect_blocks)
+    monkeypatch.setattr(prefetcher.toolchain, 'current', lambda: None)
+    return calls
+
+def test_next_videos_in_name_order(folder):
+    following = next_videos(str(folder / "ep1_a.mp4"), count=2)
+    assert [path.split("/")[-1] for path in following] == ["ep1_b.mov", "ep1_c.mp4"]
+    assert next_videos(str(folder / "ep1_d.avi")) == []
+
+def test_prefetch_fills_caches_at_cache_warming_priority(folder, fake_analysis):
+    video = str(folder / "ep1_b.mov")
+    Prefetcher().prefetch(video)
+    assert [kind for kind, _, _ in fake_analysis] == ["probe", "detect", "proxy"]
+    assert all(priority == prefetcher.Priority.CACHE_WARMING for _, _, priority in fake_analysis)
+    assert AnalysisCache().get_detection(video) is not None
+    assert EditingProxy(video).exists()
+
+    # A second pass finds everything cached
+    fake_analysis.clear()
+    Prefetcher().prefetch(video)
+    assert [kind for kind, _, _ in fake_analysis] == ["probe"]
+
+def test_incomplete_detection_is_not_cached(folder, fake_analysis, monkeypatch):
+    def detect_blocks(self):
+        self.complete = False
+        return [AudioBlock(0.0, 4.0, False)]
+
+    monkeypatch.setattr(SilenceDetector, 'detect_blocks', detect_blocks)
+    video = str(folder / "ep1_b.mov")
+    Prefetcher(proxies=False).prefetch(video)
+    assert AnalysisCache().get_detection(video) is None
+
+def test_schedule_runs_in_background(folder, fake_analysis):
+    worker = Prefetcher(count=2, proxies=False)
+    worker.schedule(str(folder / "ep1_a.mp4"), {'threshold': -35})
+    deadline = time.monotonic() + 5
+    last = str(folder / "ep1_c.mp4")
+    while AnalysisCache().get_detection(last, {'threshold': -35}) is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    worker.stop()
+    detected = [path.split("/")[-1] for kind, path, _ in fake_analysis if kind == "detect"]
+    assert detected == ["ep1_b.mov", "ep1_c.mp4"]
+    assert AnalysisCache().get_detection(last) is None
+
+def test_stop_cancels_running_detection(folder, fake_analysis, monkeypatch):
+    class FakeJob:
+        def __init__(self):
+            self.cancelled = threading.Event()
+
+        def cancel(self):
+            self.cancelled.set()
+
+    job = FakeJob()
+    started = threading.Event()
+
+    def detect_blocks(self):
+        # The audio pass reports its job, then waits like a stopped process would
+        self.job_callback(job)
+        started.set()
+        assert job.cancelled.wait(5)
+        raise JobCancelled("cancelled")
+
+    monkeypatch.setattr(SilenceDetector, 'detect_blocks', detect_blocks)
+    worker = Prefetcher(count=1, proxies=False)
+    worker.schedule(str(folder / "ep1_a.mp4"))
+    assert started.wait(5)
+    worker.stop()
+    assert job.cancelled.is_set()
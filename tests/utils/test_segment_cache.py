@@ -0,0 +1,49 @@
+import errno
+import os
+from block_editor.utils.segment_cache import SegmentCache
+
+def add_segment(cache, tmp_path, key, size, mtime):
+    rendered = tmp_path / f"{key}.part"
+    rendered.write_bytes(b"x" * size)
+    path = cache.put(key, str(rendered))
+    os.utime(path, (mtime, mtime))
+    return path
+
+def test_put_and_get(tmp_path):
+    cache = SegmentCache(str(tmp_path / "segments"))
+    assert cache.get("abc") is None
+    path = add_segment(cache, tmp_path, "abc", 10, 1000)
+    assert cache.get("abc") == path
+    # A hit marks the segment as recently used
+    assert os.path.getmtime(path) > 1000
+
+def test_evict_least_recently_used(tmp_path):
+    cache = SegmentCache(str(tmp_path / "segments"), max_bytes=25)
+    old = add_segment(cache, tmp_path, "old", 10, 1000)
+    kept = add_segment(cache, tmp_path, "kept", 10, 1500)
+    new = add_segment(cache, tmp_path, "new", 10, 2000)
+
+    cache.evict(keep=[kept])
+    assert not os.path.exists(old)
+    assert os.path.exists(kept) and os.path.exists(new)
+    assert cache.size() == 20
+
+def test_put_moves_across_filesystems(tmp_path, monkeypatch):
+    cache = SegmentCache(str(tmp_path / "segments"))
+    replace = os.replace
+
+    def cross_device_replace(src, dst):
+        # Renames work only within the cache directory, as with a separate /tmp
+        if os.path.dirname(os.path.abspath(src)) != os.path.dirname(os.path.abspath(dst)):
+            raise OSError(errno.EXDEV, "Invalid cross-device link")
+        replace(src, dst)
+
+    monkeypatch.setattr(os, "rename", cross_device_replace)
+    monkeypatch.setattr(os, "replace", cross_device_replace)
+    rendered = tmp_path / "rendered.mp4"
+    rendered.write_bytes(b"segment")
+
+    path = cache.put("abc", str(rendered))
+    assert open(path, "rb").read() == b"segment"
+    assert not rendered.exists()
+    assert os.listdir(cache.root) == ["abc.mp4"]
@@ -1,7 +1,9 @@
 import pytest
 import subprocess
 from unittest.mock import patch, MagicMock
-from block_editor.utils.silence_detector import SilenceDetector
+from block_editor.core.audio_block import AudioBlock
+from block_editor.utils.silence_detector import SilenceDetector, parse_ebur128_frame
+from block_editor.utils.toolchain import Toolchain
 
 @pytest.fixture
 def silence_detector():
@@ -25,7 +27,7 @@ def test_silence_detector_initialization(silence_detector):
     assert silence_detector.silence_threshold == -40
     assert silence_detector.min_silence_duration == 0.1
 
-@patch('subprocess.run')
+@patch('block_editor.utils.ffmpeg_scheduler.run')
 def test_detect_blocks(mock_run, silence_detector, mock_ffmpeg_output, mock_duration_output):
     # Create mock processes with proper attributes
     mock_ffmpeg_process = MagicMock()
@@ -82,7 +84,7 @@ def test_detect_blocks(mock_run, silence_detector, mock_ffmpeg_output, mock_dura
     assert blocks[4].end == 10.0
     assert not blocks[4].is_silence
 
-@patch('subprocess.run')
+@patch('block_editor.utils.ffmpeg_scheduler.run')
 def test_detect_blocks_ffmpeg_error(mock_run, silence_detector):
     mock_process = MagicMock()
     mock_process.returncode = 1
@@ -91,3 +93,26 @@ def test_detect_blocks_ffmpeg_error(mock_run, silence_detector):
     
     with pytest.raises(Exception, match="FFmpeg failed to process the video"):
         silence_detector.detect_blocks()
+
+def test_parse_ebur128_frame():
+    line = ("[Parsed_ebur128_1 @ 0x5581] t: 1.1      TARGET:-23 LUFS    M: -22.3 S:-120.7     "
+            "I: -22.3 LUFS       LRA:   0.0 LU  FTPK: -5.2 -4.8 dBFS  TPK: -5.2 -4.8 dBFS")
+    assert parse_ebur128_frame(line) == (1.1, -22.3, -120.7, -4.8)
+    assert parse_ebur128_frame("[silencedetect @ 0x7f8a1c0] silence_start: 1.5") is None
+
+def test_assign_loudness_per_block(silence_detector):
+    blocks = [AudioBlock(0.0, 1.0, False), AudioBlock(1.0, 2.0, True)]
+    output = "\n".join(
+        f"[Parsed_ebur128_1 @ 0x1] t: {t / 10:.1f}  TARGET:-23 LUFS  M: {-20.0 if t <= 11 else -60.0} S: -20.0"
+        for t in range(4, 21)
+    )
+    silence_detector.assign_loudness(output, blocks)
+    assert blocks[0].loudness.integrated() == pytest.approx(-20.0)
+    assert blocks[1].loudness.integrated() == pytest.approx(-60.0, abs=0.1)
+    assert silence_detector.loudness.integrated() == pytest.approx(-20.0, abs=0.5)
+
+def test_audio_filter_skips_missing_ebur128():
+    detector = SilenceDetector("video.mp4", toolchain=Toolchain("ffmpeg", "ffprobe", filters={'silencedetect'}))
+    assert detector.audio_filter() == "silencedetect=noise=-40dB:d=0.1"
+    detector.toolchain.filters.add('ebur128')
+    assert "ebur128=peak=true" in detector.audio_filter()
@@ -0,0 +1,91 @@
+import pytest
+from block_editor.utils import toolchain
+from block_editor.utils.toolchain import (
+    Toolchain, parse_codecs, parse_filters, parse_hwaccels, parse_version, resolve
+)
+
+CODECS_OUTPUT = """Codecs:
+ D..... = Decoding supported
+ .E.... = Encoding supported
+ ..V... = Video codec
+ -------
+ DEV.LS h264                 H.264 / AVC / MPEG-4 AVC (decoders: h264 h264_v4l2m2m ) (encoders: libx264 h264_nvenc )
+ DEAIL. aac                  AAC (Advanced Audio Coding) (decoders: aac aac_fixed )
+ DEVIL. mpeg4                MPEG-4 part 2
+ D.V.L. vp6                  On2 VP6
+"""
+
+FILTERS_OUTPUT = """Filters:
+  T.. = Timeline support
+  .S. = Slice threading
+  A = Audio input/output
+ ... ebur128           A->N       EBU R128 scanner.
+ T.. silencedetect     A->A       Detect silence.
+ TSC trim              V->V       Pick one continuous section from the input, drop the rest.
+"""
+
+def test_parse_version():
+    assert parse_version("ffmpeg version 6.1.1 Copyright (c) 2000-2023\nbuilt with gcc") == "6.1.1"
+    assert parse_version("garbage") is None
+
+def test_parse_codecs():
+    encoders, decoders = parse_codecs(CODECS_OUTPUT)
+    assert encoders == {'h264': ['libx264', 'h264_nvenc'], 'aac': ['aac'], 'mpeg4': ['mpeg4']}
+    assert decoders['h264'] == ['h264', 'h264_v4l2m2m']
+    assert decoders['vp6'] == ['vp6']
+    assert 'vp6' not in encoders
+
+def test_parse_filters():
+    assert parse_filters(FILTERS_OUTPUT) == {'ebur128', 'silencedetect', 'trim'}
+
+def test_parse_hwaccels():
+    assert parse_hwaccels("Hardware acceleration methods:\nvdpau\ncuda\n\n") == {'vdpau', 'cuda'}
+
+def test_encoder_for_prefers_available():
+    tools = Toolchain("ffmpeg", "ffprobe", encoders={'h264': ['h264_videotoolbox']})
+    assert tools.encoder_for('h264', 'libx264') == 'h264_videotoolbox'
+    assert tools.encoder_for('hevc', 'libx265') is None
+    tools.encoders['h264'].append('libx264')
+    assert tools.encoder_for('h264', 'libx264') == 'libx264'
+
+def test_toolchain_round_trip():
+    tools = Toolchain("/bin/ffmpeg", "/bin/ffprobe", "6.1", {'aac': ['aac']}, {'aac': ['aac']},
+                      {'ebur128'}, {'cuda'})
+    restored = Toolchain.from_dict(tools.to_dict())
+    assert restored.to_dict() == tools.to_dict()
+    assert restored.has_filter('ebur128') and restored.can_encode('aac')
+
+@pytest.fixture
+def binaries(tmp_path, monkeypatch):
+    ffmpeg = tmp_path / "ffmpeg"
+    ffprobe = tmp_path / "ffprobe"
+    ffmpeg.write_bytes(b"v1")
+    ffprobe.write_bytes(b"v1")
+    monkeypatch.setattr(toolchain, 'find_binaries', lambda: (str(ffmpeg), str(ffprobe)))
+    probes = []
+
+    def fake_probe(ffmpeg_path, ffprobe_path):
+        probes.append(ffmpeg_path)
+        return Toolchain(ffmpeg_path, ffprobe_path, f"v{len(probes)}", filters={'ebur128'})
+
+    monkeypatch.setattr(toolchain, 'probe', fake_probe)
+    return ffmpeg, probes
+
+def test_resolve_probes_once_per_binary(tmp_path, binaries):
+    ffmpeg, probes = binaries
+    cache_path = str(tmp_path / "capabilities.json")
+    assert resolve(cache_path).version == "v1"
+    assert resolve(cache_path).version == "v1"
+    assert len(probes) == 1
+
+    # An upgraded binary is probed again
+    ffmpeg.write_bytes(b"version 2")
+    assert resolve(cache_path).version == "v2"
+    assert len(probes) == 2
+
+def test_resolve_ignores_corrupt_cache(tmp_path, binaries):
+    _, probes = binaries
+    cache_path = tmp_path / "capabilities.json"
+    cache_path.write_text("{not json")
+    assert resolve(str(cache_path)).has_filter('ebur128')
+    assert len(probes) == 1
@@ -0,0 +1,151 @@
+import hashlib
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+
+pytest.importorskip("requests")
+py7zr = pytest.importorskip("py7zr")
+
+from block_editor.utils import media_cache
+from block_editor.utils import unix_ffbinary_manager as installer
+
+PAYLOAD = os.urandom(256 * 1024)
+
+class ArchiveHandler(BaseHTTPRequestHandler):
+    """Serves server.files with Range support; server.cut_after truncates the next response"""
+    def do_GET(self):
+        name = self.path.lstrip("/")
+        data = self.server.files.get(name)
+        self.server.requests.append((name, self.headers.get("Range")))
+        if data is None:
+            self.send_error(404)
+            return
+        start = 0
+        if self.headers.get("Range"):
+            start = int(self.headers["Range"].split("=")[1].split("-")[0])
+            if start >= len(data):
+                self.send_response(416)
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(data) - 1}/{len(data)}")
+        else:
+            self.send_response(200)
+        body = data[start:]
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.server.cut_after is not None:
+            body = body[:self.server.cut_after]
+            self.server.cut_after = None
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), ArchiveHandler)
+    httpd.files = {}
+    httpd.requests = []
+    httpd.cut_after = None
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    httpd.url = f"http://127.0.0.1:{httpd.server_address[1]}/"
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+@pytest.fixture(autouse=True)
+def cache_root(tmp_path, monkeypatch):
+    monkeypatch.setattr(media_cache, 'CACHE_ROOT', str(tmp_path / "cache"))
+    monkeypatch.setattr(installer, 'DOWNLOAD_TIMEOUT', 5)
+
+def sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+def test_download_verifies_checksum(tmp_path, server):
+    server.files["ffmpeg.7z"] = PAYLOAD
+    path = installer.download_artifact("ffmpeg.7z", sha256(PAYLOAD), str(tmp_path), [server.url])
+    with open(path, "rb") as f:
+        assert f.read() == PAYLOAD
+    assert not os.path.exists(path + ".part")
+
+def test_download_resumes_interrupted_transfer(tmp_path, server):
+    server.files["ffmpeg.7z"] = PAYLOAD
+    server.cut_after = 100 * 1024
+    path = installer.download_artifact("ffmpeg.7z", sha256(PAYLOAD), str(tmp_path), [server.url])
+    with open(path, "rb") as f:
+        assert f.read() == PAYLOAD
+    # The retry asks only for the bytes that did not arrive
+    name, byte_range = server.requests[-1]
+    assert len(server.requests) == 2
+    assert byte_range is not None and int(byte_range[6:-1]) > 0
+
+def test_checksum_mismatch_falls_through_to_next_mirror(tmp_path, server):
+    server.files["ffmpeg.7z"] = b"tampered" + PAYLOAD
+    local_dir = tmp_path / "mirror"
+    local_dir.mkdir()
+    (local_dir / "ffmpeg.7z").write_bytes(PAYLOAD)
+    download_dir = tmp_path / "downloads"
+    download_dir.mkdir()
+    path = installer.download_artifact("ffmpeg.7z", sha256(PAYLOAD), str(download_dir),
+                                       [server.url, local_dir.as_uri()])
+    with open(path, "rb") as f:
+        assert f.read() == PAYLOAD
+
+def test_all_mirrors_failing_raises(tmp_path, server):
+    with pytest.raises(RuntimeError, match="ffmpeg.7z"):
+        installer.download_artifact("ffmpeg.7z", None, str(tmp_path), [server.url, str(tmp_path / "missing")])
+
+def test_unpinned_download_is_verified_against_mirror_checksum(tmp_path, server):
+    server.files["ffmpeg.7z"] = PAYLOAD
+    server.files["ffmpeg.7z.sha256"] = f"{sha256(PAYLOAD)}  ffmpeg.7z\n".encode()
+    path = installer.download_artifact("ffmpeg.7z", None, str(tmp_path), [server.url])
+    with open(path, "rb") as f:
+        assert f.read() == PAYLOAD
+    # The verified copy is reused without asking the mirror again
+    requests_made = len(server.requests)
+    assert installer.download_artifact("ffmpeg.7z", None, str(tmp_path), [server.url]) == path
+    assert len(server.requests) == requests_made
+
+def test_unverifiable_download_is_refused(tmp_path, server):
+    server.files["ffmpeg.7z"] = PAYLOAD
+    with pytest.raises(RuntimeError, match="No checksum"):
+        installer.download_artifact("ffmpeg.7z", None, str(tmp_path), [server.url])
+    server.files["ffmpeg.7z.sha256"] = f"{sha256(b'other')}  ffmpeg.7z\n".encode()
+    with pytest.raises(RuntimeError, match="expected"):
+        installer.download_artifact("ffmpeg.7z", None, str(tmp_path), [server.url])
+    assert not os.path.exists(tmp_path / "ffmpeg.7z")
+
+@pytest.mark.xfail(strict=True, reason="the pinned build's published digests are not recorded yet")
+def test_pinned_build_has_digests():
+    assert all(installer.SHA256_HEX.fullmatch(digest or "") for digest in installer.ARTIFACTS.values())
+
+def test_mirrors_from_environment(monkeypatch):
+    monkeypatch.setenv(installer.MIRRORS_ENV, "file:///srv/ffmpeg /opt/mirror")
+    assert installer.configured_mirrors() == ["file:///srv/ffmpeg", "/opt/mirror"]
+    assert installer.local_mirror_path("file:///srv/ffmpeg") == "/srv/ffmpeg"
+    assert installer.local_mirror_path("https://example.com/") is None
+
+def make_archive(path, name, data):
+    with py7zr.SevenZipFile(path, "w") as archive:
+        archive.writestr(data, name)
+    with open(path, "rb") as f:
+        return f.read()
+
+def test_fetch_binaries_extracts_into_versioned_cache(tmp_path, server):
+    ffmpeg = make_archive(str(tmp_path / "ffmpeg.7z"), "ffmpeg", b"ffmpeg binary")
+    ffprobe = make_archive(str(tmp_path / "ffprobe.7z"), "ffprobe", b"ffprobe binary")
+    server.files.update({"ffmpeg.7z": ffmpeg, "ffprobe.7z": ffprobe})
+    artifacts = {"ffmpeg.7z": sha256(ffmpeg), "ffprobe.7z": sha256(ffprobe)}
+
+    binaries = installer.fetch_binaries([server.url], artifacts, build="test")
+    assert sorted(os.path.basename(path) for path in binaries) == ["ffmpeg", "ffprobe"]
+    assert all(os.access(path, os.X_OK) for path in binaries)
+    assert os.path.dirname(binaries[0]) == os.path.join(media_cache.CACHE_ROOT, "ffmpeg", "test", "bin")
+
+    # The extracted build is reused without downloading again
+    requests_made = len(server.requests)
+    assert installer.fetch_binaries([server.url], artifacts, build="test") == sorted(binaries)
+    assert len(server.requests) == requests_made
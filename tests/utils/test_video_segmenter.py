@@ -0,0 +1,167 @@
+import shutil
+import subprocess
+from unittest.mock import patch, MagicMock
+import pytest
+from block_editor.core.audio_block import AudioBlock
+from block_editor.utils.silence_detector import SilenceDetector
+from block_editor.utils.ffmpeg_scheduler import JobCancelled
+from block_editor.utils.video_segmenter import VideoSegmenter, parse_chunk_output
+
+CHUNK_LOG = """
+[Parsed_showinfo_4 @ 0x600] n:   0 pts:   6 pts_time:1.2     duration: 1 fmt:yuv420p
+[freezedetect @ 0x601] lavfi.freezedetect.freeze_start: 3
+[freezedetect @ 0x601] lavfi.freezedetect.freeze_duration: 4
+[freezedetect @ 0x601] lavfi.freezedetect.freeze_end: 7
+[Parsed_showinfo_4 @ 0x600] n:   1 pts:  50 pts_time:10      duration: 1 fmt:yuv420p
+[freezedetect @ 0x601] lavfi.freezedetect.freeze_start: 15
+"""
+
+def test_parse_chunk_output_shifts_and_clips_events():
+    cuts, freezes = parse_chunk_output(CHUNK_LOG, offset=119.0, start=120.0, end=140.0, stop=143.0)
+    # The cut at 120.2 is inside the chunk; the one at 129 too; the freeze left open ends with the decode
+    assert cuts == [120.2, 129.0]
+    assert freezes == [(122.0, 126.0), (134.0, 143.0)]
+
+def test_parse_chunk_output_assigns_freezes_by_start():
+    log = ("[freezedetect @ 0x1] lavfi.freezedetect.freeze_start: 1\n"
+           "[freezedetect @ 0x1] lavfi.freezedetect.freeze_end: 5\n"
+           "[freezedetect @ 0x1] lavfi.freezedetect.freeze_start: 9\n")
+    # The first freeze started in the previous chunk and continues here; the
+    # second starts after this chunk's end and belongs to the next one
+    assert parse_chunk_output(log, offset=99.0, start=100.0, end=107.0, stop=110.0) == ([], [(100.0, 104.0)])
+
+def test_chunks_overlap_their_neighbours():
+    segmenter = VideoSegmenter("source.mp4", chunk_seconds=100)
+    assert segmenter.chunks(250) == [
+        (0.0, 0.0, 100.0, 103.0), (99.0, 100.0, 200.0, 203.0), (199.0, 200.0, 250.0, 250.0)
+    ]
+    command = segmenter.chunk_command(99.0, 101.0)
+    assert command[command.index("-ss") + 1] == "99.000"
+    assert "select='gt(scene,0.3)'" in command[command.index("-vf") + 1]
+
+def completed(stderr, returncode=0):
+    result = MagicMock()
+    result.returncode = returncode
+    result.stderr = stderr
+    return result
+
+def test_segment_submits_every_chunk_and_joins_freezes():
+    logs = [
+        "[freezedetect @ 0x1] lavfi.freezedetect.freeze_start: 90\n",
+        "[freezedetect @ 0x1] lavfi.freezedetect.freeze_start: 1\n"
+        "[freezedetect @ 0x1] lavfi.freezedetect.freeze_end: 11\n"
+        "[Parsed_showinfo_4 @ 0x2] n: 0 pts: 1 pts_time:31 fmt:yuv420p\n",
+    ]
+    jobs = []
+
+    def submit(cmd, priority, threads=1):
+        job = MagicMock()
+        job.result.return_value = completed(logs[len(jobs)])
+        jobs.append(cmd)
+        return job
+
+    with patch('block_editor.utils.ffmpeg_scheduler.submit', side_effect=submit):
+        cuts, freezes = VideoSegmenter("source.mp4", chunk_seconds=100).segment(duration=150)
+    assert len(jobs) == 2
+    assert cuts == [130.0]
+    # The freeze from 90 s runs into the second chunk and is reported once
+    assert freezes == [(90.0, 110.0)]
+
+def test_freeze_across_a_chunk_edge_keeps_its_start():
+    # A 4-8 s freeze with 5 s chunks: the first chunk decodes far enough
+    # to detect it, the second sees its continuation
+    logs = [
+        "[freezedetect @ 0x1] lavfi.freezedetect.freeze_start: 4\n",
+        "[freezedetect @ 0x1] lavfi.freezedetect.freeze_start: 0\n"
+        "[freezedetect @ 0x1] lavfi.freezedetect.freeze_end: 4\n",
+    ]
+    jobs = [MagicMock(**{'result.return_value': completed(log)}) for log in logs]
+    with patch('block_editor.utils.ffmpeg_scheduler.submit', side_effect=jobs) as submit:
+        cuts, freezes = VideoSegmenter("source.mp4", chunk_seconds=5).segment(duration=10)
+    first_chunk = submit.call_args_list[0].args[0]
+    assert first_chunk[first_chunk.index("-t") + 1] == "8.000"
+    # B-frames are skipped by the decoder, not after it
+    assert first_chunk.index("-skip_frame") < first_chunk.index("-i")
+    assert freezes == [(4.0, 8.0)]
+
+def test_failed_chunk_cancels_the_rest():
+    pending = MagicMock()
+    failed = MagicMock()
+    failed.result.return_value = completed("Invalid data", returncode=1)
+    with patch('block_editor.utils.ffmpeg_scheduler.submit', side_effect=[failed, pending]):
+        with pytest.raises(RuntimeError):
+            VideoSegmenter("source.mp4", chunk_seconds=100).segment(duration=150)
+    pending.cancel.assert_called_once()
+
+def test_segment_skips_sources_without_video():
+    audio_only = {'codec': None, 'width': 0, 'height': 0, 'pix_fmt': '', 'duration': 30.0}
+    with patch('block_editor.utils.video_segmenter.EditingProxy') as proxy, \
+         patch('block_editor.utils.ffmpeg_scheduler.submit') as submit:
+        proxy.return_value.probe.return_value = audio_only
+        assert VideoSegmenter("speech.wav").segment() == ([], [])
+    submit.assert_not_called()
+
+def test_cancel_stops_chunks_and_later_segments():
+    job = MagicMock()
+    segmenter = VideoSegmenter("source.mp4", chunk_seconds=100)
+    segmenter._jobs = [job]
+    segmenter.cancel()
+    job.cancel.assert_called_once()
+    with patch('block_editor.utils.ffmpeg_scheduler.submit') as submit:
+        with pytest.raises(JobCancelled):
+            segmenter.segment(duration=150)
+    submit.assert_not_called()
+
+def video_detector():
+    return SilenceDetector.from_params(
+        "source.mp4", {'threshold': -40, 'duration': 0.1, 'buffer': 0.3, 'video_cuts': True}
+    )
+
+def test_detector_keeps_audio_blocks_when_video_fails():
+    detector = video_detector()
+    audio = completed("[silencedetect @ 0x1] silence_start: 50\n[silencedetect @ 0x1] silence_end: 60\n")
+    duration = MagicMock(returncode=0, stdout="60.0\n")
+    with patch('block_editor.utils.ffmpeg_scheduler.run', side_effect=[audio, duration]), \
+         patch.object(detector.video_segmenter, 'segment', side_effect=RuntimeError("Video analysis failed")):
+        blocks = detector.detect_blocks()
+    assert [(block.start, block.end) for block in blocks if not block.is_silence] == [(0.0, 50.0)]
+    # Audio-only blocks must not be cached as the video_cuts result
+    assert not detector.complete
+
+def test_failed_audio_pass_cancels_video():
+    detector = video_detector()
+    with patch('block_editor.utils.ffmpeg_scheduler.run', return_value=completed("Invalid data", returncode=1)), \
+         patch.object(detector.video_segmenter, 'segment', return_value=([], [])), \
+         patch.object(detector.video_segmenter, 'cancel') as cancel:
+        with pytest.raises(Exception):
+            detector.detect_blocks()
+    cancel.assert_called_once()
+
+def test_detector_splits_speech_at_video_boundaries():
+    detector = video_detector()
+    assert detector.video_segmenter is not None
+    audio = completed("[silencedetect @ 0x1] silence_start: 50\n[silencedetect @ 0x1] silence_end: 60\n")
+    duration = MagicMock(returncode=0, stdout="60.0\n")
+    with patch('block_editor.utils.ffmpeg_scheduler.run', side_effect=[audio, duration]), \
+         patch.object(detector.video_segmenter, 'segment', return_value=([20.0], [])):
+        blocks = detector.detect_blocks()
+    speech = [(block.start, block.end) for block in blocks if not block.is_silence]
+    assert speech[0] == (0.0, 20.0)
+    assert speech[1][0] == 20.0
+
+@pytest.mark.skipif(not (shutil.which("ffmpeg") and shutil.which("ffprobe")), reason="needs ffmpeg")
+def test_segment_finds_cuts_and_freezes_in_a_b_frame_encode(tmp_path):
+    # Cuts at 4 s and 7 s, with the middle shot frozen; B-frames are skipped at decode
+    source = str(tmp_path / "source.mp4")
+    subprocess.run([
+        "ffmpeg", "-v", "error", "-y",
+        "-f", "lavfi", "-i", "testsrc2=size=320x240:rate=30:duration=4",
+        "-f", "lavfi", "-i", "color=blue:size=320x240:rate=30:duration=3",
+        "-f", "lavfi", "-i", "testsrc=size=320x240:rate=30:duration=3",
+        "-filter_complex", "[0][1][2]concat=n=3:v=1[v]", "-map", "[v]",
+        "-c:v", "libx264", "-bf", "3", "-pix_fmt", "yuv420p", source
+    ], check=True)
+    cuts, freezes = VideoSegmenter(source, chunk_seconds=5).segment()
+    assert cuts == pytest.approx([4.0, 7.0], abs=0.25)
+    assert len(freezes) == 1
+    assert freezes[0] == pytest.approx((4.0, 7.0), abs=0.25)